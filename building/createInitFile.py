@@ -85,18 +85,28 @@ __all__ = ["gui", "misc", "visual", "core",
            "event", "data", "sound", "microphone"]
 
 # for developers the following allows access to the current git sha from
-# their repository
+# their repository, which is only looked up when __git_sha__ is first used
+# (rather than running git every time psychopy is imported)
 if __git_sha__ == 'n/a':
-    from subprocess import check_output, PIPE
-    # see if we're in a git repo and fetch from there
-    try:
-        thisFileLoc = os.path.split(__file__)[0]
-        output = check_output(['git', 'rev-parse', '--short', 'HEAD'],
-                              cwd=thisFileLoc, stderr=PIPE)
-    except Exception:
-        output = False
-    if output:
-        __git_sha__ = output.strip()  # remove final linefeed
+    del __git_sha__
+
+    def __getattr__(name):
+        if name != '__git_sha__':
+            raise AttributeError(
+                "module %r has no attribute %r" % (__name__, name))
+        global __git_sha__
+        from subprocess import check_output, PIPE
+        __git_sha__ = 'n/a'
+        # see if we're in a git repo and fetch from there
+        try:
+            thisFileLoc = os.path.split(__file__)[0]
+            output = check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                  cwd=thisFileLoc, stderr=PIPE)
+        except Exception:
+            output = False
+        if output:
+            __git_sha__ = output.strip()  # remove final linefeed
+        return __git_sha__
 
 # update preferences and the user paths
 if 'installing' not in locals():
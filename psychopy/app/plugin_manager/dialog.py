@@ -320,7 +320,7 @@ class EnvironmentManagerDlg(wx.Dialog):
             # get plugin info object
             pluginInfo = self.pipProcess.extra['pluginInfo']
             # scan plugins
-            plugins.scanPlugins()
+            plugins.scanPlugins(refresh=True)
             # enable plugin
             try:
                 pluginInfo.activate()
@@ -23,7 +23,7 @@ import time
 import sys
 from datetime import datetime
 
-from pkg_resources import parse_version
+from packaging.version import parse as parse_version
 
 try:
     import pyglet
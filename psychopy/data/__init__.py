@@ -1,44 +1,86 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import importlib.util
 import sys
 
-from pkg_resources import parse_version
-
-from .base import DataHandler
-from .experiment import ExperimentHandler
-from .trial import TrialHandler, TrialHandler2, TrialHandlerExt, TrialType
-from .staircase import (StairHandler, QuestHandler, PsiHandler,
-                        MultiStairHandler)
-from .counterbalance import Counterbalancer
-from . import shelf
-
-if sys.version_info.major == 3 and sys.version_info.minor >= 6:
-    from .staircase import QuestPlusHandler
-
-from .utils import (checkValidFilePath, isValidVariableName, importTrialTypes,
-                    sliceFromString, indicesFromString, importConditions,
-                    createFactorialTrialList, bootStraps, functionFromStaircase,
-                    getDateStr)
-
-from .fit import (FitFunction, FitCumNormal, FitLogistic, FitNakaRushton,
-                  FitWeibull)
-
-try:
-    # import openpyxl
-    import openpyxl
-    if parse_version(openpyxl.__version__) >= parse_version('2.4.0'):
-        # openpyxl moved get_column_letter to utils.cell
-        from openpyxl.utils.cell import get_column_letter
-    else:
-        from openpyxl.cell import get_column_letter
-    from openpyxl.reader.excel import load_workbook
-    haveOpenpyxl = True
-except ImportError:
-    haveOpenpyxl = False
-
-try:
-    import xlrd
-    haveXlrd = True
-except ImportError:
-    haveXlrd = False
+from packaging.version import parse as parse_version
+
+from psychopy.tools.importtools import lazyImportsEnabled, makeLazyGetattr
+
+if lazyImportsEnabled():
+    # import these from their submodules when first used (see
+    # psychopy.tools.importtools)
+    _lazyAttrs = {
+        'DataHandler': '.base',
+        'ExperimentHandler': '.experiment',
+        'TrialHandler': '.trial',
+        'TrialHandler2': '.trial',
+        'TrialHandlerExt': '.trial',
+        'TrialType': '.trial',
+        'StairHandler': '.staircase',
+        'QuestHandler': '.staircase',
+        'PsiHandler': '.staircase',
+        'MultiStairHandler': '.staircase',
+        'QuestPlusHandler': '.staircase',
+        'Counterbalancer': '.counterbalance',
+    }
+    for _name in ('checkValidFilePath', 'isValidVariableName',
+                  'importTrialTypes', 'sliceFromString', 'indicesFromString',
+                  'importConditions', 'createFactorialTrialList', 'bootStraps',
+                  'functionFromStaircase', 'getDateStr'):
+        _lazyAttrs[_name] = '.utils'
+    for _name in ('FitFunction', 'FitCumNormal', 'FitLogistic',
+                  'FitNakaRushton', 'FitWeibull'):
+        _lazyAttrs[_name] = '.fit'
+    __getattr__ = makeLazyGetattr(__name__, _lazyAttrs)
+else:
+    from .base import DataHandler
+    from .experiment import ExperimentHandler
+    from .trial import TrialHandler, TrialHandler2, TrialHandlerExt, TrialType
+    from .staircase import (StairHandler, QuestHandler, PsiHandler,
+                            MultiStairHandler)
+    from .counterbalance import Counterbalancer
+    from . import shelf
+
+    if sys.version_info.major == 3 and sys.version_info.minor >= 6:
+        from .staircase import QuestPlusHandler
+
+    from .utils import (checkValidFilePath, isValidVariableName,
+                        importTrialTypes, sliceFromString, indicesFromString,
+                        importConditions, createFactorialTrialList,
+                        bootStraps, functionFromStaircase, getDateStr)
+
+    from .fit import (FitFunction, FitCumNormal, FitLogistic, FitNakaRushton,
+                      FitWeibull)
+
+if lazyImportsEnabled():
+    # importing openpyxl is slow, so get it from utils when first used
+    for _name in ('openpyxl', 'haveOpenpyxl', 'get_column_letter',
+                  'load_workbook'):
+        _lazyAttrs[_name] = '.utils'
+    haveXlrd = importlib.util.find_spec('xlrd') is not None
+else:
+    try:
+        # import openpyxl
+        import openpyxl
+        if parse_version(openpyxl.__version__) >= parse_version('2.4.0'):
+            # openpyxl moved get_column_letter to utils.cell
+            from openpyxl.utils.cell import get_column_letter
+        else:
+            from openpyxl.cell import get_column_letter
+        from openpyxl.reader.excel import load_workbook
+        haveOpenpyxl = True
+    except ImportError:
+        haveOpenpyxl = False
+
+    try:
+        import xlrd
+        haveXlrd = True
+    except ImportError:
+        haveXlrd = False
+
+if lazyImportsEnabled():
+    # so that `from psychopy.data import *` still gets everything
+    __all__ = [name for name in globals() if not name.startswith('_')]
+    __all__ += list(_lazyAttrs)
@@ -11,7 +11,7 @@ import codecs
 import numpy as np
 import pandas as pd
 import json_tricks
-from pkg_resources import parse_version
+from packaging.version import parse as parse_version
 
 import psychopy
 from psychopy import logging
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Column-oriented storage for the entries of an
+:class:`~psychopy.data.ExperimentHandler`.
+"""
+
+from collections.abc import MutableMapping
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['ColumnarEntries']
+
+# dtypes for each kind of value, anything not listed is stored as an object
+_kindDtypes = {
+    'b': np.bool_,
+    'i': np.int64,
+    'f': np.float64,
+    'O': object,
+}
+
+
+def _valueKind(value):
+    """Get the kind of array ('b', 'i', 'f' or 'O') a value can be stored in
+    without changing it.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return 'b'
+    if isinstance(value, (int, np.integer)):
+        # ints too big for int64 have to stay as Python objects
+        if -2**63 <= value < 2**63:
+            return 'i'
+        return 'O'
+    if isinstance(value, (float, np.floating)):
+        return 'f'
+    return 'O'
+
+
+class _Column:
+    """A single column: a typed array of values plus a mask of which rows
+    have a value at all.
+    """
+    __slots__ = ('kind', 'values', 'present')
+
+    def __init__(self, kind, capacity):
+        self.kind = kind
+        self.values = np.empty(capacity, dtype=_kindDtypes[kind])
+        self.present = np.zeros(capacity, dtype=bool)
+
+    def grow(self, capacity):
+        values = np.empty(capacity, dtype=self.values.dtype)
+        values[:len(self.values)] = self.values
+        present = np.zeros(capacity, dtype=bool)
+        present[:len(self.present)] = self.present
+        self.values = values
+        self.present = present
+
+    def set(self, i, value):
+        kind = _valueKind(value)
+        if kind != self.kind and self.kind != 'O':
+            # mixed types, fall back to storing Python objects so that values
+            # come back out exactly as they went in
+            values = np.empty(len(self.values), dtype=object)
+            for j in np.flatnonzero(self.present):
+                values[j] = self.values[j].item()
+            self.values = values
+            self.kind = 'O'
+        self.values[i] = value
+        self.present[i] = True
+
+    def get(self, i):
+        value = self.values[i]
+        if self.kind != 'O':
+            # give back a Python scalar, as was put in
+            value = value.item()
+        return value
+
+
+class _RowView(MutableMapping):
+    """Dict-like view onto a single row of a :class:`ColumnarEntries`, so
+    that rows can be edited in place (e.g. by
+    ``ExperimentHandler.addData(name, value, row=i)``).
+    """
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, name):
+        col = self._store._columns.get(name)
+        if col is None or not col.present[self._index]:
+            raise KeyError(name)
+        return col.get(self._index)
+
+    def __setitem__(self, name, value):
+        self._store._setValue(self._index, name, value)
+
+    def __delitem__(self, name):
+        col = self._store._columns.get(name)
+        if col is None or not col.present[self._index]:
+            raise KeyError(name)
+        col.present[self._index] = False
+
+    def __iter__(self):
+        for name, col in self._store._columns.items():
+            if col.present[self._index]:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ColumnarEntries:
+    """Chronological list of entries (rows) stored as one typed array per
+    column, rather than as a list of dicts.
+
+    Columns holding only bools, ints or floats are stored in numpy arrays of
+    the matching dtype, anything else (or a mix of types) is stored in an
+    object array. Which rows have a value in each column is kept as a
+    separate mask, so missing cells are distinct from cells whose value is
+    `None` or `nan`. Arrays grow by doubling, so appending is amortized O(1)
+    per value, and converting to a :class:`pandas.DataFrame` uses the arrays
+    directly rather than building it row by row.
+
+    Behaves like a list of dicts: entries can be appended, indexed (giving an
+    editable dict-like view) and iterated over (giving dicts).
+    """
+    def __init__(self, entries=None, capacity=64):
+        self._columns = {}  # name -> _Column, in order of first appearance
+        self._nRows = 0
+        self._capacity = max(int(capacity), 1)
+        if entries is not None:
+            for entry in entries:
+                self.append(entry)
+
+    @property
+    def columns(self):
+        """Names of all columns, in the order they were first added."""
+        return list(self._columns)
+
+    def __len__(self):
+        return self._nRows
+
+    def _checkIndex(self, i):
+        if i < 0:
+            i += self._nRows
+        if not 0 <= i < self._nRows:
+            raise IndexError("entry index out of range")
+        return i
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._nRows))]
+        return _RowView(self, self._checkIndex(i))
+
+    def __iter__(self):
+        for i in range(self._nRows):
+            yield self.getEntry(i)
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnarEntries):
+            other = list(other)
+        return list(self) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __copy__(self):
+        # copy the arrays, so that appending to the copy (e.g. an orphan
+        # entry in ExperimentHandler.getAllEntries) leaves this one alone
+        dup = ColumnarEntries(capacity=self._capacity)
+        dup._nRows = self._nRows
+        for name, col in self._columns.items():
+            newCol = _Column.__new__(_Column)
+            newCol.kind = col.kind
+            newCol.values = col.values.copy()
+            newCol.present = col.present.copy()
+            dup._columns[name] = newCol
+        return dup
+
+    def copy(self):
+        return self.__copy__()
+
+    def _setValue(self, i, name, value):
+        col = self._columns.get(name)
+        if col is None:
+            col = self._columns[name] = _Column(_valueKind(value),
+                                                self._capacity)
+        col.set(i, value)
+
+    def append(self, entry):
+        """Add an entry to the end of the store.
+
+        Parameters
+        ----------
+        entry : dict
+            Mapping of column names to values for this row.
+        """
+        if self._nRows == self._capacity:
+            self._capacity *= 2
+            for col in self._columns.values():
+                col.grow(self._capacity)
+        i = self._nRows
+        self._nRows += 1
+        for name, value in entry.items():
+            self._setValue(i, name, value)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def getEntry(self, i):
+        """Get a single entry as a (new) dict.
+        """
+        i = self._checkIndex(i)
+        return {name: col.get(i)
+                for name, col in self._columns.items() if col.present[i]}
+
+    def getColumn(self, name):
+        """Get the values of one column.
+
+        Returns
+        -------
+        numpy.ndarray, numpy.ndarray
+            Array of values (one per entry, contents of missing cells are
+            undefined) and a boolean array of which entries have a value.
+        """
+        col = self._columns[name]
+        n = self._nRows
+        return col.values[:n], col.present[:n]
+
+    def toDataFrame(self, columns=None):
+        """Convert to a :class:`pandas.DataFrame`, one row per entry.
+
+        Missing cells are `nan` (or `<NA>` for int and bool columns, which
+        keep their dtype).
+
+        Parameters
+        ----------
+        columns : list[str] or None
+            Columns to include, in order. Columns which don't exist are
+            filled with `nan`. If None, all columns are included in the
+            order they were added.
+        """
+        if columns is None:
+            columns = self.columns
+        n = self._nRows
+        data = {}
+        for name in columns:
+            col = self._columns.get(name)
+            if col is None:
+                data[name] = np.full(n, np.nan)
+                continue
+            values = col.values[:n]
+            present = col.present[:n]
+            if present.all():
+                data[name] = values.copy()
+            elif col.kind == 'f':
+                data[name] = np.where(present, values, np.nan)
+            elif col.kind == 'i':
+                data[name] = pd.arrays.IntegerArray(
+                    np.where(present, values, 0), ~present)
+            elif col.kind == 'b':
+                data[name] = pd.arrays.BooleanArray(
+                    np.where(present, values, False), ~present)
+            else:
+                values = values.copy()
+                values[~present] = np.nan
+                data[name] = values
+
+        return pd.DataFrame(data, columns=list(columns), index=range(n))
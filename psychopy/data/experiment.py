@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import json
+import os
 import sys
 import copy
 import pickle
@@ -12,9 +13,12 @@ from psychopy import logging
 from psychopy.data.trial import TrialHandler2
 from psychopy.tools.filetools import (openOutputFile, genDelimiter,
                                       genFilenameFromDelimiter)
+from psychopy.tools.fileerrortools import handleFileCollision
 from psychopy.localization import _translate
 from .utils import checkValidFilePath
 from .base import _ComparisonMixin
+from .streaming import WideTextStream, formatWideTextRow
+from .columnar import ColumnarEntries
 
 
 class ExperimentHandler(_ComparisonMixin):
@@ -40,7 +44,9 @@ class ExperimentHandler(_ComparisonMixin):
                  sortColumns=False,
                  dataFileName='',
                  autoLog=True,
-                 appendFiles=False):
+                 appendFiles=False,
+                 streamWideText=False,
+                 columnarEntries=False):
         """
         :parameters:
 
@@ -82,6 +88,24 @@ class ExperimentHandler(_ComparisonMixin):
 
 
             autoLog : True (default) or False
+
+            streamWideText : True or False (default)
+                If True (and `saveWideText` is True), each entry is appended
+                to the csv file in a background thread as soon as
+                nextEntry() is called, rather than writing the whole file
+                when the handler is closed. The file then survives a crash
+                and the cost of each entry doesn't depend on how many have
+                come before it. Columns are written in the order they first
+                appear (`sortColumns` is ignored) and the header is fixed up
+                on close if new columns appeared partway through.
+
+            columnarEntries : True or False (default)
+                If True, completed entries are stored in a
+                :class:`~psychopy.data.columnar.ColumnarEntries` (one typed
+                numpy array per column) rather than a list of dicts. This
+                uses less memory for long experiments and makes
+                getDataFrame(), saveAsParquet() and saveAsFeather() much
+                faster. `entries` still behaves like a list of dicts.
         """
         self.loops = []
         self.loopsUnfinished = []
@@ -98,15 +122,22 @@ class ExperimentHandler(_ComparisonMixin):
         self.dataFileName = dataFileName
         self.sortColumns = sortColumns
         self.thisEntry = {}
-        self.entries = []  # chronological list of entries
+        # chronological list of entries
+        if columnarEntries:
+            self.entries = ColumnarEntries()
+        else:
+            self.entries = []
         self._paramNamesSoFar = []
         self.dataNames = ['thisRow.t', 'notes']  # names of all the data (eg. resp.keys)
+        self._dataNamesSet = set(self.dataNames)  # for fast lookup
         self.columnPriority = {
             'thisRow.t': constants.priority.CRITICAL - 1,
             'notes': constants.priority.MEDIUM - 1,
         }
         self.autoLog = autoLog
         self.appendFiles = appendFiles
+        self.streamWideText = streamWideText
+        self._wideTextStream = None  # created on the first nextEntry()
         self.status = constants.NOT_STARTED
 
         if dataFileName in ['', None]:
@@ -215,6 +246,18 @@ class ExperimentHandler(_ComparisonMixin):
 
         return names, vals
 
+    def _addDataName(self, name):
+        """Add a name to `dataNames` if it isn't already there, using a set
+        rather than searching the list.
+        """
+        names = getattr(self, '_dataNamesSet', None)
+        if names is None or len(names) != len(self.dataNames):
+            # dataNames was changed directly (or loaded from an old file)
+            names = self._dataNamesSet = set(self.dataNames)
+        if name not in names:
+            names.add(name)
+            self.dataNames.append(name)
+
     def addData(self, name, value, row=None, priority=None):
         """
         Add the data with a given name to the current experiment.
@@ -254,8 +297,7 @@ class ExperimentHandler(_ComparisonMixin):
             - EXCLUDE: Always at the end of the data file, actively marked as unimportant
 
         """
-        if name not in self.dataNames:
-            self.dataNames.append(name)
+        self._addDataName(name)
         # could just copy() every value, but not always needed, so check:
         try:
             hash(value)
@@ -384,8 +426,7 @@ class ExperimentHandler(_ComparisonMixin):
             Format in which to return time, see clock.Timestamp.resolve() for more info. Defaults to `float`.
         """
         # make sure the name is used when writing the datafile
-        if name not in self.dataNames:
-            self.dataNames.append(name)
+        self._addDataName(name)
         # tell win to record timestamp on flip
         win.timeOnFlip(self.thisEntry, name, format=format)
 
@@ -542,15 +583,56 @@ class ExperimentHandler(_ComparisonMixin):
             for n, name in enumerate(names):
                 this[name] = vals[n]
                 # make sure name is in data names
-                if name not in self.dataNames:
-                    self.dataNames.append(name)
+                self._addDataName(name)
         # add the extraInfo dict to the data
         if type(self.extraInfo) == dict:
             this.update(self.extraInfo)
         self.entries.append(this)
+        # append to data file if streaming
+        if self._streamingWideText():
+            self._writeToStream(this)
         # add new entry with its
         self.thisEntry = {}
 
+    def _streamingWideText(self):
+        """Whether entries should be streamed to the wide text file.
+        """
+        # handlers loaded from old .psydat files won't have this attribute
+        return (getattr(self, 'streamWideText', False) and self.saveWideText
+                and self.dataFileName not in ['', None])
+
+    def _getColumnNames(self):
+        """Names of all columns in the wide text file, in the order they
+        were added (loop params, data names then extraInfo).
+        """
+        names = self._getAllParamNames()
+        for name in self.dataNames:
+            if name not in names:
+                names.append(name)
+        # names from the extraInfo dictionary
+        names.extend(self._getExtraInfo()[0])
+
+        return names
+
+    def _writeToStream(self, entry):
+        """Queue an entry to be appended to the streamed wide text file,
+        opening the stream if this is the first entry.
+        """
+        if self._wideTextStream is None:
+            # columns known so far give the header a sensible order
+            self._wideTextStream = WideTextStream(
+                self.dataFileName + '.csv',
+                appendFile=self.appendFiles,
+                columns=self._getColumnNames())
+        self._wideTextStream.writeRow(entry)
+
+    def _closeStream(self):
+        """Finish writing the streamed wide text file (if any).
+        """
+        if getattr(self, '_wideTextStream', None) is not None:
+            self._wideTextStream.close()
+            self._wideTextStream = None
+
     def getAllEntries(self):
         """Fetches a copy of all the entries including a final (orphan) entry
         if that exists. This allows entries to be saved even if nextEntry() is
@@ -639,12 +721,7 @@ class ExperimentHandler(_ComparisonMixin):
                            fileCollisionMethod=fileCollisionMethod,
                            encoding=encoding)
 
-        names = self._getAllParamNames()
-        for name in self.dataNames:
-            if name not in names:
-                names.append(name)
-        # names from the extraInfo dictionary
-        names.extend(self._getExtraInfo()[0])
+        names = self._getColumnNames()
         if len(names) < 1:
             logging.error("No data was found, so data file may not look as expected.")
         # if sort columns not specified, use default from self
@@ -669,17 +746,7 @@ class ExperimentHandler(_ComparisonMixin):
 
         # write the data for each entry
         for entry in self.getAllEntries():
-            for name in names:
-                if name in entry:
-                    ename = str(entry[name])
-                    if ',' in ename or '\n' in ename:
-                        fmt = u'"%s"%s'
-                    else:
-                        fmt = u'%s%s'
-                    f.write(fmt % (entry[name], delim))
-                else:
-                    f.write(delim)
-            f.write('\n')
+            f.write(formatWideTextRow(names, entry, delim))
         if f != sys.stdout:
             f.close()
         logging.info('saved data to %r' % f.name)
@@ -707,9 +774,12 @@ class ExperimentHandler(_ComparisonMixin):
         # https://groups.google.com/d/msg/psychopy-dev/Z4m_UX88q8U/UGuh1eeyjMEJ
         savePickle = self.savePickle
         saveWideText = self.saveWideText
+        # an open file stream can't be pickled
+        wideTextStream = self._wideTextStream
 
         self.savePickle = False
         self.saveWideText = False
+        self._wideTextStream = None
 
         origEntries = self.entries
         self.entries = self.getAllEntries()
@@ -728,6 +798,7 @@ class ExperimentHandler(_ComparisonMixin):
         self.entries = origEntries  # revert list of completed entries post-save
         self.savePickle = savePickle
         self.saveWideText = saveWideText
+        self._wideTextStream = wideTextStream
 
     def getJSON(self, priorityThreshold=constants.priority.EXCLUDE+1):
         """
@@ -751,7 +822,7 @@ class ExperimentHandler(_ComparisonMixin):
         # get columns which meet threshold
         cols = [col for col in self.dataNames if self.getPriority(col) >= priorityThreshold]
         # convert just relevant entries to a DataFrame
-        trials = pd.DataFrame(self.entries, columns=cols).fillna(value="")
+        trials = self._entriesToDataFrame(self.entries, cols).fillna(value="")
         # put in context
         context = {
             'type': "trials_data",
@@ -762,6 +833,98 @@ class ExperimentHandler(_ComparisonMixin):
 
         return json.dumps(context, indent=True, allow_nan=False, default=str)
         
+    @staticmethod
+    def _entriesToDataFrame(entries, columns=None):
+        """Make a DataFrame from either a list of dicts or a
+        ColumnarEntries.
+        """
+        if isinstance(entries, ColumnarEntries):
+            return entries.toDataFrame(columns=columns)
+        return pd.DataFrame(entries, columns=columns)
+
+    def getDataFrame(self, columns=None):
+        """
+        Get all entries (including a final, orphan entry if there is one) as
+        a :class:`pandas.DataFrame`, one row per entry.
+
+        Parameters
+        ----------
+        columns : list[str] or None
+            Columns to include, in order. If None, uses the same columns (in
+            the same order) as would be saved by saveAsWideText.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The data, missing values are `nan`.
+        """
+        if columns is None:
+            columns = self._getColumnNames()
+            if self.sortColumns in ("alphabetical", "alpha", "a", True):
+                columns.sort()
+
+        return self._entriesToDataFrame(self.getAllEntries(), columns)
+
+    def saveAsParquet(self, fileName, fileCollisionMethod='rename'):
+        """Save all entries as an Apache Parquet file (requires
+        `pyarrow` or `fastparquet`).
+
+        Columns holding a mix of types, or values other than strings and
+        numbers, are saved as strings.
+
+        :Parameters:
+
+            fileName:
+                if extension is not specified, '.parquet' will be appended.
+
+            fileCollisionMethod:
+                Collision method passed to
+                :func:`~psychopy.tools.fileerrortools.handleFileCollision`
+        """
+        if not fileName.endswith('.parquet'):
+            fileName += '.parquet'
+        if os.path.exists(fileName):
+            fileName = handleFileCollision(fileName, fileCollisionMethod)
+        self._getTabularDataFrame().to_parquet(fileName)
+        logging.info('saved data to %r' % fileName)
+
+    def saveAsFeather(self, fileName, fileCollisionMethod='rename'):
+        """Save all entries as a Feather file (requires `pyarrow`).
+
+        Columns holding a mix of types, or values other than strings and
+        numbers, are saved as strings.
+
+        :Parameters:
+
+            fileName:
+                if extension is not specified, '.feather' will be appended.
+
+            fileCollisionMethod:
+                Collision method passed to
+                :func:`~psychopy.tools.fileerrortools.handleFileCollision`
+        """
+        if not fileName.endswith('.feather'):
+            fileName += '.feather'
+        if os.path.exists(fileName):
+            fileName = handleFileCollision(fileName, fileCollisionMethod)
+        self._getTabularDataFrame().to_feather(fileName)
+        logging.info('saved data to %r' % fileName)
+
+    def _getTabularDataFrame(self):
+        """Get a DataFrame of all entries in which every object column
+        holds only strings (or missing values), as columnar file formats
+        need a single type per column.
+        """
+        df = self.getDataFrame()
+        for name in df.columns:
+            col = df[name]
+            if col.dtype != object:
+                continue
+            present = col.notna()
+            if not col[present].map(type).eq(str).all():
+                df[name] = col.where(~present, col[present].astype(str))
+        return df
+
     def close(self):
         if self.dataFileName not in ['', None]:
             if self.autoLog:
@@ -769,7 +932,12 @@ class ExperimentHandler(_ComparisonMixin):
                 logging.debug(msg)
             if self.savePickle:
                 self.saveAsPickle(self.dataFileName)
-            if self.saveWideText:
+            if self._streamingWideText():
+                # write the final (orphan) entry, if any, then finish
+                if self.thisEntry:
+                    self._writeToStream(self.thisEntry)
+                self._closeStream()
+            elif self.saveWideText:
                 self.saveAsWideText(self.dataFileName + '.csv')
         self.abort()
         self.autoLog = False
@@ -782,6 +950,10 @@ class ExperimentHandler(_ComparisonMixin):
         script early you may want to tell the Handler not to save out
         the data files for this run. This is the method that allows you
         to do that.
+
+        If `streamWideText` is True, entries already written to the data
+        file are kept, but no further entries will be written.
         """
         self.savePickle = False
         self.saveWideText = False
+        self._closeStream()
@@ -7,7 +7,7 @@ import pickle
 import copy
 import warnings
 import numpy as np
-from pkg_resources import parse_version
+from packaging.version import parse as parse_version
 
 import psychopy
 from psychopy import logging
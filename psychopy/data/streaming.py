@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Incremental (streaming) writers for experiment data files.
+"""
+
+import os
+import queue
+import shutil
+import threading
+
+from psychopy import logging
+from psychopy.tools.filetools import (openOutputFile, genDelimiter,
+                                      genFilenameFromDelimiter)
+
+__all__ = ['WideTextStream', 'formatWideTextRow']
+
+
+def formatWideTextRow(names, entry, delim):
+    """Format a single entry as one line of a wide-format text file.
+
+    Parameters
+    ----------
+    names : list[str]
+        Column names, in the order they should be written.
+    entry : dict
+        Mapping of column names to values, columns missing from `entry` are
+        left blank.
+    delim : str
+        Delimiter to put after each value.
+
+    Returns
+    -------
+    str
+        The formatted line, including the trailing newline.
+    """
+    cells = []
+    for name in names:
+        if name in entry:
+            ename = str(entry[name])
+            if ',' in ename or '\n' in ename:
+                fmt = u'"%s"%s'
+            else:
+                fmt = u'%s%s'
+            cells.append(fmt % (entry[name], delim))
+        else:
+            cells.append(delim)
+    cells.append('\n')
+
+    return u''.join(cells)
+
+
+class WideTextStream:
+    """Append rows to a wide-format text file as they are completed.
+
+    Rows are handed to a background thread by :meth:`writeRow`, so the cost
+    on the calling thread is a shallow copy of the row and a queue put. The
+    background thread formats and writes rows in batches and flushes the file
+    each time the queue runs dry, so data on disk lags behind the experiment
+    by at most a few rows (useful for recovering data after a crash).
+
+    Columns are written in the order in which they are first seen. If new
+    columns appear after the header was written, the header is rewritten
+    when the stream is closed; rows written before the new column appeared
+    simply have fewer cells.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the file to write to. If no extension is given, one is
+        chosen from the delimiter (as in
+        :meth:`~psychopy.data.ExperimentHandler.saveAsWideText`).
+    delim : str
+        Delimiter, or 'auto' to choose one from the file extension.
+    appendFile : bool
+        If True, rows (and a header) are added to the end of an existing
+        file.
+    encoding : str
+        Encoding to write the file in.
+    fileCollisionMethod : str
+        Collision method passed to
+        :func:`~psychopy.tools.fileerrortools.handleFileCollision`
+    columns : list[str] or None
+        Columns known in advance, these will come first in the header.
+    """
+    def __init__(self,
+                 fileName,
+                 delim='auto',
+                 appendFile=False,
+                 encoding='utf-8-sig',
+                 fileCollisionMethod='rename',
+                 columns=None):
+        # resolve delimiter as in ExperimentHandler.saveAsWideText
+        delimOptions = {
+            'comma': ",",
+            'semicolon': ";",
+            'tab': "\t"
+        }
+        if delim == 'auto':
+            delim = genDelimiter(fileName)
+        elif delim in delimOptions:
+            delim = delimOptions[delim]
+        self.delim = delim
+        self.encoding = encoding
+        # open file
+        fileName = genFilenameFromDelimiter(fileName, delim)
+        self._file = openOutputFile(fileName, append=appendFile,
+                                    fileCollisionMethod=fileCollisionMethod,
+                                    encoding=encoding)
+        self.fileName = self._file.name
+        # columns, in order of first appearance, plus a set for fast lookup
+        self.columns = []
+        self._columnSet = set()
+        if columns is not None:
+            self._addColumns(columns)
+        # byte positions of the header, so it can be fixed up at close
+        self._headerStart = self._headerEnd = None
+        self._headerColumns = 0
+        self.nRows = 0
+        # start writer thread
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._writeLoop, daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self):
+        """Whether this stream has been closed."""
+        return self._closed
+
+    def _addColumns(self, names):
+        """Add any names not already known to the end of the column list.
+        """
+        for name in names:
+            if name not in self._columnSet:
+                self._columnSet.add(name)
+                self.columns.append(name)
+
+    def writeRow(self, entry, columns=None):
+        """Queue a row to be written to the file.
+
+        Parameters
+        ----------
+        entry : dict
+            Mapping of column names to values. A shallow copy is taken, so
+            the dict can be safely reused or cleared afterwards.
+        columns : list[str] or None
+            Optional ordering hint for any columns of this row not seen
+            before.
+        """
+        if self._closed:
+            raise RuntimeError(
+                "Cannot write to WideTextStream '%s' after it has been "
+                "closed." % self.fileName)
+        self._queue.put((dict(entry), columns))
+
+    def _writeLoop(self):
+        """Format and write queued rows until the stream is closed.
+        """
+        while True:
+            item = self._queue.get()
+            # drain whatever else is waiting so it's written as one batch
+            batch = [item]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = False
+            for item in batch:
+                if item is None:
+                    done = True
+                    continue
+                try:
+                    self._writeEntry(*item)
+                except Exception as err:
+                    logging.error(
+                        "Failed to write row to %s: %s" % (self.fileName, err))
+            try:
+                self._file.flush()
+            except Exception as err:
+                logging.error("Failed to flush %s: %s" % (self.fileName, err))
+            for item in batch:
+                self._queue.task_done()
+            if done:
+                return
+
+    def _writeEntry(self, entry, columns=None):
+        """Write a single entry (called from the writer thread).
+        """
+        if columns is not None:
+            self._addColumns(columns)
+        self._addColumns(entry)
+        # write the header before the first row
+        if self._headerStart is None:
+            self._headerStart = self._file.tell()
+            self._file.write(self._formatHeader())
+            self._headerEnd = self._file.tell()
+            self._headerColumns = len(self.columns)
+        self._file.write(formatWideTextRow(self.columns, entry, self.delim))
+        self.nRows += 1
+
+    def _formatHeader(self):
+        return u''.join(
+            u'%s%s' % (heading, self.delim) for heading in self.columns
+        ) + '\n'
+
+    def flush(self):
+        """Block until every row queued so far has been written to disk.
+        """
+        if not self._closed:
+            self._queue.join()
+
+    def close(self):
+        """Write any remaining rows, fix the header if needed and close the
+        file. Safe to call more than once.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._headerStart is None:
+            # nothing was written, still give the file a header
+            if self.columns:
+                with openOutputFile(self.fileName, append=True,
+                                    encoding=self.encoding) as f:
+                    f.write(self._formatHeader())
+        elif len(self.columns) > self._headerColumns:
+            self._rewriteHeader()
+        logging.info('saved data to %r' % self.fileName)
+
+    def _rewriteHeader(self):
+        """Replace the header line with one including all columns. Requires
+        a single copy of the file, which only happens once at close.
+        """
+        encoding = self.encoding
+        if self._headerStart > 0:
+            # only the start of the file gets a byte order mark
+            encoding = encoding.replace('-sig', '')
+        header = self._formatHeader().encode(encoding)
+        tmpName = self.fileName + '.tmp'
+        with open(self.fileName, 'rb') as src, open(tmpName, 'wb') as dst:
+            # anything before our header (e.g. when appending, or a BOM)
+            dst.write(src.read(self._headerStart))
+            dst.write(header)
+            src.seek(self._headerEnd)
+            shutil.copyfileobj(src, dst)
+        os.replace(tmpName, self.fileName)
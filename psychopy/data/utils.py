@@ -7,6 +7,7 @@
 
 import os
 import re
+import hashlib
 import ast
 import pickle
 import time, datetime
@@ -14,8 +15,10 @@ import numpy as np
 import pandas as pd
 
 from collections import OrderedDict
-from pkg_resources import parse_version
+from pathlib import Path
+from packaging.version import parse as parse_version
 
+import psychopy
 from psychopy import logging, exceptions
 from psychopy.tools.filetools import pathToString
 from psychopy.localization import _translate
@@ -213,6 +216,131 @@ def listFromString(val, excludeEmpties=False):
     return asList
 
 
+class ConditionsCache:
+    """Parsed conditions files, so that importing the same file again (e.g.
+    for each repeat of an inner loop, or each time an experiment is run) doesn't
+    mean parsing it again.
+
+    The most recently used files are kept in memory and every parsed file is
+    also saved as a pickle "sidecar" in the user cache folder. Both are keyed
+    on the absolute path of the file along with its modification time and size,
+    so an edited file is always parsed again. Conditions are stored pickled,
+    so each call gets its own copy which it is free to modify.
+
+    Parameters
+    ----------
+    maxEntries : int
+        How many files to keep in memory.
+    folder : str or Path or None
+        Where to save sidecar files, None for a "conditions" folder in
+        `prefs.paths['userCacheDir']`, or False not to save them at all.
+    """
+    _version = 1
+
+    def __init__(self, maxEntries=32, folder=None):
+        self.maxEntries = maxEntries
+        self.folder = folder
+        self.entries = OrderedDict()  # path -> (stamp, pickled conditions)
+
+    @staticmethod
+    def _stamp(fileName):
+        stat = os.stat(fileName)
+        return (psychopy.__version__, ConditionsCache._version,
+                stat.st_mtime_ns, stat.st_size)
+
+    def _sidecarFile(self, path):
+        folder = self.folder
+        if folder is False:
+            return None
+        if folder is None:
+            from psychopy import prefs
+            folder = Path(prefs.paths['userCacheDir']) / "conditions"
+        name = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+        return Path(folder) / (Path(path).stem + "_" + name + ".pkl")
+
+    def get(self, fileName):
+        """Get the conditions and field names of a file, or (None, None) if
+        it isn't in the cache or has changed since it was cached.
+        """
+        path = os.path.abspath(fileName)
+        try:
+            stamp = self._stamp(path)
+        except OSError:
+            return None, None
+        entry = self.entries.get(path)
+        if entry is None or entry[0] != stamp:
+            entry = self._load(path, stamp)
+            if entry is None:
+                return None, None
+            self._remember(path, entry)
+        else:
+            self.entries.move_to_end(path)
+
+        return pickle.loads(entry[1])
+
+    def put(self, fileName, trialList, fieldNames):
+        """Store the conditions and field names parsed from a file.
+        """
+        path = os.path.abspath(fileName)
+        try:
+            stamp = self._stamp(path)
+            pickled = pickle.dumps((trialList, fieldNames),
+                                   protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as err:
+            logging.debug("Not caching conditions of {}: {}".format(
+                fileName, err))
+            return
+        self._remember(path, (stamp, pickled))
+        self._save(path, stamp, pickled)
+
+    def clear(self):
+        """Forget all files held in memory (sidecar files are kept).
+        """
+        self.entries.clear()
+
+    def _remember(self, path, entry):
+        self.entries[path] = entry
+        self.entries.move_to_end(path)
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+    def _load(self, path, stamp):
+        sidecar = self._sidecarFile(path)
+        if sidecar is None or not sidecar.is_file():
+            return None
+        try:
+            with open(sidecar, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception as err:
+            logging.debug("Could not read conditions cache {}: {}".format(
+                sidecar, err))
+            return None
+        if (not isinstance(cached, dict) or cached.get('path') != path or
+                cached.get('stamp') != stamp):
+            return None
+        logging.debug("Read conditions of {} from {}".format(path, sidecar))
+        return stamp, cached['conditions']
+
+    def _save(self, path, stamp, pickled):
+        sidecar = self._sidecarFile(path)
+        if sidecar is None:
+            return
+        tmpFile = sidecar.with_suffix('.tmp')
+        try:
+            sidecar.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmpFile, 'wb') as f:
+                pickle.dump({'path': path, 'stamp': stamp,
+                             'conditions': pickled}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpFile, sidecar)
+        except OSError as err:
+            logging.debug("Could not save conditions cache {}: {}".format(
+                sidecar, err))
+
+
+_conditionsCache = ConditionsCache()
+
+
 def importConditions(fileName, returnFieldNames=False, selection=""):
     """Imports a list of conditions from an .xlsx, .csv, or .pkl file
 
@@ -248,6 +376,67 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
     - slice(-10, 2, None)  # the same as above
     - random(5) * 8  # five random vals 0-7
 
+    Parsed files are cached (see :class:`ConditionsCache`), so importing a
+    file which hasn't changed since it was last imported doesn't parse it
+    again.
+
+    """
+
+    if fileName in ['None', 'none', None]:
+        if returnFieldNames:
+            return [], []
+        return []
+    if not os.path.isfile(fileName):
+        raise exceptions.ConditionsImportError(
+            "Conditions file not found: %s" % fileName,
+            translated=_translate("Conditions file not found: %s") % fileName
+        )
+
+    trialList, fieldNames = _conditionsCache.get(fileName)
+    if trialList is None:
+        trialList, fieldNames = _readConditionsFile(fileName)
+        _conditionsCache.put(fileName, trialList, fieldNames)
+
+    # if we have a selection then try to parse it
+    if isinstance(selection, str) and len(selection) > 0:
+        selection = indicesFromString(selection)
+        if not isinstance(selection, slice):
+            for n in selection:
+                try:
+                    assert n == int(n)
+                except AssertionError:
+                    raise exceptions.ConditionsImportError(
+                        "importConditions() was given some `indices` but could not parse them",
+                        translated=_translate("importConditions() was given some `indices` but could not parse them")
+                    )
+
+    # the selection might now be a slice or a series of indices
+    if isinstance(selection, slice):
+        trialList = trialList[selection]
+    elif len(selection) > 0:
+        allConds = trialList
+        trialList = []
+        print(selection)
+        print(len(allConds))
+        for ii in selection:
+            trialList.append(allConds[int(ii)])
+
+    logging.exp('Imported %s as conditions, %d conditions, %d params' %
+                (fileName, len(trialList), len(fieldNames)))
+    if returnFieldNames:
+        return (trialList, fieldNames)
+    else:
+        return trialList
+
+
+def _readConditionsFile(fileName):
+    """Parse a conditions file, for :func:`importConditions`.
+
+    Returns
+    -------
+    tuple
+        The list of conditions (one dict per row) and the list of field
+        names, before any `selection` is applied.
     """
 
     def _attemptImport(fileName, sep=',', dec='.'):
@@ -306,16 +495,6 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
                     translated='Bad name: %s%s"%s"' % (name, os.linesep, translated)
                 )
 
-    if fileName in ['None', 'none', None]:
-        if returnFieldNames:
-            return [], []
-        return []
-    if not os.path.isfile(fileName):
-        raise exceptions.ConditionsImportError(
-            "Conditions file not found: %s" % fileName,
-            translated=_translate("Conditions file not found: %s") % fileName
-        )
-
     def pandasToDictList(dataframe):
         """Convert a pandas dataframe to a list of dicts.
         This helper function is used by csv or excel imports via pandas
@@ -471,36 +650,7 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
             translated=_translate('Your conditions file should be an xlsx, csv, dlm, tsv or pkl file')
         )
 
-    # if we have a selection then try to parse it
-    if isinstance(selection, str) and len(selection) > 0:
-        selection = indicesFromString(selection)
-        if not isinstance(selection, slice):
-            for n in selection:
-                try:
-                    assert n == int(n)
-                except AssertionError:
-                    raise exceptions.ConditionsImportError(
-                        "importConditions() was given some `indices` but could not parse them",
-                        translated=_translate("importConditions() was given some `indices` but could not parse them")
-                    )
-
-    # the selection might now be a slice or a series of indices
-    if isinstance(selection, slice):
-        trialList = trialList[selection]
-    elif len(selection) > 0:
-        allConds = trialList
-        trialList = []
-        print(selection)
-        print(len(allConds))
-        for ii in selection:
-            trialList.append(allConds[int(ii)])
-
-    logging.exp('Imported %s as conditions, %d conditions, %d params' %
-                (fileName, len(trialList), len(fieldNames)))
-    if returnFieldNames:
-        return (trialList, fieldNames)
-    else:
-        return trialList
+    return trialList, fieldNames
 
 
 def createFactorialTrialList(factors):
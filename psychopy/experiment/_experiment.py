@@ -17,6 +17,7 @@ The code that writes out a *_lastrun.py experiment file is (in order):
 """
 import collections
 import os
+import sys
 import codecs
 import xml.etree.ElementTree as xml
 from xml.dom import minidom
@@ -260,8 +261,16 @@ class Experiment:
         # then check the contents 1-by-1 from the Flow
         self.flow.integrityCheck()
 
-    def writeScript(self, expPath=None, target="PsychoPy", modular=True):
+    def writeScript(self, expPath=None, target="PsychoPy", modular=True,
+                    processes=1):
         """Write a PsychoPy script for the experiment
+
+        Python code in params is translated for a PsychoJS script by
+        `py2js.expression2js`, which remembers (and saves between sessions)
+        each translation, so only params which have changed since the
+        experiment was last compiled need translating again. Set `processes`
+        to translate those in parallel, using that many worker processes
+        (None for one per CPU).
         """
         # self.integrityCheck()
 
@@ -363,6 +372,11 @@ class Experiment:
         elif target == "PsychoJS":
             script.oneIndent = "  "  # use 2 spaces rather than python 4
 
+            py2js.loadCache()
+            if processes != 1:
+                py2js.expressions2js(self_copy._getCodeForJS(),
+                                     processes=processes)
+
             self_copy.settings.writeInitCodeJS(script, self_copy.psychopyVersion,
                                                localDateTime, modular)
 
@@ -430,8 +444,32 @@ class Experiment:
             # Reset loop controller ready for next call to writeScript
             self_copy.flow._resetLoopController()
 
+            py2js.saveCache()
+
         return script
 
+    def _getCodeForJS(self):
+        """Get the Python code in all params of the experiment which would be
+        translated to JS when writing a PsychoJS script.
+        """
+        paramSets = [self.settings.params]
+        for routine in self.routines.values():
+            paramSets.append(routine.params)
+            if isinstance(routine, Routine):
+                paramSets.extend(comp.params for comp in routine)
+        for entry in self.flow:
+            if isinstance(entry, LoopInitiator):
+                paramSets.append(entry.loop.params)
+        code = []
+        for params in paramSets:
+            for param in params.values():
+                if isinstance(param, Param):
+                    thisCode = param.getCodeForJS()
+                    if thisCode is not None:
+                        code.append(thisCode)
+
+        return code
+
     @property
     def _xml(self):
         # Create experiment root element
@@ -1114,102 +1152,14 @@ class Experiment:
         Interrogates each loop looking for conditions files and each
 
         """
-        join = os.path.join
-        abspath = os.path.abspath
         srcRoot = os.path.split(self.filename)[0]
-
-        def getPaths(filePath):
-            """Helper to return absolute and relative paths (or None)
-
-            :param filePath: str to a potential file path (rel or abs)
-            :return: dict of 'asb' and 'rel' paths or None
-            """
-            # Only construct paths if filePath is a string
-            if type(filePath) != str:
-              return None
-
-            thisFile = {}
-            # NB: Pathlib might be neater here but need to be careful
-            # e.g. on mac:
-            #    Path('C:/test/test.xlsx').is_absolute() returns False
-            #    Path('/folder/file.xlsx').relative_to('/Applications') gives error
-            #    but os.path.relpath('/folder/file.xlsx', '/Applications') correctly uses ../
-            if filePath in list(ft.defaultStim):
-                # Default/asset stim are a special case as the file doesn't exist in the usual path
-                thisFile['rel'] = thisFile['abs'] = "https://pavlovia.org/assets/default/" + ft.defaultStim[filePath]
-                thisFile['name'] = filePath
-                return thisFile
-            if len(filePath) > 2 and (filePath[0] == "/" or filePath[1] == ":")\
-                    and os.path.isfile(filePath):
-                thisFile['abs'] = filePath
-                thisFile['rel'] = os.path.relpath(filePath, srcRoot)
-                thisFile['name'] = Path(filePath).name
-                return thisFile
-            else:
-                thisFile['rel'] = filePath
-                thisFile['abs'] = os.path.normpath(join(srcRoot, filePath))
-                if "/" in filePath:
-                    thisFile['name'] = filePath.split("/")[-1]
-                else:
-                    thisFile['name'] = filePath
-                if len(thisFile['abs']) <= 256 and os.path.isfile(thisFile['abs']):
-                    return thisFile
-
-        def findPathsInFile(filePath):
-            """Recursively search a conditions file (xlsx or csv)
-             extracting valid file paths in any param/cond
-
-            :param filePath: str to a potential file path (rel or abs)
-            :return: list of dicts{'rel','abs'} of valid file paths
-            """
-            # Clean up filePath that cannot be eval'd
-            if filePath.startswith('$'):
-                try:
-                    filePath = filePath.strip('$')
-                    filePath = eval(filePath)
-                except NameError:
-                    # List files in directory and get condition files
-                    if 'xlsx' in filePath or 'xls' in filePath or 'csv' in filePath:
-                        # Get all xlsx and csv files
-                        expFolder = Path(self.filename).parent
-                        spreadsheets = []
-                        for pattern in ['*.xlsx', '*.xls', '*.csv', '*.tsv']:
-                            # NB potentially make this search recursive with
-                            # '**/*.xlsx' but then need to exclude 'data/*.xlsx'
-                            spreadsheets.extend(expFolder.glob(pattern))
-                        files = []
-                        for condFile in spreadsheets:
-                            # call the function recursively for each excel file
-                            files.extend(findPathsInFile(str(condFile)))
-                        return files
-
-            paths = []
-            # is it a file?
-            thisFile = getPaths(filePath)  # get the abs/rel paths
-            # does it exist?
-            if not thisFile:
-                return paths
-            # OK, this file itself is valid so add to resources
-            if thisFile not in paths:
-                paths.append(thisFile)
-            # does it look at all like an excel file?
-            if (not isinstance(filePath, str)
-                    or not os.path.splitext(filePath)[1] in ['.csv', '.xlsx',
-                                                             '.xls']):
-                return paths
-            conds = data.importConditions(thisFile['abs'])  # load the abs path
-            for thisCond in conds:  # thisCond is a dict
-                for param, val in list(thisCond.items()):
-                    if isinstance(val, str) and len(val):
-                        # only add unique entries (can't use set() on a dict)
-                        for thisFile in findPathsInFile(val):
-                            if thisFile not in paths:
-                                paths.append(thisFile)
-
-            return paths
+        scanner = _ResourceScanner(srcRoot)
+        getPaths = scanner.getPaths
+        findPathsInFile = scanner.findPathsInFile
 
         # Get resources for components
         compResources = []
+        compResourceKeys = set()
         handled = False
         for thisEntry in self.flow.getUniqueEntries():
             if thisEntry.getType() == 'Routine':
@@ -1229,15 +1179,17 @@ class Experiment:
                             # Survey IDs are a special case, they need adding verbatim, no path sanitizing
                             thisFile = {'surveyId': thisParam.val}
                         # then check if it's a valid path and not yet included
-                        if thisFile and thisFile not in compResources:
+                        if thisFile and _resourceKey(thisFile) not in compResourceKeys:
                             compResources.append(thisFile)
+                            compResourceKeys.add(_resourceKey(thisFile))
                         # if param updates on frame/repeat, check its init val too
                         if hasattr(thisParam, "updates") and thisParam.updates != "constant":
                             inits = getInitVals({paramName: thisParam})
                             thisFile = getPaths(inits[paramName].val)
                             # then check if it's a valid path and not yet included
-                            if thisFile and thisFile not in compResources:
+                            if thisFile and _resourceKey(thisFile) not in compResourceKeys:
                                 compResources.append(thisFile)
+                                compResourceKeys.add(_resourceKey(thisFile))
             elif isinstance(thisEntry, BaseStandaloneRoutine):
                 for paramName in thisEntry.params:
                     thisParam = thisEntry.params[paramName]
@@ -1250,15 +1202,17 @@ class Experiment:
                         # Survey IDs are a special case, they need adding verbatim, no path sanitizing
                         thisFile = {'surveyId': thisParam.val}
                     # then check if it's a valid path and not yet included
-                    if thisFile and thisFile not in compResources:
+                    if thisFile and _resourceKey(thisFile) not in compResourceKeys:
                         compResources.append(thisFile)
+                        compResourceKeys.add(_resourceKey(thisFile))
                     # if param updates on frame/repeat, check its init val too
                     if hasattr(thisParam, "updates") and thisParam.updates != "constant":
                         inits = getInitVals({paramName: thisParam})
                         thisFile = getPaths(inits[paramName].val)
                         # then check if it's a valid path and not yet included
-                        if thisFile and thisFile not in compResources:
+                        if thisFile and _resourceKey(thisFile) not in compResourceKeys:
                             compResources.append(thisFile)
+                            compResourceKeys.add(_resourceKey(thisFile))
             elif thisEntry.getType() == 'LoopInitiator' and "Stair" in thisEntry.loop.type:
                 url = 'https://lib.pavlovia.org/vendors/jsQUEST.min.js'
                 compResources.append({
@@ -1323,6 +1277,165 @@ class Experiment:
         return resources
 
 
+def _resourceKey(resource):
+    """Hashable equivalent of a resource dict, for finding duplicates"""
+    return tuple(sorted(resource.items()))
+
+
+class _ResourceScanner:
+    """Finds the files used by an experiment, for `Experiment.getResourceFiles`.
+
+    Whether a path is a file is answered from a listing of its folder, so each
+    folder is only listed once per scan rather than every path being checked
+    separately. The paths found in each conditions file (and each value in
+    them) are only looked for once per scan, and `data.importConditions` only
+    parses a file again if it has changed since it was last imported.
+
+    Parameters
+    ----------
+    srcRoot : str
+        Folder of the experiment, which relative paths are relative to.
+    """
+    # can a missing name in a folder listing be trusted to mean there's no
+    # such file, or might the file system match it with different case?
+    caseSensitive = sys.platform not in ('win32', 'darwin')
+
+    def __init__(self, srcRoot):
+        self.srcRoot = srcRoot
+        self._folders = {}  # folder -> names of the files in it
+        self._isFile = {}  # path -> whether it is a file
+        self._pathsInFile = {}  # value -> list of resources found in it
+        self._spreadsheets = None  # spreadsheets in the experiment folder
+
+    def isfile(self, filePath):
+        """Equivalent to `os.path.isfile`, but only lists each folder once."""
+        isFile = self._isFile.get(filePath)
+        if isFile is None:
+            folder, name = os.path.split(filePath)
+            names = self._folders.get(folder)
+            if names is None:
+                try:
+                    with os.scandir(folder or os.curdir) as entries:
+                        names = {entry.name for entry in entries
+                                 if entry.is_file()}
+                except OSError:
+                    names = set()
+                self._folders[folder] = names
+            if name in names:
+                isFile = True
+            elif self.caseSensitive:
+                isFile = False
+            else:
+                isFile = os.path.isfile(filePath)
+            self._isFile[filePath] = isFile
+        return isFile
+
+    def getPaths(self, filePath):
+        """Helper to return absolute and relative paths (or None)
+
+        :param filePath: str to a potential file path (rel or abs)
+        :return: dict of 'asb' and 'rel' paths or None
+        """
+        # Only construct paths if filePath is a string
+        if type(filePath) != str:
+            return None
+
+        thisFile = {}
+        # NB: Pathlib might be neater here but need to be careful
+        # e.g. on mac:
+        #    Path('C:/test/test.xlsx').is_absolute() returns False
+        #    Path('/folder/file.xlsx').relative_to('/Applications') gives error
+        #    but os.path.relpath('/folder/file.xlsx', '/Applications') correctly uses ../
+        if filePath in ft.defaultStim:
+            # Default/asset stim are a special case as the file doesn't exist in the usual path
+            thisFile['rel'] = thisFile['abs'] = "https://pavlovia.org/assets/default/" + ft.defaultStim[filePath]
+            thisFile['name'] = filePath
+            return thisFile
+        if len(filePath) > 2 and (filePath[0] == "/" or filePath[1] == ":")\
+                and self.isfile(filePath):
+            thisFile['abs'] = filePath
+            thisFile['rel'] = os.path.relpath(filePath, self.srcRoot)
+            thisFile['name'] = Path(filePath).name
+            return thisFile
+        else:
+            thisFile['rel'] = filePath
+            thisFile['abs'] = os.path.normpath(os.path.join(self.srcRoot, filePath))
+            if "/" in filePath:
+                thisFile['name'] = filePath.split("/")[-1]
+            else:
+                thisFile['name'] = filePath
+            if len(thisFile['abs']) <= 256 and self.isfile(thisFile['abs']):
+                return thisFile
+
+    def findPathsInFile(self, filePath):
+        """Recursively search a conditions file (xlsx or csv)
+         extracting valid file paths in any param/cond
+
+        :param filePath: str to a potential file path (rel or abs)
+        :return: list of dicts{'rel','abs'} of valid file paths
+        """
+        paths = self._pathsInFile.get(filePath)
+        if paths is None:
+            # a conditions file which refers to itself finds nothing more
+            self._pathsInFile[filePath] = []
+            paths = self._pathsInFile[filePath] = self._findPathsInFile(
+                filePath)
+        return list(paths)
+
+    def _findPathsInFile(self, filePath):
+        # Clean up filePath that cannot be eval'd
+        if filePath.startswith('$'):
+            try:
+                filePath = filePath.strip('$')
+                filePath = eval(filePath)
+            except NameError:
+                # List files in directory and get condition files
+                if 'xlsx' in filePath or 'xls' in filePath or 'csv' in filePath:
+                    files = []
+                    for condFile in self._getSpreadsheets():
+                        # call the function recursively for each excel file
+                        files.extend(self.findPathsInFile(str(condFile)))
+                    return files
+
+        paths = []
+        # is it a file?
+        thisFile = self.getPaths(filePath)  # get the abs/rel paths
+        # does it exist?
+        if not thisFile:
+            return paths
+        # OK, this file itself is valid so add to resources
+        paths.append(thisFile)
+        seen = {_resourceKey(thisFile)}
+        # does it look at all like an excel file?
+        if (not isinstance(filePath, str)
+                or not os.path.splitext(filePath)[1] in ['.csv', '.xlsx',
+                                                         '.xls']):
+            return paths
+        conds = data.importConditions(thisFile['abs'])  # load the abs path
+        for thisCond in conds:  # thisCond is a dict
+            for param, val in list(thisCond.items()):
+                if isinstance(val, str) and len(val):
+                    # only add unique entries
+                    for thisFile in self.findPathsInFile(val):
+                        key = _resourceKey(thisFile)
+                        if key not in seen:
+                            paths.append(thisFile)
+                            seen.add(key)
+
+        return paths
+
+    def _getSpreadsheets(self):
+        """All the spreadsheets in the experiment folder"""
+        if self._spreadsheets is None:
+            expFolder = Path(self.srcRoot)
+            self._spreadsheets = []
+            for pattern in ['*.xlsx', '*.xls', '*.csv', '*.tsv']:
+                # NB potentially make this search recursive with
+                # '**/*.xlsx' but then need to exclude 'data/*.xlsx'
+                self._spreadsheets.extend(expFolder.glob(pattern))
+        return self._spreadsheets
+
+
 class ExpFile(list):
     """An ExpFile is similar to a Routine except that it generates its code
     from the Flow of a separate, complete psyexp file.
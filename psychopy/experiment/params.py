@@ -385,6 +385,29 @@ class Param():
         # Return false if method has not returned yet
         return False, val
 
+    def getCodeForJS(self):
+        """
+        Get the Python code which writing this param in a PsychoJS script
+        translates to JS, or None if it isn't translated. Used to translate
+        all of an experiment's code up front (see `py2js.expressions2js`).
+        """
+        if self.valType in ['extendedStr', 'str', 'file', 'table']:
+            if isinstance(self.val, str):
+                valid, val = self.dollarSyntax()
+                if self.codeWanted and valid:
+                    return val
+        elif self.valType == 'code':
+            if not isinstance(self.val, str):
+                return repr(self.val)
+            if self.val.startswith("$") or self.val.startswith(r"\$"):
+                return self.val[1:]
+            return self.val
+        elif self.valType == 'list':
+            valid, val = self.dollarSyntax()
+            if isinstance(val, str):
+                return val.strip()
+        return None
+
     __nonzero__ = __bool__  # for python2 compatibility
 
 
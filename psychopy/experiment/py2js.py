@@ -10,12 +10,16 @@ to JS (ES6/PsychoJS)
 """
 
 import ast
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import astunparse
 import esprima
 from os import path
-from psychopy import logging
+import psychopy
+from psychopy import logging, prefs
 
 from io import StringIO
 from psychopy.experiment.py2js_transpiler import translatePythonToJavaScript
@@ -53,8 +57,16 @@ def unparse(tree):
     return v.getvalue()
 
 
-def expression2js(expr):
-    """Convert a short expression (e.g. a Component Parameter) Python to JS"""
+# Python expressions which have already been translated, and their JS, so
+# that params which haven't changed aren't translated again every time an
+# experiment is compiled (see `loadCache` and `saveCache`)
+_jsCache = {}
+_jsCacheChanged = False
+_jsCacheFile = None  # file the cache was last loaded from
+
+
+def _expression2js(expr):
+    """Translate an expression, raising an error if it isn't valid Python"""
 
     # if the code contains a tuple (anywhere), convert parenths to be list.
     # This now works for compounds like `(2*(4, 5))` where the inner
@@ -64,11 +76,7 @@ def expression2js(expr):
     try:
         syntaxTree = ast.parse(expr)
     except Exception:
-        try:
-            syntaxTree = ast.parse(str(expr))
-        except Exception as err:
-            logging.error(err)
-            return str(expr)
+        syntaxTree = ast.parse(str(expr))
 
     for node in ast.walk(syntaxTree):
         TupleTransformer().visit(node)  # Transform tuples to list
@@ -92,6 +100,148 @@ def expression2js(expr):
     return jsStr
 
 
+def _tryExpression2js(expr):
+    """Translate an expression, or return None if it isn't valid Python (run
+    in worker processes by `expressions2js`)"""
+    try:
+        return _expression2js(expr)
+    except Exception:
+        return None
+
+
+def _addToCache(expr, jsStr):
+    global _jsCacheChanged
+    _jsCache[expr] = jsStr
+    _jsCacheChanged = True
+
+
+def expression2js(expr):
+    """Convert a short expression (e.g. a Component Parameter) Python to JS"""
+    key = expr if isinstance(expr, str) else None
+    if key in _jsCache:
+        return _jsCache[key]
+    try:
+        jsStr = _expression2js(expr)
+    except Exception as err:
+        logging.error(err)
+        return str(expr)
+    if key is not None:
+        _addToCache(key, jsStr)
+    return jsStr
+
+
+def expressions2js(exprs, processes=1):
+    """Convert many short expressions Python to JS, as for `expression2js`.
+
+    Expressions which haven't been translated before can be translated in
+    parallel by a pool of worker processes, which is worthwhile for large
+    experiments where there are hundreds of them.
+
+    Parameters
+    ----------
+    exprs : list of str
+        Python expressions to translate.
+    processes : int or None
+        Number of worker processes to use, or None for one per CPU. If 1,
+        everything is translated in this process.
+
+    Returns
+    -------
+    list of str
+        The JS for each expression.
+    """
+    exprs = list(exprs)
+    todo = list(dict.fromkeys(
+        expr for expr in exprs
+        if isinstance(expr, str) and expr not in _jsCache))
+    if processes != 1 and len(todo) > 1:
+        nWorkers = processes or os.cpu_count() or 1
+        chunkSize = max(1, len(todo) // (4 * nWorkers))
+        with ProcessPoolExecutor(max_workers=nWorkers) as pool:
+            results = pool.map(_tryExpression2js, todo, chunksize=chunkSize)
+            for expr, jsStr in zip(todo, results):
+                if jsStr is not None:
+                    _addToCache(expr, jsStr)
+    # anything which couldn't be translated goes through the usual route,
+    # so the error gets logged
+    return [expression2js(expr) for expr in exprs]
+
+
+def _getCacheFile(filename=None):
+    if filename is None:
+        filename = Path(prefs.paths['userCacheDir']) / "py2jsCache.json"
+    return Path(filename)
+
+
+def loadCache(filename=None):
+    """Add translations saved by `saveCache` (in an earlier session) to the
+    cache used by `expression2js`. Translations saved by a different version
+    of PsychoPy are ignored, as the JS for an expression may have changed.
+
+    Parameters
+    ----------
+    filename : str, Path or None
+        File to load from, defaults to `py2jsCache.json` in the user's cache
+        folder. Loading the same file more than once does nothing.
+    """
+    global _jsCacheFile
+    filename = _getCacheFile(filename)
+    if filename == _jsCacheFile:
+        return
+    _jsCacheFile = filename
+    try:
+        with open(filename, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if data.get('version') != psychopy.__version__:
+        return
+    for expr, jsStr in data.get('expressions', {}).items():
+        _jsCache.setdefault(expr, jsStr)
+
+
+def saveCache(filename=None, maxEntries=20000):
+    """Save the translations in the cache used by `expression2js`, if any
+    have been added since it was last saved, so that they can be loaded by
+    `loadCache` in a later session.
+
+    Parameters
+    ----------
+    filename : str, Path or None
+        File to save to, defaults to `py2jsCache.json` in the user's cache
+        folder.
+    maxEntries : int
+        Only the most recently added translations, up to this many, are
+        saved.
+    """
+    global _jsCacheChanged
+    if not _jsCacheChanged:
+        return
+    filename = _getCacheFile(filename)
+    exprs = list(_jsCache)[-maxEntries:]
+    data = {'version': psychopy.__version__,
+            'expressions': {expr: _jsCache[expr] for expr in exprs}}
+    tmpName = filename.with_name(filename.name + '.tmp')
+    try:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmpName, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmpName, filename)
+    except OSError as err:
+        logging.warning("Couldn't save the py2js cache to {}: {}"
+                        .format(filename, err))
+        return
+    _jsCacheChanged = False
+
+
+def clearCache():
+    """Forget all translations held in memory by `expression2js`."""
+    global _jsCacheChanged, _jsCacheFile
+    _jsCache.clear()
+    _jsCacheChanged = False
+    _jsCacheFile = None
+
+
 def snippet2js(expr):
     """Convert several lines (e.g. a Code Component) Python to JS"""
     # for now this is just adding ';' onto each line ending so will fail on
@@ -5,9 +5,22 @@ import sys
 import glob
 from itertools import chain
 from psychopy import logging
-from . import eyetracker, listener
-from .manager import DeviceManager, deviceManager
-from .base import BaseDevice, BaseResponse, BaseResponseDevice
+from psychopy.tools.importtools import lazyImportsEnabled, makeLazyGetattr
+
+if lazyImportsEnabled():
+    # import these (and submodules such as listener) when first used (see
+    # psychopy.tools.importtools)
+    __getattr__ = makeLazyGetattr(__name__, {
+        'DeviceManager': '.manager',
+        'deviceManager': '.manager',
+        'BaseDevice': '.base',
+        'BaseResponse': '.base',
+        'BaseResponseDevice': '.base',
+    })
+else:
+    from . import eyetracker, listener
+    from .manager import DeviceManager, deviceManager
+    from .base import BaseDevice, BaseResponse, BaseResponseDevice
 
 try:
     from collections.abc import Iterable
@@ -156,6 +156,8 @@ class BaseDevice:
 class BaseResponseDevice(BaseDevice):
 
     responseClass = BaseResponse
+    # how often (s) a ListenerLoop should dispatch messages from this device, None to use the loop's refreshRate
+    pollInterval = None
 
     def __init__(self):
         # list to store listeners in
@@ -20,6 +20,7 @@ __all__ = [
     # 'CAMERA_MODE_PHOTO',
     'CAMERA_TEMP_FILE_VIDEO',
     'CAMERA_TEMP_FILE_AUDIO',
+    'CAMERA_STREAM_BUFFER_SECS',
     'CAMERA_API_AVFOUNDATION',
     'CAMERA_API_DIRECTSHOW',
     'CAMERA_API_VIDEO4LINUX2',
@@ -55,6 +56,8 @@ import os
 import os.path
 import sys
 import math
+import shutil
+import tempfile
 import uuid
 import threading
 import queue
@@ -107,6 +110,9 @@ CAMERA_LIB_NULL = u'Null'
 CAMERA_FRAMERATE_NOMINAL_NTSC = '30.000030'
 CAMERA_FRAMERATE_NTSC = 30.000030
 
+# seconds of video which may be waiting to be encoded when recording to disk
+CAMERA_STREAM_BUFFER_SECS = 2.0
+
 # FourCC and pixel format mappings, mostly used with AVFoundation to determine
 # the FFMPEG decoder which is most suitable for it. Please expand this if you
 # know any more!
@@ -400,6 +406,19 @@ class CameraInfo:
         )
 
 
+def _putLatestFrame(frameQueue, frameData):
+    """Put a frame into a queue, discarding any frames already waiting so 
+    only the most recent frame is kept.
+    """
+    try:
+        while True:
+            frameQueue.get_nowait()
+    except queue.Empty:
+        pass
+
+    frameQueue.put(frameData)
+
+
 class CameraInterface:
     """Base class providing an interface with a camera attached to the system.
 
@@ -433,6 +452,49 @@ class CameraInterface:
     def __init__(self, device):
         self._device = device
         self._mic = None
+        self._movieWriter = None
+
+    @property
+    def movieWriter(self):
+        """Movie writer frames are passed to by the capture thread while
+        recording (`~psychopy.tools.movietools.MovieFileWriter` or `None`).
+
+        If set, frames go straight from the capture thread to the writer as
+        they arrive, and only the most recent frame is kept for the main thread.
+        Otherwise, all frames are queued until pulled by `getFrames()`. Only
+        change this while not recording.
+
+        """
+        return self._movieWriter
+
+    @movieWriter.setter
+    def movieWriter(self, value):
+        self._movieWriter = value
+
+    def _streamFrame(self, colorData):
+        """Pass a frame to the movie writer, called by the capture thread.
+
+        Parameters
+        ----------
+        colorData : ArrayLike
+            RGB24 pixel data for the frame.
+
+        Returns
+        -------
+        bool
+            `True` if the frame was passed to the movie writer, `False` if there
+            is no movie writer.
+
+        """
+        movieWriter = self._movieWriter
+        if movieWriter is None:
+            return False
+
+        # blocks if the writer is behind, capture then drops frames at the
+        # camera rather than buffering them in memory
+        movieWriter.addFrame(colorData)
+
+        return True
 
     @staticmethod
     def getCameras():
@@ -584,6 +646,29 @@ class CameraInterfaceFFmpeg(CameraInterface):
 
     def _assertMediaPlayer(self):
         return self._playerThread is not None
+
+    def _streamFrame(self, frameImage):
+        """Pass a frame to the movie writer, called by the capture thread.
+
+        Parameters
+        ----------
+        frameImage : ffpyplayer.pic.Image
+            Image of the frame, only converted to pixel data if there is a
+            movie writer.
+
+        Returns
+        -------
+        bool
+            `True` if the frame was passed to the movie writer, `False` if there
+            is no movie writer.
+
+        """
+        if self._movieWriter is None:
+            return False
+
+        colorData = np.frombuffer(frameImage.to_bytearray()[0], dtype=np.uint8)
+
+        return super()._streamFrame(colorData)
     
     def _getCameraInfo(self):
         """Get camera information in the format expected by FFmpeg.
@@ -656,7 +741,8 @@ class CameraInterfaceFFmpeg(CameraInterface):
         self._exitEvent.clear()  # signal the thread to stop
         
         def _frameGetterAsync(videoCapture, frameQueue, exitEvent, recordEvent, 
-                              warmUpBarrier, recordingBarrier, audioCapture):
+                              warmUpBarrier, recordingBarrier, audioCapture,
+                              frameWriter):
             """Get frames from the camera stream asynchronously.
 
             Parameters
@@ -683,6 +769,10 @@ class CameraInterfaceFFmpeg(CameraInterface):
                 Microphone object to use for audio capture. This will be used to
                 synchronize the audio and video streams. If `None`, no audio
                 will be captured.
+            frameWriter : callable
+                Function to pass the image of each recorded frame to, returns
+                `True` if the frame was written to a movie file. If so, only
+                the most recent frame is kept in `frameQueue`.
 
             """           
             # warmup the stream, wait for metadata
@@ -728,7 +818,11 @@ class CameraInterfaceFFmpeg(CameraInterface):
                     if isRecording:
                         thisFrameAbsTime = videoCapture.get_pts()
                         if lastAbsTime < thisFrameAbsTime:
-                            frameQueue.put((frame, val, metadata))
+                            frameData = (frame, val, metadata)
+                            if frameWriter(frame[0]):
+                                _putLatestFrame(frameQueue, frameData)
+                            else:
+                                frameQueue.put(frameData)
                             lastAbsTime = thisFrameAbsTime
 
                 if recordEvent.is_set() and not isRecording:
@@ -839,7 +933,8 @@ class CameraInterfaceFFmpeg(CameraInterface):
                   self._enableEvent,
                   self._warmupBarrier,
                   self._recordBarrier,
-                  self._mic))
+                  self._mic,
+                  self._streamFrame))
         self._playerThread.daemon=True
         self._playerThread.start()
 
@@ -1132,7 +1227,8 @@ class CameraInterfaceOpenCV(CameraInterface):
         import cv2
         
         def _frameGetterAsync(videoCapture, frameQueue, exitEvent, recordEvent, 
-                              warmUpBarrier, recordingBarrier, audioCapture):
+                              warmUpBarrier, recordingBarrier, audioCapture,
+                              frameWriter):
             """Get frames asynchronously from the camera stream.
 
             Parameters
@@ -1157,6 +1253,10 @@ class CameraInterfaceOpenCV(CameraInterface):
                 Microphone object to use for audio capture. This will be used to
                 synchronize the audio and video streams. If `None`, no audio
                 will be captured.
+            frameWriter : callable
+                Function to pass the pixel data of each recorded frame to, 
+                returns `True` if the frame was written to a movie file. If so,
+                only the most recent frame is kept in `frameQueue`.
 
             """
             # poll interval is half the frame period, this makes sure we don't
@@ -1187,7 +1287,10 @@ class CameraInterfaceOpenCV(CameraInterface):
                         # color conversion is done in the thread here
                         colorData = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                         # colorData = frame
-                        frameQueue.put((colorData, 0.0, None))
+                        if frameWriter(colorData):
+                            _putLatestFrame(frameQueue, (colorData, 0.0, None))
+                        else:
+                            frameQueue.put((colorData, 0.0, None))
 
                 # check if we should start or stop recording
                 if recordEvent.is_set() and not isRecording:
@@ -1281,7 +1384,8 @@ class CameraInterfaceOpenCV(CameraInterface):
                   self._enableEvent,
                   self._warmUpBarrier,
                   self._recordBarrier,
-                  self._mic))
+                  self._mic,
+                  self._streamFrame))
         self._playerThread.daemon=True
         self._playerThread.start()
 
@@ -1480,6 +1584,13 @@ class Camera:
         safely ignored.
     name : str
         Label for the camera for logging purposes.
+    recordToDisk : bool
+        Encode frames to a movie file while recording, rather than keeping them
+        in memory until `save()` is called. Frames are passed straight from the
+        capture thread to a background encoder, so memory use does not grow
+        with the length of the recording and `save()` only needs to add the
+        audio track (if any). If the encoder falls behind by more than
+        `CAMERA_STREAM_BUFFER_SECS` of video, frames are dropped by the camera.
 
     Examples
     --------
@@ -1513,10 +1624,14 @@ class Camera:
 
         cam = Camera(0, frameRate=30, frameSize=(640, 480), cameraLib=u'opencv')
 
+    Long recordings should be encoded to disk as they are captured::
+
+        cam = Camera(0, recordToDisk=True)
+
     """
     def __init__(self, device=0, mic=None, cameraLib=u'ffpyplayer',
                  frameRate=None, frameSize=None, bufferSecs=4, win=None,
-                 name='cam'):
+                 name='cam', recordToDisk=False):
         # add attributes for setters
         self.__dict__.update(
             {'_device': None,
@@ -1742,6 +1857,9 @@ class Camera:
         
         # movie writer instance, this runs in a separate thread
         self._movieWriter = None
+        # encode frames while recording, to a temporary file until `save()`
+        self._recordToDisk = bool(recordToDisk)
+        self._streamFile = None
         # if we begin receiving frames, change this flag to `True`
         self._captureThread = None
         # self._audioThread = None
@@ -2023,6 +2141,9 @@ class Camera:
         if not self._isRecording:
             return 0
 
+        if self._movieWriter is not None:  # recording to disk
+            return self._movieWriter.totalFrames
+
         totalFramesBuffered = (
             len(self._captureFrames) + self._captureThread.framesWaiting)
         
@@ -2101,6 +2222,11 @@ class Camera:
         newFrames = self._captureThread.getFrames()
         if not newFrames:
             return False
+
+        if self._movieWriter is not None:
+            # frames are already being written to disk, keep the latest only
+            self._lastFrame = newFrames[-1]
+            return True
         
         # add frames the the buffer
         self._captureFrames.extend(newFrames)
@@ -2179,6 +2305,11 @@ class Camera:
         
         self._audioTrack = None
         self._lastFrame = None
+        self._captureFrames = []
+        self._discardStreamFile()
+
+        if self._recordToDisk:
+            self._openStreamWriter()
 
         # start recording audio if available
         if self._mic is not None:
@@ -2205,22 +2336,70 @@ class Camera:
         self._captureThread.disable()  # stop passing frames to queue
         self._enqueueFrame()
 
+        if self._movieWriter is not None:
+            # finish writing the frames which were waiting to be encoded
+            self._captureThread.movieWriter = None
+            self._movieWriter.close()
+            self._movieWriter = None
+
         # # stop audio recording if `mic` is available
         if self._mic is not None:
             self._audioTrack = self._mic.getRecording()
 
         self._isRecording = False
 
+    def _openStreamWriter(self):
+        """Open a movie writer for the capture thread to pass frames to while
+        recording, used if `recordToDisk=True`.
+        """
+        self._streamFile = os.path.join(
+            tempfile.gettempdir(),
+            "{}_video.mp4".format(uuid.uuid4().hex[:16]))
+        
+        logging.debug(
+            "Recording video to temporary file: {}".format(self._streamFile))
+
+        frameRate = self._cameraInfo.frameRate
+        self._movieWriter = movietools.MovieFileWriter(
+            filename=self._streamFile,
+            size=self._cameraInfo.frameSize,
+            fps=frameRate,
+            codec=None,
+            pixelFormat='rgb24',
+            encoderLib=self._cameraLib,
+            maxFramesWaiting=max(
+                int(CAMERA_STREAM_BUFFER_SECS * frameRate), 1))
+        self._movieWriter.open()
+        self._captureThread.movieWriter = self._movieWriter
+
+    def _discardStreamFile(self):
+        """Remove the temporary file of a recording which was written to disk 
+        but never saved.
+        """
+        if self._streamFile is None:
+            return
+
+        if os.path.exists(self._streamFile):
+            logging.warning(
+                "Discarding recording which was not saved: {}".format(
+                    self._streamFile))
+            os.remove(self._streamFile)
+
+        self._streamFile = None
+
     def close(self):
         """Close the camera.
 
         This will close the camera stream and free up any resources used by the
         device. If the camera is currently recording, this will stop the 
         recording, but will not discard any frames. You may still call `save()`
-        to save the frames to disk.
+        to save the frames to disk. The exception is a recording which was
+        encoded to disk (`recordToDisk=True`) and not saved yet, its temporary
+        file is deleted.
 
         """
         if self._captureThread is None:  # nop
+            self._discardStreamFile()
             return
 
         if not self._captureThread.isOpen():
@@ -2234,6 +2413,7 @@ class Camera:
 
         self._captureThread.close()
         self._captureThread = None
+        self._discardStreamFile()
 
     def save(self, filename, useThreads=True, mergeAudio=True, 
              encoderLib=None, encoderOpts=None):
@@ -2245,6 +2425,8 @@ class Camera:
 
         This is a slow operation and will block for some time depending on the 
         length of the video. This can be sped up by setting `useThreads=True`.
+        If the camera was created with `recordToDisk=True` the video has already
+        been encoded, so this only moves it into place and adds the audio track.
 
         Parameters
         ----------
@@ -2268,12 +2450,17 @@ class Camera:
             Options to pass to the encoder. This is a dictionary of options
             specific to the encoder library being used. See the documentation
             for `~psychopy.tools.movietools.MovieFileWriter` for more details.
+            Not used if the recording was already encoded to disk.
 
         """
         if self._isRecording:
             raise RuntimeError(
                 "Attempting to call `save()` before calling `stop()`.")
 
+        if self._streamFile is not None:  # already encoded while recording
+            self._saveStreamFile(filename, useThreads, mergeAudio)
+            return
+
         # check if a file exists at the given path, if so, delete it
         if os.path.exists(filename):
             msg = (
@@ -2357,6 +2544,43 @@ class Camera:
 
         self._lastVideoFile = filename  # remember the last video we saved
 
+    def _saveStreamFile(self, filename, useThreads=True, mergeAudio=True):
+        """Save a recording which was encoded to disk while recording, see
+        `save()`.
+        """
+        videoFileName = self._streamFile
+        self._streamFile = None
+
+        filename = os.path.abspath(filename)
+        if os.path.exists(filename):
+            logging.warning(
+                "Video file '{}' already exists, overwriting.".format(filename))
+            os.remove(filename)
+
+        if self._audioTrack is not None and mergeAudio:
+            audioFileName = videoFileName[:-len('_video.mp4')] + '_audio.wav'
+            logging.debug(
+                "Saving audio track to file: {}".format(audioFileName))
+            self._audioTrack.save(audioFileName, 'wav')
+
+            logging.debug("Merging audio and video tracks.")
+            movietools.addAudioToMovie(
+                filename,
+                videoFileName,
+                audioFileName,
+                useThreads=useThreads,
+                removeFiles=True)
+        else:
+            logging.debug("Saving video to file: {}".format(filename))
+            shutil.move(videoFileName, filename)
+            if self._audioTrack is not None:
+                audioFileName = filename + '.wav'
+                logging.debug(
+                    "Saving audio track to file: {}".format(audioFileName))
+                self._audioTrack.save(audioFileName, 'wav')
+
+        self._lastVideoFile = filename
+
     def _upload(self):
         """Upload video file to an online repository. Not implemented locally,
         needed for auto translate to JS.
@@ -2426,6 +2650,12 @@ class Camera:
     def __del__(self):
         """Try to cleanly close the camera and output file.
         """
+        # remove the temporary file of an unsaved recording
+        if getattr(self, '_streamFile', None) is not None:
+            try:
+                os.remove(self._streamFile)
+            except OSError:
+                pass
 
         if hasattr(self, '_captureThread'):
             if self._captureThread is not None:
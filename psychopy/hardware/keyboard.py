@@ -61,7 +61,7 @@ Example usage
 from __future__ import absolute_import, division, print_function
 
 import json
-from collections import deque
+from collections import deque, OrderedDict
 import sys
 import psychopy.clock
 from psychopy import logging
@@ -164,6 +164,136 @@ class KeyPress(BaseResponse):
         return self.name != other
 
 
+class _KeyResponseBuffer:
+    """Key presses received by a :class:`KeyboardDevice`, indexed by key name
+    and by whether or not they've been released.
+
+    Finding the presses wanted by `KeyboardDevice.getKeys()` only looks at
+    presses with the right name and release state, and clearing them only
+    removes those presses, so polling every frame doesn't get slower as
+    presses build up. Presses are kept in the order they were received, and
+    once there are more than `maxlen` the oldest are dropped.
+
+    A press which is received again (i.e. when the key is released) keeps its
+    place but is moved to the released presses. It behaves like a list for
+    iterating, indexing and `len()`.
+    """
+
+    def __init__(self, maxlen=defaultBufferSize):
+        self.maxlen = maxlen
+        self.clear()
+
+    def clear(self):
+        """Remove all key presses.
+        """
+        self._nextSeq = 0
+        self._items = OrderedDict()  # seq -> press, oldest first
+        self._seqs = {}  # id(press) -> seq
+        self._byName = {}  # value -> OrderedDict of seqs
+        self._byState = (OrderedDict(), OrderedDict())  # (pressed, released)
+
+    @staticmethod
+    def _isReleased(resp):
+        return getattr(resp, "duration", None) is not None
+
+    def append(self, resp):
+        """Add a key press, or update one which has already been added.
+        """
+        if id(resp) in self._seqs:
+            self.update(resp)
+            return
+        seq = self._nextSeq
+        self._nextSeq += 1
+        self._items[seq] = resp
+        self._seqs[id(resp)] = seq
+        self._byName.setdefault(resp.value, OrderedDict())[seq] = None
+        self._byState[self._isReleased(resp)][seq] = None
+        while len(self._items) > self.maxlen:
+            self._discard(next(iter(self._items)))
+
+    def extend(self, resps):
+        for resp in resps:
+            self.append(resp)
+
+    def update(self, resp):
+        """Move a key press to the released presses if it has been released
+        since it was added.
+        """
+        seq = self._seqs.get(id(resp))
+        if seq is None:
+            return
+        released = self._isReleased(resp)
+        if seq in self._byState[not released]:
+            del self._byState[not released][seq]
+            self._byState[released][seq] = None
+
+    def _discard(self, seq):
+        resp = self._items.pop(seq)
+        del self._seqs[id(resp)]
+        names = self._byName[resp.value]
+        del names[seq]
+        if not names:
+            del self._byName[resp.value]
+        for state in self._byState:
+            state.pop(seq, None)
+
+    def getKeys(self, keyList=None, ignoreKeys=None, released=True,
+                clear=True):
+        """Get the key presses matching the given criteria, oldest first.
+
+        Parameters
+        ----------
+        keyList : list or None
+            Names of the keys to get, or None for any key.
+        ignoreKeys : list or None
+            Names of keys not to get.
+        released : bool
+            Get the presses which have been released if True, or those which
+            are still down if False.
+        clear : bool
+            Remove the presses which are returned.
+
+        Returns
+        -------
+        list of KeyPress
+        """
+        state = self._byState[released]
+        if keyList:
+            if isinstance(keyList, str):
+                keyList = [keyList]
+            seqs = [seq for name in set(keyList)
+                    for seq in self._byName.get(name, ()) if seq in state]
+        else:
+            seqs = list(state)
+        if ignoreKeys:
+            if isinstance(ignoreKeys, str):
+                ignoreKeys = [ignoreKeys]
+            ignoreKeys = set(ignoreKeys)
+            seqs = [seq for seq in seqs
+                    if self._items[seq].value not in ignoreKeys]
+        # presses change state out of order, so sort back into arrival order
+        seqs.sort()
+        keys = [self._items[seq] for seq in seqs]
+        if clear:
+            for seq in seqs:
+                self._discard(seq)
+
+        return keys
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __getitem__(self, i):
+        return list(self._items.values())[i]
+
+    def __repr__(self):
+        return "<{} of {} key presses>".format(
+            type(self).__name__, len(self))
+
+
 def getKeyboards():
     """Get info about the available keyboards.
 
@@ -266,6 +396,21 @@ class KeyboardDevice(BaseResponseDevice, aliases=["keyboard"]):
         # initialisation recreates it
         KeyboardDevice._instance = None
 
+    @property
+    def responses(self):
+        """Key presses received and not yet cleared, as an indexed buffer (see
+        `getKeys`) which can be iterated and indexed like a list.
+        """
+        return self._responses
+
+    @responses.setter
+    def responses(self, value):
+        value = list(value)
+        if getattr(self, "_responses", None) is None:
+            self._responses = _KeyResponseBuffer()
+        self._responses.clear()
+        self._responses.extend(value)
+
     def __init__(self, device=-1, bufferSize=10000, waitForStart=False, clock=None, backend=None,
                  muteOutsidePsychopy=sys.platform != "linux"):
         """Create the device (default keyboard or select one)
@@ -295,6 +440,7 @@ class KeyboardDevice(BaseResponseDevice, aliases=["keyboard"]):
 
         """
         BaseResponseDevice.__init__(self)
+        self.responses.maxlen = bufferSize
         global havePTB
 
         # substitute None device for default device
@@ -472,37 +618,11 @@ class KeyboardDevice(BaseResponseDevice, aliases=["keyboard"]):
         """
         # dispatch messages
         self.dispatchMessages()
-        # filter
-        keys = []
-        toClear = []
-        for i, resp in enumerate(self.responses):
-            # start off assuming we want the key
-            wanted = True
-            # if we're waiting on release, only store if it has a duration
-            wasRelease = hasattr(resp, "duration") and resp.duration is not None
-            if waitRelease:
-                wanted = wanted and wasRelease
-            else:
-                wanted = wanted and not wasRelease
-            # if we're looking for a key list, only store if it's in the list
-            if keyList:
-                if resp.value not in keyList:
-                    wanted = False
-            # if we're ignoring some keys, never store if ignored
-            if ignoreKeys:
-                if resp.value in ignoreKeys:
-                    wanted = False
-            # if we got this far and the key is still wanted and not present, add it to output
-            if wanted and resp not in keys:
-                keys.append(resp)
-            # if clear=True, mark wanted responses as toClear
-            if wanted and clear:
-                toClear.append(i)
-        # pop any responses marked as to clear
-        for i in sorted(toClear, reverse=True):
-            self.responses.pop(i)
-
-        return keys
+        # get presses from the index, rather than checking every response
+        return self.responses.getKeys(
+            keyList=keyList, ignoreKeys=ignoreKeys, released=waitRelease,
+            clear=clear
+        )
 
     def dispatchMessages(self):
         if KeyboardDevice._backend == 'ptb':
@@ -566,6 +686,7 @@ class KeyboardDevice(BaseResponseDevice, aliases=["keyboard"]):
                         response = key
                         # calculate duration
                         key.duration = message['time'] - key.tDown - logging.defaultClock.getLastResetTime()
+                        self.responses.update(key)
                         # remove key from stillDown
                         self._keysStillDown.remove(key)
                         # stop processing keys as we're done
@@ -584,6 +705,7 @@ class KeyboardDevice(BaseResponseDevice, aliases=["keyboard"]):
                         response = key
                         # calculate duration
                         key.duration = message.time - key.tDown
+                        self.responses.update(key)
                         # remove key from stillDown
                         self._keysStillDown.remove(key)
                         # stop processing keys as we're done
@@ -746,8 +868,9 @@ class _KeyBuffer(object):
         # if no conditions then no need to loop through
         if not keyList and not waitRelease:
             keyPresses = list(self._keysStillDown)
+            stillDown = {(k.name, k.tDown) for k in keyPresses}
             for k in list(self._keys):
-                if not any(x.name == k.name and x.tDown == k.tDown  for x in keyPresses):
+                if (k.name, k.tDown) not in stillDown:
                     keyPresses.append(k)
             if clear:
                 self._keys = deque()
@@ -766,10 +889,12 @@ class _KeyBuffer(object):
                 continue
             keyPresses.append(keyPress)
 
-        # clear keys in a second step (not during iteration)
-        if clear:
-            for key in keyPresses:
-                self._keys.remove(key)
+        # clear keys in a second step (not during iteration), in one pass
+        # rather than removing each key separately
+        if clear and keyPresses:
+            cleared = {id(key) for key in keyPresses}
+            self._keys = deque(
+                key for key in self._keys if id(key) not in cleared)
 
         return keyPresses
 
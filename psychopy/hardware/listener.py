@@ -1,3 +1,6 @@
+import heapq
+import selectors
+import socket
 import sys
 import threading
 import time
@@ -9,25 +12,52 @@ class ListenerLoop(threading.Thread):
     Asynchonous execution loop to continuously poll a device for new messages. Not recommended if using listeners
     within an experiment.
 
+    Rather than dispatching every device and then sleeping, the loop waits until a device has something to
+    dispatch. Devices with a `fileno()` method (such as serial devices) are dispatched as soon as data arrives on
+    their file descriptor, other devices are dispatched every `pollInterval` seconds (if they define it) or every
+    `refreshRate` seconds (if not), each on their own schedule. A device's `dispatchMessages` method should read all
+    the data waiting on its file descriptor, otherwise it will be dispatched again straight away.
+
     Attributes
     ----------
     devices : list[BaseDevice]
-        Devices whose messages to dispatch on each iteration of the loop.
+        Devices whose messages to dispatch.
     refreshRate : float
-        How long to sleep inbetween iterations of the loop
+        How often (s) to dispatch devices which neither have a file descriptor nor define their own `pollInterval`
     maxTime : float
         Maximum time (s) which this loop is allowed to run for, after this time limit is reached the loop will end.
     """
     def __init__(self):
         self.devices = []
         # placeholder values for function params
-        self.refreshRate = self.maxTime = None
+        self._refreshRate = self.maxTime = None
         # set initial alive and active states
         self._alive = False
         self._active = False
+        # selectors to wait for device data with (or just to be woken, when paused), and a socket pair to wake the
+        # loop when devices or settings change
+        self._selector = selectors.DefaultSelector()
+        self._idleSelector = selectors.DefaultSelector()
+        self._wakeReader, self._wakeWriter = socket.socketpair()
+        for sock in (self._wakeReader, self._wakeWriter):
+            sock.setblocking(False)
+        self._selector.register(self._wakeReader, selectors.EVENT_READ)
+        self._idleSelector.register(self._wakeReader, selectors.EVENT_READ)
+        # heap of (time due, order, device, interval) for devices which are polled
+        self._deadlines = []
+        self._changed = True
         # initialise base Thread
         threading.Thread.__init__(self, target=self.dispatchLoop, daemon=True)
 
+    @property
+    def refreshRate(self):
+        return self._refreshRate
+
+    @refreshRate.setter
+    def refreshRate(self, value):
+        self._refreshRate = value
+        self._reschedule()
+
     def addDevice(self, device):
         """
         Add a device to this loop.
@@ -39,6 +69,7 @@ class ListenerLoop(threading.Thread):
         """
         if device not in self.devices:
             self.devices.append(device)
+            self._reschedule()
 
     def removeDevice(self, device):
         """
@@ -52,6 +83,7 @@ class ListenerLoop(threading.Thread):
         if device in self.devices:
             i = self.devices.index(device)
             self.devices.pop(i)
+            self._reschedule()
 
     def start(self):
         """
@@ -64,7 +96,7 @@ class ListenerLoop(threading.Thread):
         """
         # if already started, do nothing
         if self._alive:
-            self._active = True
+            self.resume()
             return
         # set alive state
         self._alive = True
@@ -91,8 +123,9 @@ class ListenerLoop(threading.Thread):
         # set alive status
         self._alive = False
         self._active = False
-        # sleep for 2 iterations so it has time to spin down
-        time.sleep(self.refreshRate * 2)
+        # wake the loop and give it time to spin down
+        self._wake()
+        self.join(timeout=self.refreshRate * 2)
         # return confirmation of thread's dead status
         return not threading.Thread.is_alive(self)
 
@@ -106,6 +139,7 @@ class ListenerLoop(threading.Thread):
             True if the loop was paused successfully
         """
         self._active = False
+        self._wake()
 
     def resume(self):
         """
@@ -117,29 +151,106 @@ class ListenerLoop(threading.Thread):
             True if the loop was resumed successfully
         """
         self._active = True
+        self._reschedule()
+
+    def _wake(self):
+        """
+        Interrupt the loop's wait, so it notices a change straight away.
+        """
+        try:
+            self._wakeWriter.send(b"\0")
+        except OSError:
+            # the socket buffer is full, so the loop is already due to wake
+            pass
+
+    def _reschedule(self):
+        """
+        Mark the devices as changed, so the loop works out again how to wait for each of them.
+        """
+        self._changed = True
+        self._wake()
+
+    def _schedule(self):
+        """
+        Register the file descriptor of each device which has one, and schedule the first poll of the rest.
+        """
+        self._changed = False
+        for key in list(self._selector.get_map().values()):
+            if key.data is not None:
+                self._selector.unregister(key.fileobj)
+        self._deadlines = []
+        now = time.perf_counter()
+        for n, device in enumerate(list(self.devices)):
+            hasFile = False
+            if hasattr(device, "fileno"):
+                try:
+                    self._selector.register(device.fileno(), selectors.EVENT_READ, device)
+                    hasFile = True
+                except (OSError, ValueError, KeyError) as err:
+                    # e.g. serial ports on Windows, or a file descriptor shared with another device
+                    logging.debug(
+                        "Can't wait for data from {}, polling it instead: {}".format(device, err)
+                    )
+            interval = getattr(device, "pollInterval", None)
+            if interval is None and not hasFile:
+                interval = self.refreshRate
+            if interval is not None:
+                heapq.heappush(self._deadlines, (now, n, device, interval))
+
+    def _getTimeout(self, startTime):
+        """
+        How long the loop can wait for data before a device is due to be polled or the loop times out.
+        """
+        timeout = None
+        if self._active and self._deadlines:
+            timeout = max(self._deadlines[0][0] - time.perf_counter(), 0)
+        if self.maxTime is not None:
+            remaining = max(self.maxTime - (time.time() - startTime), 0)
+            if timeout is None or remaining < timeout:
+                timeout = remaining
+        return timeout
 
     def dispatchLoop(self):
         """
-        Function to make continuous calls to the device for responses.
+        Function to dispatch messages from each device whenever it has data or is due to be polled.
         """
-        cont = self._alive
         startTime = time.time()
         # until something says otherwise, continue
-        while cont:
+        while self._alive:
             # work out whether to continue
-            cont = self._alive
-            if self.maxTime is not None:
-                cont &= time.time() - startTime < self.maxTime
+            if self.maxTime is not None and time.time() - startTime >= self.maxTime:
+                break
+            if self._changed:
+                self._schedule()
+            # wait for data from a device, or until a device is due to be polled (only waiting to be woken if
+            # paused)
+            selector = self._selector if self._active else self._idleSelector
+            for key, events in selector.select(self._getTimeout(startTime)):
+                if key.data is None:
+                    # woken up, so empty the socket
+                    try:
+                        while self._wakeReader.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                elif self._active:
+                    key.data.dispatchMessages()
             # only dispatch messages if not paused
-            if self._active:
-                # dispatch messages from devices
-                for device in self.devices:
-                    device.dispatchMessages()
+            if not self._active or self._changed:
+                continue
+            # dispatch messages from devices which are due to be polled
+            now = time.perf_counter()
+            while self._deadlines and self._deadlines[0][0] <= now:
+                due, n, device, interval = heapq.heappop(self._deadlines)
+                device.dispatchMessages()
+                # schedule next poll, without trying to catch up on any that were missed
+                due += interval
+                if due <= now:
+                    due = now + interval
+                heapq.heappush(self._deadlines, (due, n, device, interval))
             # if there are no more devices attached, stop
             if not len(self.devices):
                 self._active = False
-            # sleep for 10ms
-            time.sleep(self.refreshRate)
 
 
 # make a global instance of ListenerLoop so all listeners can share the same loop
@@ -169,7 +280,7 @@ class BaseListener:
         device : BaseDevice
             Device whose messages to dispatch on each iteration of the loop.
         refreshRate : float
-            How long to sleep inbetween iterations of the loop
+            How often (s) to poll devices which don't set their own `pollInterval` and can't be waited on.
         maxTime : float
             Maximum time (s) which this loop is allowed to run for, after this time limit is reached the loop will end.
 
@@ -20,9 +20,13 @@ from psychopy.tools import systemtools as st
 from serial.tools import list_ports
 from psychopy import logging
 import atexit
+import copy
+import threading
+import time
 import traceback
 import importlib
 import json
+from concurrent import futures
 from pathlib import Path
 
 __folder__ = Path(__file__).parent
@@ -87,6 +91,11 @@ class DeviceManager:
     devices = {}  # devices stored
     deviceAliases = {} # aliases lut to reference devices
     aliases = {}  # aliases to get device classes by
+    # profiles from getAvailableDevices, as device class -> (time found, profiles), and any searches
+    # still in progress, as device class -> Future
+    _availableDevices = {}
+    _availableDevicesSearches = {}
+    _availableDevicesLock = threading.Lock()
 
     with (__folder__ / "knownDevices.json").open("rb") as f:
         knownDevices = json.load(f)  # dict of known device classes
@@ -634,7 +643,7 @@ class DeviceManager:
         return list(DeviceManager.getInitialisedDevices(deviceClass))
 
     @staticmethod
-    def getAvailableDevices(deviceClass="*"):
+    def getAvailableDevices(deviceClass="*", parallel=False, timeout=None, maxAge=None):
         """
         Get all devices of a given type which are known by the operating system.
 
@@ -644,6 +653,19 @@ class DeviceManager:
             Full import path for the class, in PsychoPy, of the device. For example
             `psychopy.hardware.keyboard.Keyboard`. If given a list, will run iteratively for all
             items in the list.
+        parallel : bool
+            If given a list, look for each type of device at the same time (each in its own
+            thread) rather than one after another.
+        timeout : float, dict or None
+            Maximum time (s) to wait for the devices of each type, or a dict of device class to
+            timeout to give each type its own. Types which time out are left out of the results
+            (or if given a single type, a `concurrent.futures.TimeoutError` is raised), but the
+            search carries on in the background and its results are cached for the next call.
+            Implies `parallel`. None to wait as long as it takes.
+        maxAge : float or None
+            Use the devices found by a previous call if they were found less than this many
+            seconds ago, rather than looking again. None to always look again. Use
+            `clearAvailableDevices` to forget previous results, e.g. when a device is plugged in.
 
         Returns
         -------
@@ -655,10 +677,16 @@ class DeviceManager:
             deviceClass = DeviceManager.deviceClasses
         # if given multiple types, call for each
         if isinstance(deviceClass, (list, tuple)):
+            if parallel or timeout is not None:
+                return DeviceManager._getAvailableDevicesParallel(
+                    deviceClass, timeout=timeout, maxAge=maxAge
+                )
             devices = {}
             for thisClass in deviceClass:
                 try:
-                    devices[thisClass] = DeviceManager.getAvailableDevices(deviceClass=thisClass)
+                    devices[thisClass] = DeviceManager.getAvailableDevices(
+                        deviceClass=thisClass, maxAge=maxAge
+                    )
                 except NotImplementedError:
                     # ignore any NotImplementedErrors
                     pass
@@ -666,23 +694,150 @@ class DeviceManager:
 
         # if device class is an already registered alias, get the actual class str
         deviceClass = DeviceManager._resolveAlias(deviceClass)
-        # get device class
-        cls = DeviceManager._resolveClassString(deviceClass)
-        # make sure cass has a getAvailableDevices method
-        assert hasattr(cls, "getAvailableDevices"), (
-            f"Could not get available devices of type `{deviceClass}` as device class does not "
-            f"have a `getAvailableDevices` method."
+        # search for devices, in a thread if we might need to give up on it
+        search = DeviceManager._startAvailableDevicesSearch(
+            deviceClass, maxAge=maxAge, background=timeout is not None
         )
-        # use class method
-        devices = []
-        for profile in cls.getAvailableDevices():
-            # add device class
-            profile['deviceClass'] = deviceClass
-            # append
-            devices.append(profile)
+        if isinstance(timeout, dict):
+            timeout = timeout.get(deviceClass)
+
+        return copy.deepcopy(search.result(timeout))
+
+    @staticmethod
+    def _getAvailableDevicesParallel(deviceClasses, timeout=None, maxAge=None):
+        """
+        Get all devices of several types, looking for each type in its own thread.
+
+        See `getAvailableDevices` for parameters, returns a dict of device class to list of
+        profiles.
+        """
+        searches = {}
+        for thisClass in deviceClasses:
+            searches[thisClass] = DeviceManager._startAvailableDevicesSearch(
+                DeviceManager._resolveAlias(thisClass), maxAge=maxAge, background=True
+            )
+        # all searches started together, so each timeout is counted from now
+        start = time.monotonic()
+        devices = {}
+        for thisClass, search in searches.items():
+            classTimeout = timeout
+            if isinstance(timeout, dict):
+                classTimeout = timeout.get(
+                    thisClass, timeout.get(DeviceManager._resolveAlias(thisClass))
+                )
+            if classTimeout is not None:
+                classTimeout = max(start + classTimeout - time.monotonic(), 0)
+            try:
+                devices[thisClass] = copy.deepcopy(search.result(classTimeout))
+            except NotImplementedError:
+                # ignore any NotImplementedErrors
+                pass
+            except futures.TimeoutError:
+                logging.warning(
+                    f"Timed out looking for available devices of type `{thisClass}`, they will be "
+                    f"available from the cache once found."
+                )
 
         return devices
 
+    @staticmethod
+    def _startAvailableDevicesSearch(deviceClass, maxAge=None, background=False):
+        """
+        Start looking for available devices of a given type, unless devices found recently enough
+        are cached or a search is already in progress.
+
+        Parameters
+        ----------
+        deviceClass : str
+            Full import path for the class of the device (not an alias).
+        maxAge : float or None
+            Maximum age (s) of cached devices to use, None to not use them.
+        background : bool
+            If True, search in a new thread, otherwise search before returning.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future whose result is the list of profiles found.
+        """
+        with DeviceManager._availableDevicesLock:
+            cached = DeviceManager._availableDevices.get(deviceClass)
+            if (
+                    maxAge is not None and cached is not None
+                    and time.monotonic() - cached[0] <= maxAge
+            ):
+                search = futures.Future()
+                search.set_result(cached[1])
+                return search
+            # join in with any search already in progress
+            search = DeviceManager._availableDevicesSearches.get(deviceClass)
+            if search is not None:
+                return search
+            search = DeviceManager._availableDevicesSearches[deviceClass] = futures.Future()
+
+        if background:
+            threading.Thread(
+                target=DeviceManager._searchAvailableDevices, args=(deviceClass, search),
+                name=f"DeviceManager search for {deviceClass}", daemon=True
+            ).start()
+        else:
+            DeviceManager._searchAvailableDevices(deviceClass, search)
+
+        return search
+
+    @staticmethod
+    def _searchAvailableDevices(deviceClass, search):
+        """
+        Look for available devices of a given type, storing the results in the cache and setting
+        them as the result of a given Future.
+        """
+        try:
+            # get device class
+            cls = DeviceManager._resolveClassString(deviceClass)
+            # make sure cass has a getAvailableDevices method
+            assert hasattr(cls, "getAvailableDevices"), (
+                f"Could not get available devices of type `{deviceClass}` as device class does "
+                f"not have a `getAvailableDevices` method."
+            )
+            # use class method
+            devices = []
+            for profile in cls.getAvailableDevices():
+                # add device class
+                profile['deviceClass'] = deviceClass
+                # append
+                devices.append(profile)
+        except BaseException as err:
+            with DeviceManager._availableDevicesLock:
+                DeviceManager._availableDevicesSearches.pop(deviceClass, None)
+            search.set_exception(err)
+            return
+
+        with DeviceManager._availableDevicesLock:
+            DeviceManager._availableDevices[deviceClass] = (time.monotonic(), devices)
+            DeviceManager._availableDevicesSearches.pop(deviceClass, None)
+        search.set_result(devices)
+
+    @staticmethod
+    def clearAvailableDevices(deviceClass="*"):
+        """
+        Forget the available devices found by previous calls to `getAvailableDevices`, so they
+        are looked for again even if `maxAge` is given.
+
+        Parameters
+        ----------
+        deviceClass : str or list
+            Full import path (or alias) of the class of device to forget, or a list of them, or
+            "*" to forget all.
+        """
+        with DeviceManager._availableDevicesLock:
+            if deviceClass == "*":
+                DeviceManager._availableDevices.clear()
+                return
+            if not isinstance(deviceClass, (list, tuple)):
+                deviceClass = [deviceClass]
+            for thisClass in deviceClass:
+                DeviceManager._availableDevices.pop(DeviceManager._resolveAlias(thisClass), None)
+
     @staticmethod
     def closeAll():
         """Close all devices.
@@ -1,8 +1,11 @@
+import os
+import struct
 import sys
+import tempfile
 import time
+import weakref
 
 import numpy as np
-from psychtoolbox import audio as audio
 from psychopy import logging as logging, prefs
 from psychopy.localization import _translate
 from psychopy.constants import NOT_STARTED
@@ -31,6 +34,168 @@ class MicrophoneResponse(BaseResponse):
     pass
 
 
+class VoiceActivityResponse(BaseResponse):
+    """Voice onset (`value=True`) or offset (`value=False`) detected by 
+    `VoiceActivityDetector`, where `t` is when it happened and `rms` is the 
+    level of the first frame after it.
+    """
+    fields = ["t", "value", "rms"]
+
+    def __init__(self, t, value, rms=0.0):
+        BaseResponse.__init__(self, t, value)
+        self.rms = rms
+
+
+class VoiceActivityDetector:
+    """Incremental voice onset and offset detector for blocks of samples 
+    coming off an audio stream.
+
+    Samples are split into short frames, and the RMS level and zero-crossing
+    rate of every frame in a block are computed at once. A frame is voiced if 
+    its level is more than `onsetRatio` times the noise floor (and above 
+    `minLevel`) and its zero-crossing rate is below `maxZeroCrossingRate`, 
+    which rejects broadband noise such as clicks and hiss. The noise floor 
+    follows the level of unvoiced frames. Onset is reported once `onsetSecs` of
+    consecutive voiced frames are seen and offset once `offsetSecs` of 
+    consecutive unvoiced frames are seen, at the time of the first frame of 
+    each run. Only state about the current run is kept between blocks, so the
+    cost of each block only depends on its size.
+
+    Parameters
+    ----------
+    sampleRateHz : int
+        Sample rate of the stream in Hertz (Hz).
+    frameSecs : float
+        Length of each analysis frame in seconds.
+    onsetRatio : float
+        How many times louder than the noise floor a frame must be to be 
+        voiced.
+    minLevel : float
+        Minimum RMS level of a voiced frame, regardless of the noise floor.
+    maxZeroCrossingRate : float
+        Maximum proportion of samples in a voiced frame where the signal 
+        changes sign.
+    onsetSecs : float
+        Duration of voicing needed to report an onset.
+    offsetSecs : float
+        Duration of silence needed to report an offset.
+    noiseAdaptSecs : float
+        Time constant of the noise floor, in seconds of unvoiced frames.
+
+    """
+    def __init__(self, sampleRateHz=SAMPLE_RATE_48kHz, frameSecs=0.01,
+                 onsetRatio=4.0, minLevel=0.005, maxZeroCrossingRate=0.3,
+                 onsetSecs=0.03, offsetSecs=0.25, noiseAdaptSecs=1.0):
+        self._sampleRateHz = sampleRateHz
+        self._frameSize = max(int(round(frameSecs * sampleRateHz)), 1)
+        self.frameSecs = self._frameSize / sampleRateHz
+        self.onsetRatio = onsetRatio
+        self.minLevel = minLevel
+        self.maxZeroCrossingRate = maxZeroCrossingRate
+        self._onsetFrames = max(int(round(onsetSecs / self.frameSecs)), 1)
+        self._offsetFrames = max(int(round(offsetSecs / self.frameSecs)), 1)
+        # noise floor moves this far towards each unvoiced frame
+        self._noiseRate = min(self.frameSecs / noiseAdaptSecs, 1.0)
+        self.reset()
+
+    def reset(self):
+        """Start over, as at the beginning of a new recording.
+        """
+        self._leftover = np.zeros(0, dtype=np.float32)
+        self._samplesIn = 0
+        self._framesDone = 0  # frames analysed so far
+        self.noiseFloor = None  # set from the first block
+        self.isVoiced = False  # voice onset reported, but not offset
+        self._runVoiced = False  # whether frames of the current run are voiced
+        self._runStart = 0  # frame the current run started at
+        self._runRMS = 0.0  # level of the first frame of the current run
+
+    @property
+    def samplesIn(self):
+        """Number of samples passed to `process()` since the last `reset()` 
+        (`int`).
+        """
+        return self._samplesIn
+
+    def process(self, samples):
+        """Analyse the next block of samples from the stream.
+
+        Parameters
+        ----------
+        samples : ArrayLike
+            Samples with one column per channel (or a 1D array of mono 
+            samples). Channels are averaged.
+
+        Returns
+        -------
+        list[tuple]
+            Events detected, each a tuple of `(t, isOnset, rms)` where `t` is 
+            the time in seconds since the last `reset()`.
+
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        self._samplesIn += len(samples)
+        samples = np.concatenate((self._leftover, samples))
+        nFrames = len(samples) // self._frameSize
+        nUsed = nFrames * self._frameSize
+        self._leftover = samples[nUsed:]
+        if not nFrames:
+            return []
+
+        frames = samples[:nUsed].reshape(nFrames, self._frameSize)
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / \
+            self._frameSize
+
+        if self.noiseFloor is None:  # assume the start is quiet
+            self.noiseFloor = max(float(np.median(rms)), 1e-6)
+
+        voiced = ((rms > self.noiseFloor * self.onsetRatio) &
+                  (rms > self.minLevel) &
+                  (zcr < self.maxZeroCrossingRate))
+
+        # update the noise floor from unvoiced frames, as an exponential 
+        # moving average applied once for all of them
+        if not self.isVoiced:
+            noise = rms[~voiced]
+            if len(noise):
+                weight = 1.0 - (1.0 - self._noiseRate) ** len(noise)
+                self.noiseFloor = max(
+                    self.noiseFloor + weight * (noise.mean() - self.noiseFloor),
+                    1e-6)
+
+        # walk over runs of voiced/unvoiced frames, rather than every frame
+        events = []
+        changes = np.flatnonzero(voiced[1:] != voiced[:-1]) + 1
+        runStarts = np.concatenate(([0], changes))
+        runEnds = np.concatenate((changes, [nFrames]))
+        for start, end in zip(runStarts, runEnds):
+            isVoiced = bool(voiced[start])
+            if isVoiced != self._runVoiced:  # a new run begins
+                self._runVoiced = isVoiced
+                self._runStart = self._framesDone + start
+                self._runRMS = float(rms[start])
+            runLength = self._framesDone + end - self._runStart
+            if isVoiced and not self.isVoiced:
+                if runLength >= self._onsetFrames:
+                    self.isVoiced = True
+                    events.append(self._event(True))
+            elif not isVoiced and self.isVoiced:
+                if runLength >= self._offsetFrames:
+                    self.isVoiced = False
+                    events.append(self._event(False))
+
+        self._framesDone += nFrames
+
+        return events
+
+    def _event(self, isOnset):
+        return self._runStart * self.frameSecs, isOnset, self._runRMS
+
+
 class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
     """Class for recording audio from a microphone or input stream.
 
@@ -61,6 +226,13 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         out of memory. By default, the recording buffer is set to 24000 KB (or
         24 MB). At a sample rate of 48kHz, this will result in 62.5 seconds of
         continuous audio being recorded before the buffer is full.
+    policyWhenFull : str
+        What to do when the recording buffer is full, see `RecordingBuffer`.
+        Use 'spill' to append the buffer to a file on disk each time it fills,
+        for long recordings.
+    spillFile : str or None
+        File to spill recordings to if `policyWhenFull='spill'`. If `None`, a
+        temporary file is used.
     audioLatencyMode : int or None
         Audio latency mode to use, values range between 0-4. If `None`, the
         setting from preferences will be used. Using `3` (exclusive mode) is
@@ -122,7 +294,8 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
                  maxRecordingSize=24000,
                  policyWhenFull='warn',
                  audioLatencyMode=None,
-                 audioRunMode=0):
+                 audioRunMode=0,
+                 spillFile=None):
 
         if not _hasPTB:  # fail if PTB is not installed
             raise ModuleNotFoundError(
@@ -264,7 +437,8 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
             sampleRateHz=self._sampleRateHz,
             channels=self._channels,
             maxRecordingSize=maxRecordingSize,
-            policyWhenFull=policyWhenFull
+            policyWhenFull=policyWhenFull,
+            spillFile=spillFile
         )
 
         self._isStarted = False  # internal state
@@ -275,6 +449,11 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         # list to store listeners in
         self.listeners = []
 
+        # voice onset/offset detection, off unless `enableVoiceDetection()`
+        self._voiceDetector = None
+        self.voiceResponses = []  # detected in the current recording
+        self._voiceDispatched = 0  # number sent to listeners
+
     def findBestDevice(self, index, sampleRateHz, channels):
         """
         Find the closest match among the microphone profiles listed by psychtoolbox as valid.
@@ -619,6 +798,11 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         # reset the writing 'head'
         self._recording.seek(0, absolute=True)
 
+        if self._voiceDetector is not None:
+            self._voiceDetector.reset()
+        self.voiceResponses = []
+        self._voiceDispatched = 0
+
         # reset warnings
         # self._warnedRecBufferFull = False
 
@@ -745,6 +929,7 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
 
         """
         self._stream.close()
+        self._recording.close()
         logging.debug('Stream closed')
 
     def poll(self):
@@ -782,8 +967,80 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
 
         overruns = self._recording.write(audioData)
 
+        if self._voiceDetector is not None:
+            self._detectVoice(audioData, cStartTime)
+
         return overruns
 
+    def enableVoiceDetection(self, state=True, **kwargs):
+        """Detect voice onsets and offsets as samples are polled.
+
+        Each block of samples `poll()` pulls from the stream is passed to a 
+        `VoiceActivityDetector`. Detected onsets and offsets are added to 
+        `voiceResponses` as `VoiceActivityResponse` objects, and are sent to 
+        any listeners by `dispatchMessages()`. Times are on the clock used for
+        logging.
+
+        Parameters
+        ----------
+        state : bool
+            `True` to enable voice detection, `False` to disable it.
+        **kwargs
+            Options for `VoiceActivityDetector`, such as `onsetRatio` or
+            `offsetSecs`.
+
+        Examples
+        --------
+        End a trial on voice onset::
+
+            mic.enableVoiceDetection()
+            mic.start()
+            while not mic.isVoiced:
+                mic.poll()
+                win.flip()
+            rt = mic.voiceResponses[0].t - trialStartTime
+
+        """
+        if state:
+            self._voiceDetector = VoiceActivityDetector(
+                sampleRateHz=self._sampleRateHz, **kwargs)
+        else:
+            self._voiceDetector = None
+
+    @property
+    def isVoiced(self):
+        """`True` if voice detection is enabled and a voice onset has been 
+        detected since the last offset (`bool`).
+        """
+        return self._voiceDetector is not None and self._voiceDetector.isVoiced
+
+    def _detectVoice(self, audioData, cStartTime):
+        """Pass samples from the stream to the voice detector, and store any 
+        onsets or offsets found.
+
+        Parameters
+        ----------
+        audioData : ArrayLike
+            Samples from the stream.
+        cStartTime : float
+            Capture time of the first sample in `audioData`, from the stream.
+
+        """
+        from psychopy import clock
+
+        detector = self._voiceDetector
+        blockStart = detector.samplesIn / self._sampleRateHz
+        events = detector.process(audioData)
+        if not events:
+            return
+
+        # convert from stream time to the logging clock
+        clockOffset = logging.defaultClock.getTime() - clock.getTime()
+        for t, isOnset, rms in events:
+            response = VoiceActivityResponse(
+                cStartTime + (t - blockStart) + clockOffset, isOnset, rms)
+            self.voiceResponses.append(response)
+
     def getRecording(self):
         """Get audio data from the last microphone recording.
 
@@ -838,7 +1095,8 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
 
     def dispatchMessages(self):
         """
-        Dispatch current volume as a MicrophoneResponse object to any attached listeners.
+        Dispatch current volume as a MicrophoneResponse object to any attached listeners,
+        followed by any voice onsets/offsets detected since the last call.
         """
         # create a response object
         message = MicrophoneResponse(
@@ -848,6 +1106,15 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         # dispatch to listeners
         for listener in self.listeners:
             listener.receiveMessage(message)
+        # along with any voice onsets/offsets not yet sent
+        for message in self.voiceResponses[self._voiceDispatched:]:
+            for listener in self.listeners:
+                listener.receiveMessage(message)
+        self._voiceDispatched = len(self.voiceResponses)
+
+
+# size of the header written to the start of spill files
+_WAV_HEADER_SIZE = 44
 
 
 class RecordingBuffer:
@@ -879,12 +1146,22 @@ class RecordingBuffer:
         What to do when the recording buffer is full and cannot accept any more
         samples. If 'ignore', samples will be silently dropped and the `isFull`
         property will be set to `True`. If 'warn', a warning will be logged and
-        the `isFull` flag will be set. Finally, if 'error' the application will
-        raise an exception.
+        the `isFull` flag will be set. If 'error' the application will raise an 
+        exception. Finally, if 'spill' the buffer is appended to a WAV file on
+        disk (`spillFile`) and reused, so recordings can be any length while
+        memory use stays at `maxRecordingSize`.
+    spillFile : str or None
+        File to append samples to when `policyWhenFull='spill'`, which is a 
+        32-bit float WAV file of the whole recording once `flush()` has been
+        called. If `None`, a temporary file is used and removed on `close()`.
+        If a new recording is started while clips of the last one still map
+        this file, the new recording is spilled to a new file beside it (see
+        `spillFile`).
 
     """
     def __init__(self, sampleRateHz=SAMPLE_RATE_48kHz, channels=2,
-                 maxRecordingSize=24000, policyWhenFull='ignore'):
+                 maxRecordingSize=24000, policyWhenFull='ignore', 
+                 spillFile=None):
         self._channels = channels
         self._sampleRateHz = sampleRateHz
         self._maxRecordingSize = maxRecordingSize
@@ -895,13 +1172,21 @@ class RecordingBuffer:
         self._totalSamples = None  # set in `_allocRecBuffer`
 
         # check if the value is valid
-        if policyWhenFull not in ['ignore', 'warn', 'error']:
+        if policyWhenFull not in ['ignore', 'warn', 'error', 'spill']:
             raise ValueError("Invalid value for `policyWhenFull`.")
 
         self._policyWhenFull = policyWhenFull
         self._warnedRecBufferFull = False
         self._loops = 0
 
+        # file samples are spilled to, opened on first use
+        self._spillFileName = spillFile
+        self._spillFileRequested = spillFile
+        self._spillFileIsTemp = spillFile is None
+        self._spillFile = None
+        self._spilledSamples = 0  # samples written to the file
+        self._spillMaps = []  # weak references to maps of it used by clips
+
         self._allocRecBuffer()
 
     def _allocRecBuffer(self):
@@ -951,6 +1236,22 @@ class RecordingBuffer:
         """Is the recording buffer full (`bool`)."""
         return self._spaceRemaining <= 0
 
+    @property
+    def spillFile(self):
+        """Path to the file samples are spilled to (`str` or `None`). This is
+        `None` until samples have been spilled if no file was specified, and
+        differs from the file specified if clips of an earlier recording were
+        still using it when the current one started.
+        """
+        return self._spillFileName
+
+    @property
+    def spilledSamples(self):
+        """Number of samples from the current recording which are stored on 
+        disk rather than in the buffer (`int`).
+        """
+        return self._spilledSamples
+
     @property
     def totalSamples(self):
         """Total number samples the recording buffer can hold (`int`)."""
@@ -967,9 +1268,10 @@ class RecordingBuffer:
     def lastSample(self):
         """Index of the last sample recorded (`int`). This can be used to slice
         the recording buffer, only getting data from the beginning to place
-        where the last sample was written to.
+        where the last sample was written to. If samples have been spilled to 
+        disk, this counts those too.
         """
-        return self._lastSample
+        return self._spilledSamples + self._lastSample
 
     @property
     def loopCount(self):
@@ -1025,7 +1327,10 @@ class RecordingBuffer:
         if not absolute:
             self._offset += offset
         else:
-            self._offset = absolute
+            self._offset = offset
+            if offset == 0:  # new recording, discard anything spilled
+                self._lastSample = 0
+                self._truncateSpillFile()
 
         assert 0 <= self._offset < self._totalSamples
         self._spaceRemaining = self._totalSamples - self._offset
@@ -1047,6 +1352,10 @@ class RecordingBuffer:
 
         """
         nSamples = len(samples)
+        if self._policyWhenFull == 'spill':
+            self._writeSpill(samples)
+            return 0
+
         if self.isFull:
             if self._policyWhenFull == 'ignore':
                 return nSamples  # samples lost
@@ -1089,6 +1398,115 @@ class RecordingBuffer:
         d = nSamples - self._spaceRemaining
         return 0 if d < 0 else d
 
+    def _writeSpill(self, samples):
+        """Write samples to the buffer, spilling it to disk each time it 
+        fills.
+        """
+        nSamples = len(samples)
+        written = 0
+        while written < nSamples:
+            n = min(self._spaceRemaining, nSamples - written)
+            self._samples[self._offset:self._offset + n, :] = \
+                samples[written:written + n, :]
+            self._offset += n
+            self._lastSample = self._offset
+            self._spaceRemaining -= n
+            written += n
+            if self._spaceRemaining <= 0:
+                self.flush()
+
+    def _openSpillFile(self):
+        """Open the spill file and write a WAV header for it."""
+        if self._spillFileName is None:
+            fd, self._spillFileName = tempfile.mkstemp(
+                suffix='.wav', prefix='psychopy_recording_')
+            os.close(fd)
+
+        self._spillFile = open(self._spillFileName, 'wb+')
+        self._writeWavHeader()
+
+    def _writeWavHeader(self):
+        """Write (or update) the header of the spill file, which is a 32-bit 
+        float WAV file.
+        """
+        sampleBytes = self.sampleBytes
+        dataBytes = self._spilledSamples * self._channels * sampleBytes
+        header = struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + dataBytes, b'WAVE',
+            b'fmt ', 16, 3,  # WAVE_FORMAT_IEEE_FLOAT
+            self._channels, self._sampleRateHz,
+            self._sampleRateHz * self._channels * sampleBytes,
+            self._channels * sampleBytes, sampleBytes * 8,
+            b'data', dataBytes)
+
+        self._spillFile.seek(0)
+        self._spillFile.write(header)
+        self._spillFile.seek(0, os.SEEK_END)
+
+    def _truncateSpillFile(self):
+        """Discard all samples in the spill file."""
+        self._spilledSamples = 0
+        if self._spillFile is None:
+            return
+
+        # clips of the last recording may still map the file, so a temporary 
+        # file is replaced by a new one rather than truncated
+        self._spillFile.close()
+        self._spillFile = None
+        if self._spillFileIsTemp:
+            self._removeSpillFile()
+            self._spillFileName = None
+        elif any(ref() is not None for ref in self._spillMaps):
+            # keep the caller's file for those clips, write to one beside it
+            root, ext = os.path.splitext(self._spillFileRequested)
+            fd, self._spillFileName = tempfile.mkstemp(
+                suffix=ext, prefix=os.path.basename(root) + '_',
+                dir=os.path.dirname(os.path.abspath(root)))
+            os.close(fd)
+            logging.info(
+                "Spill file is still in use, spilling the new recording to "
+                "'{}'.".format(self._spillFileName))
+        # otherwise the caller's file is truncated when it's next opened
+        self._spillMaps = []
+
+    def _removeSpillFile(self):
+        try:
+            os.remove(self._spillFileName)
+        except OSError:  # still mapped on Windows, left for the OS to clean up
+            logging.debug(
+                "Could not remove file '{}'.".format(self._spillFileName))
+
+    def flush(self):
+        """Append samples in the buffer to the spill file and empty the 
+        buffer. Only used if `policyWhenFull='spill'`.
+        """
+        if self._policyWhenFull != 'spill' or not self._lastSample:
+            return
+
+        if self._spillFile is None:
+            self._openSpillFile()
+
+        self._spillFile.write(self._samples[:self._lastSample, :].tobytes())
+        self._spilledSamples += self._lastSample
+        self._writeWavHeader()
+        self._spillFile.flush()
+
+        self._offset = self._lastSample = 0
+        self._spaceRemaining = self._totalSamples
+
+    def close(self):
+        """Close the spill file, removing it if it's a temporary file."""
+        if self._spillFile is None:
+            return
+
+        self._spillFile.close()
+        self._spillFile = None
+        self._spilledSamples = 0
+        if self._spillFileIsTemp:
+            self._removeSpillFile()
+            self._spillFileName = None
+
     def clear(self):
         # reset all live attributes
         self._samples = None
@@ -1096,6 +1514,7 @@ class RecordingBuffer:
         self._lastSample = 0
         self._spaceRemaining = None
         self._totalSamples = None
+        self._truncateSpillFile()
         # reallocate buffer
         self._allocRecBuffer()
 
@@ -1113,13 +1532,35 @@ class RecordingBuffer:
         Returns
         -------
         AudioClip
-            Audio clip object with samples between `start` and `end`.
+            Audio clip object with samples between `start` and `end`. If any of
+            those samples have been spilled to disk, the clip's samples are a
+            memory-mapped view of the spill file and are only loaded as needed.
 
         """
         idxStart = int(start * self._sampleRateHz)
-        idxEnd = self._lastSample if end is None else int(
+        idxEnd = self.lastSample if end is None else int(
             end * self._sampleRateHz)
 
+        if self._spilledSamples:
+            if idxStart < self._spilledSamples:
+                # put everything on disk so the segment is contiguous
+                self.flush()
+                samples = np.memmap(
+                    self._spillFileName, dtype=np.float32, mode='r',
+                    offset=_WAV_HEADER_SIZE,
+                    shape=(self._spilledSamples, self._channels))
+                self._spillMaps = [
+                    ref for ref in self._spillMaps if ref() is not None]
+                self._spillMaps.append(weakref.ref(samples))
+
+                return AudioClip(
+                    samples[idxStart:idxEnd, :],
+                    sampleRateHz=self._sampleRateHz)
+
+            # segment is entirely within the buffer
+            idxStart -= self._spilledSamples
+            idxEnd -= self._spilledSamples
+
         return AudioClip(
             np.array(self._samples[idxStart:idxEnd, :],
                      dtype=np.float32, order='C'),
@@ -323,6 +323,17 @@ class SerialDevice(BaseDevice, AttributeGetSetMixin):
     def close(self):
         self.com.close()
 
+    def fileno(self):
+        """File descriptor of the open port, so that a
+        :class:`~psychopy.hardware.listener.ListenerLoop` can wait for data to
+        arrive rather than polling. Raises an OSError if the port isn't open
+        or can't be waited on (e.g. on Windows).
+        """
+        if self.com is None or not self.com.isOpen():
+            raise OSError("Serial port {} is not open".format(
+                getattr(self, 'portString', None)))
+        return self.com.fileno()
+
     def __del__(self):
         if self.com is not None:
             self.com.close()
@@ -10,6 +10,7 @@ import time
 import subprocess
 import json
 import signal
+from operator import itemgetter
 from weakref import proxy
 
 import psutil
@@ -27,6 +28,8 @@ from ..devices import DeviceEvent, import_device
 from ..devices.computer import Computer
 from ..devices.experiment import MessageEvent, LogEvent
 from ..constants import DeviceConstants, EventConstants
+from ..sharedevents import (SharedEventRing, sharedEventRingName,
+                            canShareEventType)
 from psychopy import constants
 
 getTime = Computer.getTime
@@ -292,6 +295,8 @@ class ioHubConnection():
         self._shutdown_attempted = False
         self._cv_order = None
         self._message_cache = []
+        # event type id -> SharedEventRing, when shared_memory_events is used
+        self._sharedEventRings = {}
         self.iohub_status = self._startServer(ioHubConfig, ioHubConfigAbsPath)
         if self.iohub_status != 'OK':
             raise RuntimeError('Error starting ioHub server: {}'.format(self.iohub_status))
@@ -374,6 +379,13 @@ class ioHubConnection():
                 self.allEvents.extend(events)
                 r = self.allEvents
             self.allEvents = []
+            if self._sharedEventRings:
+                shared_events = [list(e) for a in
+                                 self.getEventArrays().values()
+                                 for e in a.tolist()]
+                if shared_events:
+                    r.extend(shared_events)
+                    r.sort(key=itemgetter(DeviceEvent.EVENT_HUB_TIME_INDEX))
         else:
             r = self.devices.getDevice(device_label).getEvents()
 
@@ -395,6 +407,29 @@ class ioHubConnection():
 
         return []
 
+    def getEventArrays(self):
+        """Retrieve the events sent through shared memory since the last call
+        to getEventArrays(), getEvents() or clearEvents(), as numpy
+        structured arrays.
+
+        Only available when the iohub 'shared_memory_events' setting is True,
+        in which case events of types with only numeric fields (for example
+        eye samples and mouse events) are written by the ioHub Process
+        straight into shared memory. Reading them requires no request to the
+        ioHub Process and no conversion of individual events, so this is a
+        cheap way to get events from high rate devices every frame.
+
+        Returns:
+            dict: numpy structured array of events (with the event class's
+                  NUMPY_DTYPE) for each event type id with new events. Use
+                  EventConstants.getName() to get the name of an event type.
+        """
+        arrays = {}
+        for event_type, ring in self._sharedEventRings.items():
+            if len(ring):
+                arrays[event_type] = ring.read()
+        return arrays
+
     def clearEvents(self, device_label='all'):
         """Clears unread events from the ioHub Server's Event Buffer(s)
         so that unneeded events are not discarded.
@@ -421,6 +456,8 @@ class ioHubConnection():
         if device_label.lower() == 'all':
             self.allEvents = []
             self._sendToHubServer(('RPC', 'clearEventBuffer', [True, ]))
+            for ring in self._sharedEventRings.values():
+                ring.clear()
             try:
                 self.getDevice('keyboard')._clearLocalEvents()
             except:
@@ -428,6 +465,8 @@ class ioHubConnection():
         elif device_label in [None, '', False]:
             self.allEvents = []
             self._sendToHubServer(('RPC', 'clearEventBuffer', [False, ]))
+            for ring in self._sharedEventRings.values():
+                ring.clear()
             try:
                 self.getDevice('keyboard')._clearLocalEvents()
             except:
@@ -1097,6 +1136,8 @@ class ioHubConnection():
                 if ev.EVENT_TYPE_ID:
                     device_event_ids.append(ev.EVENT_TYPE_ID)
             EventConstants.addClassMappings(device_event_ids, evt_cls_list)
+            if self._iohub_server_config.get('shared_memory_events') is True:
+                self._attachSharedEventRings(device_event_ids)
 
             name_start = name.rfind('.')
             if name_start > 0:
@@ -1126,6 +1167,27 @@ class ioHubConnection():
             printExceptionDetailsToStdErr()
         return None
 
+    def _attachSharedEventRings(self, event_ids):
+        """Attach to the shared memory event buffers the ioHub Process
+        created for the given event types."""
+        for event_id in event_ids:
+            event_class = EventConstants.getClass(event_id)
+            if (event_id in self._sharedEventRings or event_class is None
+                    or not canShareEventType(event_class)):
+                continue
+            try:
+                self._sharedEventRings[event_id] = SharedEventRing(
+                    sharedEventRingName(Computer.current_process.pid, event_id),
+                    event_class.NUMPY_DTYPE)
+            except FileNotFoundError:
+                # event type is not monitored by the ioHub Process
+                pass
+
+    def _closeSharedEventRings(self):
+        while self._sharedEventRings:
+            _, ring = self._sharedEventRings.popitem()
+            ring.close()
+
     def _convertDict(self, d):
         r = {}
         for k, v in d.items():
@@ -1306,6 +1368,7 @@ class ioHubConnection():
                 pass
 
             self._shutdown_attempted = True
+            self._closeSharedEventRings()
             TimeoutError = psutil.TimeoutExpired
             try:
                 if self.udp_client:  # if it isn't already garbage-collected
@@ -55,6 +55,8 @@ class Constants:
             class: The ioHub class for the constant id provided.
 
         """
+        if cls._classes is None:
+            return None
         return cls._classes.get(cid, None)
 
     @classmethod
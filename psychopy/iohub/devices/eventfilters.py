@@ -3,8 +3,11 @@
 # Copyright (C) 2012-2020 iSolver Software Solutions (C) 2021 Open Science Tools Ltd.
 # Distributed under the terms of the GNU General Public License (GPL).
 
+import math
 import numpy as np
+from bisect import bisect_left, insort
 from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
 
 from ..util import NumPyRingBuffer
 from . import Device, DeviceEvent, Computer
@@ -140,9 +143,14 @@ class MovingWindowFilter():
 
     The base class implements a moving window averaging filter, no weights.
     To change the filter used, extend this class and replace the filteredValue
-    method.
+    method. Sub classes can also keep running state up to date as values
+    enter and leave the window by replacing _updateWindow, and filter a
+    whole block of values at once by replacing _filterWindows.
 
     """
+    # how many values to add between exact recalculations of the running sum,
+    # to stop rounding errors from building up
+    _resync_interval = 10000
 
     def __init__(self, **kwargs):
         self._inplace = kwargs.get('inplace')
@@ -177,6 +185,44 @@ class MovingWindowFilter():
             self._events = deque(maxlen=length)
 
         self._filtering_buffer = NumPyRingBuffer(length)
+        self._resetWindow()
+
+    def _resetWindow(self):
+        """Reset any running state kept about the window contents."""
+        self._window_sum = 0.0
+        self._nonfinite_count = 0
+        self._since_resync = 0
+
+    def _updateWindow(self, added, removed):
+        """Update running state after 'added' has been appended to the window
+        and 'removed' (None if the window was not yet full) has dropped out of
+        it. Values are as stored in the window (i.e. float32).
+
+        The base implementation keeps a running sum, so the mean of the
+        window costs O(1) per value rather than O(length).
+        """
+        if math.isfinite(added):
+            self._window_sum += added
+        else:
+            self._nonfinite_count += 1
+        if removed is not None:
+            if math.isfinite(removed):
+                self._window_sum -= removed
+            else:
+                self._nonfinite_count -= 1
+        self._since_resync += 1
+        if self._since_resync >= self._resync_interval:
+            elements = self._filtering_buffer.getElements()
+            self._window_sum = float(
+                np.sum(elements[np.isfinite(elements)], dtype=np.float64))
+            self._since_resync = 0
+
+    def _append(self, value):
+        """Append a value to the window, updating the running state."""
+        buff = self._filtering_buffer
+        removed = float(buff.getElements()[0]) if buff.isFull() else None
+        buff.append(value)
+        self._updateWindow(float(buff.getElements()[-1]), removed)
 
     def filteredValue(self):
         """Returns a filtered value based on the data in the window.
@@ -187,7 +233,15 @@ class MovingWindowFilter():
         types can be created.
 
         """
-        return self._filtering_buffer.mean()
+        if self._nonfinite_count or not self.isFull():
+            return self._filtering_buffer.mean()
+        return self._window_sum / self._filtering_buffer.max_size
+
+    def _filterWindows(self, windows):
+        """Returns the filtered value of each row of 'windows', a 2D array with
+        one window of values per row. Used by filterBlock.
+        """
+        return windows.mean(axis=1, dtype=np.float64)
 
     def add(self, event):
         """Add the given iohub event ( in list form ) to the moving window. The
@@ -200,7 +254,7 @@ class MovingWindowFilter():
 
         """
         if isinstance(event, (list, tuple)):
-            self._filtering_buffer.append(event[self._event_field_index])
+            self._append(event[self._event_field_index])
             self._events.append(event)
             if self.isFull():
                 if self._inplace:
@@ -209,15 +263,70 @@ class MovingWindowFilter():
                         self._event_field_index] = self.filteredValue()
                 return self._events[self._active_index], self.filteredValue()
         else:
-            self._filtering_buffer.append(event)
+            self._append(event)
             if self.isFull():
                 return None, self.filteredValue()
 
+    def filterBlock(self, events):
+        """Add a block of iohub events ( in list form ), or of values, to the
+        moving window in one go.
+
+        Gives the same results as calling add for each event in turn and
+        keeping the results which are not None, but the window is filtered
+        for all events at once using numpy rather than once per event.
+
+        Returns a list of the filtered events (None if values were given) and
+        an array of the filtered values, one per event added while the window
+        was full.
+
+        """
+        if not isinstance(events, np.ndarray):
+            events = list(events)
+        is_events = len(events) > 0 and isinstance(events[0], (list, tuple))
+        if is_events:
+            values = [e[self._event_field_index] for e in events]
+        else:
+            values = events
+        buff = self._filtering_buffer
+        length = buff.max_size
+        values = np.asarray(values, dtype=buff._dtype)
+        if values.size == 0:
+            return ([] if is_events else None), np.empty(0)
+
+        # values already in the window, followed by the new ones
+        nprior = len(buff)
+        data = np.concatenate((buff.getElements()[length - nprior:], values))
+        # skip the window made up only of values already in it
+        first = max(0, nprior - length + 1)
+        if len(data) < length:
+            filtered = np.empty(0)
+        else:
+            filtered = np.asarray(
+                self._filterWindows(sliding_window_view(data, length)[first:]))
+
+        filtered_events = None
+        if is_events:
+            prior_events = list(self._events)
+            all_events = prior_events[len(prior_events) - nprior:] + events
+            filtered_events = [all_events[first + i + self._active_index]
+                               for i in range(len(filtered))]
+            if self._inplace:
+                for e, v in zip(filtered_events, filtered):
+                    e[self._event_field_index] = v
+            self._events.extend(events)
+
+        # leave the window (and running state) as if each value was added
+        for v in values[-length:]:
+            self._append(v)
+
+        return filtered_events, filtered
+
     def isFull(self):
         return self._filtering_buffer.isFull()
 
     def clear(self):
         self._filtering_buffer.clear()
+        self._resetWindow()
         if self._events:
             self._events.clear()
 # ------
@@ -238,6 +347,9 @@ class PassThroughFilter(MovingWindowFilter):
     def filteredValue(self):
         return self._filtering_buffer[0]
 
+    def _filterWindows(self, windows):
+        return windows[:, 0]
+
 # ------
 
 
@@ -246,13 +358,43 @@ class MedianFilter(MovingWindowFilter):
 
     Length must be odd.
 
+    A sorted copy of the window is kept up to date as values are added, so
+    the median is found with two binary searches per value rather than by
+    sorting the window each time.
+
     """
 
     def __init__(self, **kwargs):
         MovingWindowFilter.__init__(self, **kwargs)
 
+    def _resetWindow(self):
+        MovingWindowFilter._resetWindow(self)
+        self._sorted_window = []
+
+    def _updateWindow(self, added, removed):
+        # nan can't be ordered, so is counted rather than stored
+        if removed is not None:
+            if removed != removed:
+                self._nonfinite_count -= 1
+            else:
+                del self._sorted_window[
+                    bisect_left(self._sorted_window, removed)]
+        if added != added:
+            self._nonfinite_count += 1
+        else:
+            insort(self._sorted_window, added)
+
     def filteredValue(self):
-        return np.median(self._filtering_buffer.getElements())
+        if self._nonfinite_count or not self.isFull():
+            return np.median(self._filtering_buffer.getElements())
+        window = self._sorted_window
+        mid = len(window) // 2
+        if len(window) % 2:
+            return window[mid]
+        return (window[mid - 1] + window[mid]) / 2.0
+
+    def _filterWindows(self, windows):
+        return np.median(windows, axis=1)
 
 # ------
 
@@ -274,12 +416,21 @@ class WeightedAverageFilter(MovingWindowFilter):
         MovingWindowFilter.__init__(self, **kwargs)
         weights = np.asanyarray(weights)
         self._weights = weights / np.sum(weights)
+        # np.convolve flips the weights, so flip them once up front and
+        # filter each window with a dot product
+        self._kernel = np.ascontiguousarray(self._weights[::-1],
+                                            dtype=np.float64)
+
+    def _updateWindow(self, added, removed):
+        # the window itself is the filter state, nothing else to keep
+        pass
 
     def filteredValue(self):
-        return np.convolve(
-            self._filtering_buffer.getElements(),
-            self._weights,
-            'valid')
+        return float(np.dot(self._filtering_buffer.getElements(),
+                            self._kernel))
+
+    def _filterWindows(self, windows):
+        return windows @ self._kernel
 
 
 # ------
@@ -328,6 +479,20 @@ class StampFilter(MovingWindowFilter):
                 self._events.append(event)
         return MovingWindowFilter.add(self, event)
 
+    def filterBlock(self, events):
+        # levels feed into each other one value at a time, so no shortcut here
+        events = list(events)
+        filtered_events = []
+        filtered = []
+        for event in events:
+            result = self.add(event)
+            if result:
+                filtered_events.append(result[0])
+                filtered.append(result[1])
+        if not (events and isinstance(events[0], (list, tuple))):
+            filtered_events = None
+        return filtered_events, np.asarray(filtered)
+
 # ------
 
 #################### TEST ###############################
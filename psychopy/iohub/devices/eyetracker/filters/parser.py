@@ -131,6 +131,7 @@ Data is filtered once, similar to what a 'normal' filter level would be in the
   setting of eyelink<tm>.
 """
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from ....constants import EventConstants
 from ....errors import print2err
 from ... import DeviceEvent, eventfilters
@@ -151,6 +152,42 @@ LEFT_EYE = 1
 RIGHT_EYE = 2
 BOTH_EYE = 3
 
+# fields of the arrays returned by EyeTrackerEventParser.parseSampleArray
+PARSED_EVENT_DTYPE = np.dtype([
+    ('type', np.uint8),  # FIXATION_END, SACCADE_END or BLINK_END
+    ('start_index', np.int64),
+    ('end_index', np.int64),
+    ('start_time', np.float64),
+    ('end_time', np.float64),
+    ('duration', np.float64),
+    ('start_gaze_x', np.float64),
+    ('start_gaze_y', np.float64),
+    ('end_gaze_x', np.float64),
+    ('end_gaze_y', np.float64),
+    ('average_gaze_x', np.float64),
+    ('average_gaze_y', np.float64),
+    ('amplitude', np.float64),
+    ('average_pupil_measure1', np.float64),
+    ('average_velocity_xy', np.float64),
+    ('peak_velocity_xy', np.float64),
+])
+
+PARSED_SAMPLE_DTYPE = np.dtype([
+    ('time', np.float64),
+    ('status', np.int64),
+    ('gaze_x', np.float64),
+    ('gaze_y', np.float64),
+    ('angle_x', np.float64),
+    ('angle_y', np.float64),
+    ('pupil_measure1', np.float64),
+    ('velocity_x', np.float64),
+    ('velocity_y', np.float64),
+    ('velocity_xy', np.float64),
+    ('velocity_threshold_x', np.float64),
+    ('velocity_threshold_y', np.float64),
+    ('category', np.uint8),  # type of the event the sample belongs to
+])
+
 
 class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
 
@@ -183,7 +220,7 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
             pos_filter_class, pos_filter_kwargs = eventfilters.PassThroughFilter, {}
 
         if velocity_filter:
-            vel_filter_class_name = position_filter.get(
+            vel_filter_class_name = velocity_filter.get(
                 'name', 'PassThroughFilter')
             vel_filter_class = getattr(eventfilters, vel_filter_class_name)
             del velocity_filter['name']
@@ -191,13 +228,25 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
         else:
             vel_filter_class, vel_filter_kwargs = eventfilters.PassThroughFilter, {}
 
+        # filter settings for parseSampleArray, which makes its own filters
+        self._offline_position_filter = pos_filter_class, dict(pos_filter_kwargs)
+        self._offline_velocity_filter = vel_filter_class, dict(vel_filter_kwargs)
+
         self.adaptive_x_vthresh_buffer = np.zeros(
-            self.vel_thresh_history_dur * sampling_rate)
+            int(self.vel_thresh_history_dur * sampling_rate))
         self.x_vthresh_buffer_index = 0
         self.adaptive_y_vthresh_buffer = np.zeros(
-            self.vel_thresh_history_dur * sampling_rate)
+            int(self.vel_thresh_history_dur * sampling_rate))
         self.y_vthresh_buffer_index = 0
 
+        if EventConstants.getClass(MONOCULAR_EYE_SAMPLE) is None:
+            # not running in iohub (e.g. created to use parseSampleArray), so
+            # the event class the field filters look up isn't registered yet
+            from ..eye_events import MonocularEyeSampleEvent
+            EventConstants.addClassMappings(
+                [MONOCULAR_EYE_SAMPLE],
+                {'MonocularEyeSampleEvent': MonocularEyeSampleEvent})
+
         pos_filter_kwargs['event_type'] = MONOCULAR_EYE_SAMPLE
         pos_filter_kwargs['inplace'] = True
         pos_filter_kwargs['event_field_name'] = 'angle_x'
@@ -443,6 +492,186 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
                 vthresh_values.append(np.NaN)
         return vthresh_values
 
+    def parseSampleArray(self, samples, velocity_threshold=None,
+                         adaptive_vel_thresh_history=None,
+                         threshold_update_interval=0.25,
+                         return_samples=False):
+        """Offline version of the parser, for a whole recording at once.
+
+        Classifies a numpy structured array of monocular or binocular eye
+        samples (for example as read from the eye sample tables of an
+        iohub hdf5 file) into fixations, saccades and blinks. Each step the
+        online parser does one sample at a time (conversion to monocular
+        data and visual angles, interpolation of missing data, position and
+        velocity filtering, adaptive velocity thresholds and event
+        segmentation) is done for all samples at once, so the same recording
+        can be quickly re-parsed with different thresholds.
+
+        Unlike the online parser, the first and last events of the recording
+        are also returned, even though their true start or end is unknown.
+
+        :param numpy.ndarray samples: Structured array with (at least) the
+            time, status, gaze_x, gaze_y and pupil_measure1 fields of
+            monocular samples, or the left_ and right_ versions of them for
+            binocular samples.
+        :param velocity_threshold: Fixed saccade velocity threshold in deg/sec
+            to use instead of adaptive thresholds, either a single value or
+            a (x, y) pair.
+        :param float adaptive_vel_thresh_history: Seconds of (non zero)
+            velocity data each adaptive threshold is calculated from. Defaults
+            to the value the parser was created with.
+        :param float threshold_update_interval: How often, in seconds, the
+            adaptive thresholds are recalculated. The online parser does
+            so on every sample.
+        :param bool return_samples: If True, also return the processed
+            samples.
+        :returns: numpy structured array of events (PARSED_EVENT_DTYPE), and
+            if return_samples is True, an array of processed samples
+            (PARSED_SAMPLE_DTYPE).
+
+        """
+        samples = np.asanyarray(samples)
+        names = samples.dtype.names
+        n = len(samples)
+        status = samples['status'].astype(np.int64)
+        time = samples['time'].astype(np.float64)
+
+        # convert to monocular data, as _convertToMonoAveraged does
+        if 'left_gaze_x' in names:
+            valid = status != 22
+            use_left = (status == 2) | (status == 22)
+            use_right = status == 20
+
+            def monoField(field):
+                left = samples['left_' + field].astype(np.float64)
+                right = samples['right_' + field].astype(np.float64)
+                return np.where(use_left, left,
+                                np.where(use_right, right, (left + right) / 2.0))
+        else:
+            valid = status == 0
+
+            def monoField(field):
+                return samples[field].astype(np.float64)
+
+        gaze_x = monoField('gaze_x')
+        gaze_y = monoField('gaze_y')
+        pupil = monoField('pupil_measure1')
+        angle_x, angle_y = self.pix2deg(gaze_x, gaze_y)
+        angle_x = np.array(angle_x, dtype=np.float64)
+        angle_y = np.array(angle_y, dtype=np.float64)
+
+        velocity_x = np.full(n, np.nan)
+        velocity_y = np.full(n, np.nan)
+        velocity_xy = np.full(n, np.nan)
+        threshold_x = np.full(n, np.nan)
+        threshold_y = np.full(n, np.nan)
+
+        valid_ix = np.flatnonzero(valid)
+        if len(valid_ix):
+            # only samples from the first to the last valid sample are
+            # processed, missing data in between is linearly interpolated
+            first, last = valid_ix[0], valid_ix[-1] + 1
+            region = np.arange(first, last)
+            for values in (gaze_x, gaze_y, angle_x, angle_y, pupil):
+                values[first:last] = np.interp(region, valid_ix,
+                                               values[valid_ix])
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                dt = np.diff(time[first:last])
+                vx = np.abs(np.diff(angle_x[first:last])) / dt
+                vy = np.abs(np.diff(angle_y[first:last])) / dt
+            velocity_x[first] = velocity_y[first] = velocity_xy[first] = 0.0
+            velocity_x[first + 1:last] = vx
+            velocity_y[first + 1:last] = vy
+            velocity_xy[first + 1:last] = np.hypot(vx, vy)
+
+            # velocities are calculated from unfiltered positions, as online
+            for values, filter_args in (
+                    (angle_x, self._offline_position_filter),
+                    (angle_y, self._offline_position_filter),
+                    (velocity_x, self._offline_velocity_filter),
+                    (velocity_y, self._offline_velocity_filter),
+                    (velocity_xy, self._offline_velocity_filter)):
+                values[first:last] = _filterValues(filter_args,
+                                                   values[first:last])
+
+            if velocity_threshold is not None:
+                threshold_x[first:last], threshold_y[first:last] = \
+                    np.broadcast_to(velocity_threshold, 2)
+            else:
+                if adaptive_vel_thresh_history is None:
+                    adaptive_vel_thresh_history = self.vel_thresh_history_dur
+                window_size = int(adaptive_vel_thresh_history *
+                                  self.sampling_rate)
+                step = max(1, int(round(threshold_update_interval *
+                                        self.sampling_rate)))
+                threshold_x[first:last] = _adaptiveVelocityThresholds(
+                    velocity_x[first:last], window_size, step)
+                threshold_y[first:last] = _adaptiveVelocityThresholds(
+                    velocity_y[first:last], window_size, step)
+
+        # categorize samples as getSampleEventCategory does (comparisons with
+        # a nan threshold are False, so give fixations)
+        category = np.full(n, FIXATION_END, dtype=np.uint8)
+        category[(velocity_x >= threshold_x) | (velocity_y >= threshold_y)] = \
+            SACCADE_END
+        category[~valid] = BLINK_END
+
+        events = np.zeros(0, dtype=PARSED_EVENT_DTYPE)
+        if n:
+            # each run of samples with the same category is one event
+            starts = np.concatenate(
+                ([0], np.flatnonzero(category[1:] != category[:-1]) + 1))
+            ends = np.concatenate((starts[1:], [n])) - 1
+            counts = ends - starts + 1
+            events = np.zeros(len(starts), dtype=PARSED_EVENT_DTYPE)
+            events['type'] = category[starts]
+            events['start_index'] = starts
+            events['end_index'] = ends
+            events['start_time'] = time[starts]
+            events['end_time'] = time[ends]
+            events['duration'] = time[ends] - time[starts]
+            events['start_gaze_x'] = gaze_x[starts]
+            events['start_gaze_y'] = gaze_y[starts]
+            events['end_gaze_x'] = gaze_x[ends]
+            events['end_gaze_y'] = gaze_y[ends]
+            events['average_gaze_x'] = np.add.reduceat(gaze_x, starts) / counts
+            events['average_gaze_y'] = np.add.reduceat(gaze_y, starts) / counts
+            events['amplitude'] = np.hypot(angle_x[ends] - angle_x[starts],
+                                           angle_y[ends] - angle_y[starts])
+            events['average_pupil_measure1'] = \
+                np.add.reduceat(pupil, starts) / counts
+            events['average_velocity_xy'] = \
+                np.add.reduceat(velocity_xy, starts) / counts
+            events['peak_velocity_xy'] = np.maximum.reduceat(velocity_xy,
+                                                             starts)
+            # there's no eye data during a blink
+            blinks = events['type'] == BLINK_END
+            for field in ('start_gaze_x', 'start_gaze_y', 'end_gaze_x',
+                          'end_gaze_y', 'average_gaze_x', 'average_gaze_y',
+                          'amplitude', 'average_pupil_measure1',
+                          'average_velocity_xy', 'peak_velocity_xy'):
+                events[field][blinks] = np.nan
+
+        if not return_samples:
+            return events
+
+        parsed = np.zeros(n, dtype=PARSED_SAMPLE_DTYPE)
+        parsed['time'] = time
+        parsed['status'] = status
+        parsed['gaze_x'] = gaze_x
+        parsed['gaze_y'] = gaze_y
+        parsed['angle_x'] = angle_x
+        parsed['angle_y'] = angle_y
+        parsed['pupil_measure1'] = pupil
+        parsed['velocity_x'] = velocity_x
+        parsed['velocity_y'] = velocity_y
+        parsed['velocity_xy'] = velocity_xy
+        parsed['velocity_threshold_x'] = threshold_x
+        parsed['velocity_threshold_y'] = threshold_y
+        parsed['category'] = category
+        return events, parsed
+
     def reset(self):
         eventfilters.DeviceEventFilter.reset(self)
         self._last_parser_sample = None
@@ -911,3 +1140,67 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
                                         self.io_event_ix('time')] - existing_start_event[
                                             self.io_event_ix('time')], sample[
                                                 self.io_event_ix('status')]]
+
+
+def _filterValues(filter_args, values):
+    """Apply a field filter to a whole array of values, for parseSampleArray.
+    Values at either end which never have a full window around them are left
+    unfiltered.
+    """
+    filter_class, filter_kwargs = filter_args
+    field_filter = filter_class(**filter_kwargs)
+    _junk, filtered = field_filter.filterBlock(values)
+    out = values.copy()
+    start = field_filter._active_index
+    out[start:start + len(filtered)] = filtered
+    return out
+
+
+def _iterativeVelocityThresholds(windows, max_iterations=100):
+    """The threshold calculation of
+    EyeTrackerEventParser.addVelocityToAdaptiveThreshold, done for each row
+    of 'windows' at once.
+    """
+    thresholds = windows.min(axis=1) + windows.std(axis=1) * 3.0
+    active = np.arange(len(windows))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _i in range(max_iterations):
+            w = windows[active]
+            below = w < thresholds[active, None]
+            count = below.sum(axis=1)
+            mean = np.where(below, w, 0.0).sum(axis=1) / count
+            var = np.where(below, (w - mean[:, None]) ** 2,
+                           0.0).sum(axis=1) / count
+            updated = mean + 3.0 * np.sqrt(var)
+            changed = np.abs(updated - thresholds[active]) >= 1.0
+            thresholds[active] = updated
+            active = active[changed]
+            if not len(active):
+                break
+    return thresholds
+
+
+def _adaptiveVelocityThresholds(velocity, window_size, step, chunk_size=256):
+    """Adaptive velocity threshold for each sample, calculated from the last
+    'window_size' non zero velocities up to that sample, updated every
+    'step' of them. Samples before there are enough velocities are nan.
+    """
+    thresholds = np.full(len(velocity), np.nan)
+    positive = velocity > 0.0
+    positive_velocity = velocity[positive]
+    if window_size < 1 or len(positive_velocity) < window_size:
+        return thresholds
+    windows = sliding_window_view(positive_velocity, window_size)
+    window_ends = np.arange(window_size - 1, len(positive_velocity), step)
+    window_thresholds = np.empty(len(window_ends))
+    # a chunk of windows at a time, to keep memory use in check
+    for start in range(0, len(window_ends), chunk_size):
+        ends = window_ends[start:start + chunk_size]
+        window_thresholds[start:start + chunk_size] = \
+            _iterativeVelocityThresholds(windows[ends - window_size + 1])
+    # each sample uses the latest window which ends at or before it
+    latest = np.cumsum(positive) - 1
+    window_ix = np.searchsorted(window_ends, latest, side='right') - 1
+    has_window = window_ix >= 0
+    thresholds[has_window] = window_thresholds[window_ix[has_window]]
+    return thresholds
@@ -25,6 +25,8 @@ except ImportError:
 from . import IOHUB_DIRECTORY, EXP_SCRIPT_DIRECTORY, _DATA_STORE_AVAILABLE
 from .errors import print2err, printExceptionDetailsToStdErr, ioHubError
 from .net import MAX_PACKET_SIZE
+from .sharedevents import (SharedEventRing, sharedEventRingName,
+                           canShareEventType)
 from .util import convertCamelToSnake, win32MessagePump
 from .util import yload, yLoader
 from .constants import DeviceConstants, EventConstants
@@ -608,6 +610,9 @@ class ioServer():
         self._all_dev_conf_errors = []
         ebuf_sz = config.get('global_event_buffer', 2048)
         ioServer.eventBuffer = deque(maxlen=ebuf_sz)
+        # event type id -> SharedEventRing, for event types sent to the
+        # experiment process through shared memory instead of eventBuffer
+        self._sharedEventRings = {}
 
         self._running = True
         # start UDP service
@@ -725,6 +730,8 @@ class ioServer():
                 dinstance, dconf, devt_ids, devt_classes = dev_data
                 DeviceConstants.addClassMapping(dinstance.__class__)
                 EventConstants.addClassMappings(devt_ids, devt_classes)
+                if self.config.get('shared_memory_events') is True:
+                    self._createSharedEventRings(devt_ids)
             else:
                 print2err('## Device was not started by the ioHub Server: ',
                           dev_cls_name)
@@ -1011,7 +1018,42 @@ class ioServer():
                 printExceptionDetailsToStdErr()
                 print2err('--------------------------------------')
 
+    def _createSharedEventRings(self, event_ids):
+        capacity = self.config.get('shared_memory_buffer_size', 16384)
+        experiment_pid = os.getpid()
+        if Computer.psychopy_process:
+            experiment_pid = Computer.psychopy_process.pid
+        for event_id in event_ids:
+            event_class = EventConstants.getClass(event_id)
+            if (event_id in self._sharedEventRings or event_class is None
+                    or not canShareEventType(event_class)):
+                continue
+            try:
+                self._sharedEventRings[event_id] = SharedEventRing(
+                    sharedEventRingName(experiment_pid, event_id),
+                    event_class.NUMPY_DTYPE, capacity, create=True)
+                self.log('Shared memory events enabled for: {}'.format(
+                    EventConstants.getName(event_id)))
+            except Exception:
+                print2err('Error creating shared memory event buffer for: ',
+                          EventConstants.getName(event_id))
+                printExceptionDetailsToStdErr()
+
+    def _closeSharedEventRings(self):
+        while self._sharedEventRings:
+            _, ring = self._sharedEventRings.popitem()
+            ring.close()
+
     def _handleEvent(self, event):
+        ring = self._sharedEventRings.get(
+            event[DeviceEvent.EVENT_TYPE_ID_INDEX])
+        if ring is not None:
+            try:
+                ring.write(event)
+                return
+            except (ValueError, TypeError, OverflowError):
+                # doesn't fit the record layout, send it the usual way
+                pass
         self.eventBuffer.append(event)
 
     def clearEventBuffer(self, call_proc_events=True):
@@ -1062,6 +1104,8 @@ class ioServer():
 
             self.closeDataStoreFile()
 
+            self._closeSharedEventRings()
+
             while self.devices:
                 self.devices.pop(0)._close()
         except Exception:
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Part of the PsychoPy library
+# Copyright (C) 2012-2020 iSolver Software Solutions (C) 2021 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""Shared memory transport of iohub events between the iohub server and the
+experiment process, for use when both run on the same computer.
+
+Each event type gets its own ring buffer of fixed layout records (using the
+event class's NUMPY_DTYPE), written by the iohub server as events are
+processed and read by the experiment process directly as a numpy structured
+array, without any msgpack serialization or UDP packets.
+"""
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# size in bytes of the ring header, which is followed by the records
+_HEADER_SIZE = 64
+# header fields, as uint64 values
+_WRITE_COUNT, _CAPACITY, _ITEM_SIZE, _MAGIC = range(4)
+_RING_MAGIC = 0x696f4875625368  # 'ioHubSh'
+
+
+def sharedEventRingName(experiment_pid, event_type):
+    """Name of the shared memory block used for events of type event_type by
+    the iohub server started by the experiment process with id experiment_pid.
+    """
+    return 'iohub_{0}_{1}'.format(experiment_pid, event_type)
+
+
+def canShareEventType(event_class):
+    """True if every field of the event class is numeric, so events can be
+    stored as fixed layout records without loss.
+    """
+    dtype = event_class.NUMPY_DTYPE
+    return all(dtype[name].kind in 'biuf' for name in dtype.names)
+
+
+def _attachSharedMemory(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    # The creating (iohub server) process owns the block, so stop the
+    # resource tracker of this process from unlinking it on exit.
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')  # pylint: disable=protected-access
+    except Exception:  # pylint: disable=broad-except
+        pass
+    return shm
+
+
+class SharedEventRing():
+    """Single writer, single reader ring buffer of iohub events held in
+    shared memory.
+
+    The iohub server creates the ring (create=True) and adds events using
+    write(). The experiment process attaches to it by name and calls read()
+    to get all events written since the last read as a numpy structured
+    array. If the writer gets more than capacity events ahead of the reader,
+    the oldest unread events are lost and counted in the lost attribute.
+
+    Args:
+        name (str): Name of the shared memory block.
+        dtype (numpy.dtype): Layout of each event record.
+        capacity (int): Number of events the ring can hold. Only used when
+                        creating the ring.
+        create (bool): Create a new ring rather than attach to an existing one.
+    """
+    def __init__(self, name, dtype, capacity=16384, create=False):
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self._owner = create
+        if create:
+            capacity = int(capacity)
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True,
+                size=_HEADER_SIZE + capacity * self.dtype.itemsize)
+        else:
+            self._shm = _attachSharedMemory(name)
+        self._header = np.ndarray((4,), dtype=np.uint64, buffer=self._shm.buf)
+        if create:
+            self._header[_WRITE_COUNT] = 0
+            self._header[_CAPACITY] = capacity
+            self._header[_ITEM_SIZE] = self.dtype.itemsize
+            self._header[_MAGIC] = _RING_MAGIC
+        elif (self._header[_MAGIC] != _RING_MAGIC or
+              self._header[_ITEM_SIZE] != self.dtype.itemsize):
+            self._header = None
+            self._shm.close()
+            raise ValueError('Shared memory block {0} is not an event ring '
+                             'for the given dtype.'.format(name))
+        self.capacity = int(self._header[_CAPACITY])
+        self._records = np.ndarray((self.capacity,), dtype=self.dtype,
+                                   buffer=self._shm.buf, offset=_HEADER_SIZE)
+        self._write_count = int(self._header[_WRITE_COUNT])
+        # the reader starts with only events written from now on
+        self._read_count = self._write_count
+        self.lost = 0
+
+    def write(self, event):
+        """Add an event (in list form) to the ring. Raises an exception if
+        the event values can not be stored in the ring's record layout.
+        """
+        i = self._write_count
+        self._records[i % self.capacity] = tuple(event)
+        # only publish the new count once the record has been written
+        self._write_count = i + 1
+        self._header[_WRITE_COUNT] = self._write_count
+
+    def read(self):
+        """Return all events written since the last call to read() or
+        clear(), oldest first, as a numpy structured array.
+        """
+        start = self._read_count
+        end = int(self._header[_WRITE_COUNT])
+        if end - start > self.capacity:
+            self.lost += end - self.capacity - start
+            start = end - self.capacity
+        events = self._records[np.arange(start, end) % self.capacity]
+        # drop any records the writer wrapped around onto during the copy
+        overwritten = int(self._header[_WRITE_COUNT]) - self.capacity - start
+        if overwritten > 0:
+            self.lost += overwritten
+            events = events[overwritten:]
+        self._read_count = end
+        return events
+
+    def clear(self):
+        """Discard all events not yet read."""
+        self._read_count = int(self._header[_WRITE_COUNT])
+
+    def __len__(self):
+        """Number of unread events (up to capacity)."""
+        return min(int(self._header[_WRITE_COUNT]) - self._read_count,
+                   self.capacity)
+
+    def close(self):
+        """Detach from the ring, and remove it if this process created it."""
+        if self._header is None:
+            return
+        # numpy views must be released before the memory can be closed
+        self._header = None
+        self._records = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -64,7 +64,12 @@ def run(rootScriptPathDir, configFilePath):
             m.start()
             glets.append(m)
 
-        tlet = gevent.spawn(s.processEventsTasklet, 0.01)
+        # events sent through shared memory are only available to the
+        # experiment process once processed, so process them more often
+        process_interval = 0.01
+        if s.config.get('shared_memory_events') is True:
+            process_interval = msgpump_interval
+        tlet = gevent.spawn(s.processEventsTasklet, process_interval)
         glets.append(tlet)
 
         if Computer.psychopy_process:
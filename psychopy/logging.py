@@ -29,15 +29,21 @@ messages, (which PsychoPy doesn't use) using the commands::
 """
 
 # Much of the code below is based conceptually, if not syntactically, on the
-# python logging module but it's simpler (no threading) and maintaining a
-# stack of log entries for later writing (don't want files written while
-# drawing)
+# python logging module but it's simpler (no threading, other than the
+# optional background writer in LogFile) and maintaining a stack of log
+# entries for later writing (don't want files written while drawing)
 
 from os import path
+import os
 import atexit
 import sys
 import codecs
 import locale
+import queue
+import struct
+import threading
+import time
+from collections import deque
 from pathlib import Path
 
 from psychopy import clock
@@ -123,23 +129,80 @@ def setDefaultClock(clock):
 
 
 class _LogEntry():
+    # use slots to keep entries small, as there can be a great many of them
+    __slots__ = ('t', 'level', 'message', 'obj')
 
     def __init__(self, level, message, t=None, obj=None):
-        super(_LogEntry, self).__init__()
         self.t = t
-        self.t_ms = t * 1000
         self.level = level
-        self.levelname = getLevel(level)
         self.message = message
         self.obj = obj
 
+    @property
+    def t_ms(self):
+        return self.t * 1000
+
+    @property
+    def levelname(self):
+        return getLevel(self.level)
+
+    @property
+    def __dict__(self):
+        # entries have no real __dict__ (see __slots__) but formatting
+        # strings use **entry.__dict__, so give the same fields as before
+        return {
+            't': self.t,
+            't_ms': self.t_ms,
+            'level': self.level,
+            'levelname': self.levelname,
+            'message': self.message,
+            'obj': self.obj,
+        }
+
+
+# header and record layout for binary log files (see _Logger.setRetention)
+_binaryLogHeader = b'PSYCHOPYLOG1\n'
+_binaryLogRecord = struct.Struct('<diI')  # t, level, message length
+
+
+def readBinaryLog(fileName):
+    """Read entries from a binary log file, as written by a logger whose
+    retention policy is 'spill' (see :func:`setRetention`).
+
+    :parameters:
+
+        - fileName:
+            Path to the binary log file.
+
+    :returns:
+
+        A list of log entries, each with attributes `t`, `t_ms`, `level`,
+        `levelname` and `message` (`obj` is not saved and will be `None`).
+    """
+    entries = []
+    with open(fileName, 'rb') as f:
+        if f.read(len(_binaryLogHeader)) != _binaryLogHeader:
+            raise ValueError(
+                "%s is not a PsychoPy binary log file" % fileName)
+        recordSize = _binaryLogRecord.size
+        while True:
+            record = f.read(recordSize)
+            if len(record) < recordSize:
+                break
+            t, level, nBytes = _binaryLogRecord.unpack(record)
+            message = f.read(nBytes).decode('utf-8')
+            entries.append(_LogEntry(level=level, message=message, t=t))
+
+    return entries
+
 
 class LogFile():
     """A text stream to receive inputs from the logging system
     """
 
     def __init__(self, f=None, level=WARNING, filemode='a', logger=None,
-                 encoding='utf8'):
+                 encoding='utf8', background=False, maxBytes=None,
+                 rotateInterval=None, backupCount=5):
         """Create a log file as a target for logged entries of a given level
 
         :parameters:
@@ -157,18 +220,55 @@ class LogFile():
             - filemode: 'a', 'w'
                 Append or overwrite existing log file
 
+            - background: True or False (default)
+                If True, messages are handed to a background thread which
+                writes (and flushes) them in batches, so that flushing the
+                log never waits on the disk. Use :meth:`close` (called
+                automatically as python exits) to make sure everything has
+                been written.
+
+            - maxBytes: int or None
+                If given (and `f` is a path), the file is rotated once it
+                is at least this many bytes: `log.txt` is renamed to
+                `log.txt.1` (`log.txt.1` to `log.txt.2` etc.) and a new
+                `log.txt` is started.
+
+            - rotateInterval: float or None
+                If given (and `f` is a path), the file is rotated once it
+                has been open this many seconds.
+
+            - backupCount: int
+                How many rotated files to keep.
+
         """
         super(LogFile, self).__init__()
         # work out if this is a filename or a stream to write to
         if isinstance(f, Path):
             f = str(f)
+        self._path = None
+        self._encoding = encoding
         if f is None:
             self.stream = 'stdout'
         elif hasattr(f, 'write'):
             self.stream = f
         elif isinstance(f, str):
             self.stream = codecs.open(f, filemode, encoding)
+            self._path = f
         self.level = level
+        # rotation settings (only possible when we opened the file ourselves)
+        self.maxBytes = maxBytes
+        self.rotateInterval = rotateInterval
+        self.backupCount = backupCount
+        self._openedAt = time.time()
+        # start background writer if requested
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._writeLoop,
+                                            daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
         if logger is None:
             logger = root
         # Can not use weak ref to logger, as sometimes this class
@@ -194,10 +294,140 @@ class LogFile():
         self.level = level
         self.logger._calcLowestTarget()
 
+    @property
+    def background(self):
+        """Whether messages are being written by a background thread."""
+        return self._thread is not None
+
     def write(self, txt):
         """Write directly to the log file (without using logging functions).
         Useful to send messages that only this file receives
         """
+        if self._thread is not None:
+            # leave it to the writer thread
+            self._queue.put(txt)
+            return
+        self._write(txt)
+        self._flushStream()
+        self._rotateIfNeeded()
+
+    def flush(self):
+        """Flush the underlying stream. For a background LogFile this is
+        left to the writer thread, so returns immediately.
+        """
+        if self._thread is None:
+            self._flushStream()
+
+    def close(self):
+        """Write any pending messages and stop the background writer (if
+        there is one), after which messages are written synchronously.
+        Safe to call more than once.
+        """
+        if self._thread is None:
+            return
+        # push anything still waiting in the logger into the queue first
+        self.logger.flush()
+        thread = self._thread
+        self._queue.put(None)
+        thread.join()
+        self._thread = None
+        atexit.unregister(self.close)
+
+    def _writeLoop(self):
+        """Write queued text in batches until told to stop by `None`. If
+        writing fails, the error is printed and the file goes back to
+        writing synchronously.
+        """
+        while True:
+            batch = [self._queue.get()]
+            # gather whatever else is waiting
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in batch
+            try:
+                self._write(''.join(txt for txt in batch if txt is not None))
+                self._flushStream()
+                self._rotateIfNeeded()
+            except Exception as e:
+                print("Failed to write to log file {}, writing synchronously "
+                      "from now on: {}".format(self._path or self.stream, e),
+                      file=sys.stderr)
+                self._stopBackground()
+                return
+            if done:
+                return
+
+    def _stopBackground(self):
+        """Go back to writing synchronously, called by the writer thread
+        if it fails. Anything still queued is written now.
+        """
+        self._thread = None
+        atexit.unregister(self.close)
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            self._write(''.join(txt for txt in batch if txt is not None))
+            self._flushStream()
+        except Exception as e:
+            print("Failed to write to log file {}: {}".format(
+                self._path or self.stream, e), file=sys.stderr)
+
+    def _flushStream(self):
+        stream = sys.stdout if self.stream == 'stdout' else self.stream
+        try:
+            stream.flush()
+        except Exception:
+            pass
+
+    def _rotateIfNeeded(self):
+        """Start a new file if the current one is too big or too old.
+        """
+        if self._path is None:
+            return
+        if not (self.maxBytes or self.rotateInterval):
+            return
+        rotate = False
+        if self.maxBytes:
+            try:
+                rotate = self.stream.tell() >= self.maxBytes
+            except Exception:
+                pass
+        if self.rotateInterval:
+            rotate = rotate or (
+                time.time() - self._openedAt >= self.rotateInterval)
+        if not rotate:
+            return
+        try:
+            # shift existing backups along, dropping the oldest
+            for n in range(self.backupCount - 1, 0, -1):
+                src = "%s.%i" % (self._path, n)
+                if path.exists(src):
+                    os.replace(src, "%s.%i" % (self._path, n + 1))
+            # the file has to be closed before it can be moved on Windows
+            self.stream.close()
+            if self.backupCount > 0:
+                os.replace(self._path, self._path + ".1")
+            mode = 'w'
+        except OSError as e:
+            # e.g. another process has the file open, so carry on with it
+            print("Failed to rotate log file {}, rotation is disabled: {}"
+                  .format(self._path, e), file=sys.stderr)
+            self.maxBytes = self.rotateInterval = None
+            mode = 'a'
+        if self.stream.closed:
+            self.stream = codecs.open(self._path, mode, self._encoding)
+        self._openedAt = time.time()
+
+    def _write(self, txt):
+        """Write text to the stream (without flushing).
+        """
         # find the current stdout if we're the console logger
         if self.stream == 'stdout':
             stream = sys.stdout
@@ -218,11 +448,6 @@ class LogFile():
             except Exception:
                 print('Failed to reconfigure logger output encoding', e)
 
-        try:
-            stream.flush()
-        except Exception:
-            pass
-
 
 class _Logger():
     """Maintains a set of log targets (text streams such as files of stdout)
@@ -242,9 +467,77 @@ class _Logger():
         self.toFlush = []
         self.format = format
         self.lowestTarget = 50
+        # what to do with entries once flushed, see setRetention
+        self.retention = 'all'
+        self._spillFile = None
+
+    def setRetention(self, policy='all', maxEntries=1000, fileName=None):
+        """Set what happens to log entries once they have been flushed to
+        the targets. By default every entry is kept in `self.flushed`, which
+        grows for as long as the logger is in use.
+
+        :parameters:
+
+            - policy: 'all', 'ring', 'none' or 'spill'
+                'all' keeps every flushed entry (default), 'ring' keeps only
+                the last `maxEntries` entries, 'none' discards entries once
+                flushed and 'spill' appends them to a compact binary file
+                (see :func:`readBinaryLog`) keeping the last `maxEntries`
+                in memory.
+
+            - maxEntries: int
+                How many entries to keep in memory for 'ring' and 'spill'.
+
+            - fileName: str or None
+                File to write entries to when `policy` is 'spill'.
+
+        """
+        if policy not in ('all', 'ring', 'none', 'spill'):
+            raise ValueError(
+                "Log retention policy should be one of 'all', 'ring', "
+                "'none' or 'spill', not %r" % policy)
+        if policy == 'spill' and fileName is None:
+            raise ValueError("A fileName is needed to spill log entries to.")
+        # finish with any existing spill file
+        self._closeSpillFile()
+        if policy == 'all':
+            self.flushed = list(self.flushed)
+        elif policy == 'none':
+            self.flushed = []
+        else:
+            self.flushed = deque(self.flushed, maxlen=maxEntries)
+        if policy == 'spill':
+            fileName = str(fileName)
+            isNew = not path.isfile(fileName) or path.getsize(fileName) == 0
+            self._spillFile = open(fileName, 'ab')
+            if isNew:
+                self._spillFile.write(_binaryLogHeader)
+            atexit.register(self._closeSpillFile)
+        self.retention = policy
+
+    def _closeSpillFile(self):
+        """Spill any pending entries and close the spill file (if any).
+        """
+        if self._spillFile is None:
+            return
+        self.flush()
+        self._spillFile.close()
+        self._spillFile = None
+
+    def _spill(self, entries):
+        """Append entries to the binary spill file.
+        """
+        chunks = []
+        for entry in entries:
+            message = str(entry.message).encode('utf-8')
+            chunks.append(
+                _binaryLogRecord.pack(entry.t, entry.level, len(message)))
+            chunks.append(message)
+        self._spillFile.write(b''.join(chunks))
 
     def __del__(self):
         self.flush()
+        self._closeSpillFile()
         # unicode logged to coder output window can cause logger failure, with
         # error message pointing here. this is despite it being ok to log to
         # terminal or Builder output. proper fix: fix coder unicode bug #97
@@ -292,16 +585,27 @@ class _Logger():
         # so that stream.flush can be called just once
         formatted = {}  # keep a dict - so only do the formatting once
         for target in self.targets:
+            lines = []
             for thisEntry in self.toFlush:
                 if thisEntry.level >= target.level:
                     if not thisEntry in formatted:
                         # convert the entry into a formatted string
                         formatted[thisEntry] = self.format.format(**thisEntry.__dict__)
-                    target.write(formatted[thisEntry] + '\n')
+                    lines.append(formatted[thisEntry] + '\n')
+            # write all lines at once, rather than writing (and flushing)
+            # each line separately
+            if lines:
+                target.write(''.join(lines))
+            # background targets flush from their own thread
+            if getattr(target, 'background', False):
+                continue
             if hasattr(target.stream, 'flush'):
                 target.stream.flush()
-        # finished processing entries - move them to self.flushed
-        self.flushed.extend(self.toFlush)
+        # finished processing entries - keep (or not) according to retention
+        if self._spillFile is not None:
+            self._spill(self.toFlush)
+        if self.retention != 'none':
+            self.flushed.extend(self.toFlush)
         self.toFlush = []  # a new empty list
 
 root = _Logger()
@@ -313,6 +617,17 @@ def flush(logger=root):
     """
     logger.flush()
 
+
+def setRetention(policy='all', maxEntries=1000, fileName=None, logger=root):
+    """Set what happens to log entries once they have been flushed, to
+    keep memory use flat in long sessions. See :meth:`_Logger.setRetention`.
+
+    usage::
+        logging.setRetention('ring', maxEntries=500)
+        logging.setRetention('spill', fileName='session.psylog')
+    """
+    logger.setRetention(policy, maxEntries=maxEntries, fileName=fileName)
+
 # make sure this function gets called as python closes
 atexit.register(flush)
 
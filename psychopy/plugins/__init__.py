@@ -29,7 +29,9 @@ import sys
 import inspect
 import collections
 import hashlib
+import json
 import importlib, importlib.metadata
+import psychopy
 import psychopy.tools.pkgtools as pkgtools
 import pkg_resources
 import psychopy.tools.pkgtools as pkgtools
@@ -56,6 +58,257 @@ _installed_plugins_ = collections.OrderedDict()
 # Keep track of plugins that failed to load here
 _failed_plugins_ = []
 
+# Whether `scanPlugins` has been called this session
+_plugins_scanned_ = False
+
+# Index of the PsychoPy entry points advertised by installed distributions, see
+# `_getEntryPointIndex`. The part of it covering the Python environment is also
+# saved in the user cache folder, so it only needs to be rebuilt when packages
+# are installed or removed, rather than every time PsychoPy starts.
+_entry_point_index_ = None
+_ENTRY_POINT_INDEX_VERSION = 1
+
+
+# ------------------------------------------------------------------------------
+# Entry point index
+#
+
+def _getIndexPaths():
+    """Get the locations of installed distributions, split into those
+    belonging to the Python environment (and PsychoPy's package folder), whose
+    contents are indexed on disk, and any others on `sys.path` (e.g. the folder
+    of the script being run), which are scanned once per session.
+
+    Returns
+    -------
+    tuple
+        Lists of environment and session paths.
+
+    """
+    # the package folder and any bundles in it, whether or not they have been
+    # added to `sys.path` yet
+    envPaths = []
+    pluginBaseDir = str(prefs.paths.get('packages', ''))
+    if pluginBaseDir:
+        envPaths.append(pluginBaseDir)
+        try:
+            envPaths.extend(sorted(
+                os.path.join(pluginBaseDir, name)
+                for name in os.listdir(pluginBaseDir)))
+        except OSError:
+            pass
+
+    envRoots = {sys.prefix, sys.base_prefix, sys.exec_prefix}
+    envRoots = [os.path.join(os.path.abspath(root), '') for root in envRoots]
+    siteDirs = {str(prefs.paths.get('userPackages', ''))}
+    try:
+        import site
+        siteDirs.add(site.getusersitepackages())
+    except (ImportError, AttributeError):
+        pass
+
+    sessionPaths = []
+    for path in sys.path:
+        if path in envPaths or path in sessionPaths:
+            continue
+        absPath = os.path.join(os.path.abspath(path or os.curdir), '')
+        if path in siteDirs or any(absPath.startswith(root)
+                                   for root in envRoots):
+            envPaths.append(path)
+        else:
+            sessionPaths.append(path)
+
+    return envPaths, sessionPaths
+
+
+def _getIndexStamp(paths):
+    """Get the modification times of the given paths, which change whenever a
+    distribution is added to or removed from them.
+    """
+    stamp = []
+    for path in paths:
+        try:
+            mtime = os.stat(path or os.curdir).st_mtime_ns
+        except OSError:
+            mtime = None
+        stamp.append([path, mtime])
+
+    return stamp
+
+
+def _getIndexFile():
+    """Get the path of the file the entry point index is saved to, which is
+    specific to the Python interpreter PsychoPy is running in.
+    """
+    cacheDir = prefs.paths.get('userCacheDir')
+    if not cacheDir:
+        return None
+    name = hashlib.sha1(sys.executable.encode('utf-8')).hexdigest()[:16]
+
+    return os.path.join(str(cacheDir), 'entryPoints_{}.json'.format(name))
+
+
+def _scanEntryPoints(paths):
+    """Find the distributions in the given paths which advertise PsychoPy
+    entry points.
+
+    Returns
+    -------
+    list
+        A dict for each distribution, with its (safe) project name, location
+        and entry points, as a mapping of groups to entry point specifiers.
+
+    """
+    dists = []
+    if not paths:
+        return dists
+
+    for dist in importlib.metadata.distributions(path=list(paths)):
+        entryPoints = collections.OrderedDict()
+        try:
+            for ep in dist.entry_points:
+                if ep.group.startswith('psychopy'):
+                    entryPoints.setdefault(ep.group, []).append(
+                        '{} = {}'.format(ep.name, ep.value))
+            if not entryPoints:
+                continue
+            name = pkg_resources.safe_name(dist.metadata['Name'])
+            location = str(dist.locate_file(''))
+        except Exception as err:
+            logging.debug(
+                'Could not read the metadata of distribution `{}`: {}'.format(
+                    getattr(dist, '_path', dist), err))
+            continue
+        dists.append(
+            {'name': name, 'location': location, 'entryPoints': entryPoints})
+
+    return dists
+
+
+def _loadEntryPointIndex(indexFile, stamp):
+    """Read the saved index of entry points in the Python environment, or
+    `None` if there isn't one or it is out of date.
+    """
+    if indexFile is None or not os.path.isfile(indexFile):
+        return None
+    try:
+        with open(indexFile, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError) as err:
+        logging.debug('Could not read entry point index {}: {}'.format(
+            indexFile, err))
+        return None
+
+    if not isinstance(index, dict) or \
+            index.get('version') != _ENTRY_POINT_INDEX_VERSION or \
+            index.get('psychopy') != psychopy.__version__ or \
+            index.get('executable') != sys.executable or \
+            index.get('stamp') != stamp:
+        return None
+
+    return index
+
+
+def _saveEntryPointIndex(indexFile, index):
+    """Save the index of entry points in the Python environment.
+    """
+    if indexFile is None:
+        return
+    tmpFile = indexFile + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(indexFile), exist_ok=True)
+        with open(tmpFile, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmpFile, indexFile)
+    except OSError as err:
+        logging.debug('Could not save entry point index {}: {}'.format(
+            indexFile, err))
+
+
+def _getEntryPointIndex(refresh=False):
+    """Get the PsychoPy entry points advertised by installed distributions.
+
+    Entry points of distributions in the Python environment are read from the
+    index saved in the user cache folder, which is rebuilt whenever any of the
+    directories they are installed in (e.g. site-packages) have been modified
+    since it was saved. Distributions elsewhere on `sys.path` are scanned the
+    first time they are needed each session.
+
+    Parameters
+    ----------
+    refresh : bool
+        Scan all distributions, even if the index is up to date.
+
+    Returns
+    -------
+    list
+        A dict for each distribution, see `_scanEntryPoints`.
+
+    """
+    global _entry_point_index_
+
+    envPaths, sessionPaths = _getIndexPaths()
+    stamp = _getIndexStamp(envPaths)
+    current = _entry_point_index_
+    if not refresh and current is not None and \
+            current['stamp'] == stamp and \
+            current['sessionPaths'] == sessionPaths:
+        return current['dists']
+
+    indexFile = _getIndexFile()
+    index = None if refresh else _loadEntryPointIndex(indexFile, stamp)
+    if index is None:
+        logging.debug('Scanning installed packages for PsychoPy entry points.')
+        try:
+            bundles = [os.path.join(prefs.paths['packages'], name)
+                       for name in refreshBundlePaths()]
+        except OSError:
+            bundles = []
+        index = {
+            'version': _ENTRY_POINT_INDEX_VERSION,
+            'psychopy': psychopy.__version__,
+            'executable': sys.executable,
+            'stamp': stamp,
+            'bundles': bundles,
+            'dists': _scanEntryPoints(envPaths)}
+        _saveEntryPointIndex(indexFile, index)
+    else:
+        # make sure plugin bundles found when the index was saved are importable
+        for bundle in index['bundles']:
+            if bundle not in sys.path:
+                sys.path.append(bundle)
+
+    # distributions found earlier on `sys.path` take precedence
+    order = {path: i for i, path in enumerate(sys.path)}
+    dists = sorted(
+        index['dists'] + _scanEntryPoints(sessionPaths),
+        key=lambda dist: order.get(dist['location'], len(order)))
+    found = set()
+    unique = []
+    for dist in dists:
+        if dist['name'] not in found:
+            unique.append(dist)
+            found.add(dist['name'])
+
+    _entry_point_index_ = {
+        'stamp': stamp, 'sessionPaths': sessionPaths, 'dists': unique}
+
+    return unique
+
+
+def _getDistribution(name, location):
+    """Get the `pkg_resources` distribution of an indexed plugin.
+    """
+    key = name.lower()
+    dist = pkg_resources.working_set.by_key.get(key)
+    if dist is None and location not in pkg_resources.working_set.entries:
+        pkg_resources.working_set.add_entry(location)
+        dist = pkg_resources.working_set.by_key.get(key)
+    if dist is None:
+        dist = pkg_resources.Distribution(location=location, project_name=name)
+
+    return dist
+
 
 # ------------------------------------------------------------------------------
 # Functions
@@ -81,7 +334,18 @@ def getEntryPointGroup(group, subgroups=False):
     # start off with no entry points or sections
     entryPoints = []
 
-    if subgroups:
+    if group.startswith('psychopy'):
+        # PsychoPy's own groups are all in the entry point index
+        for dist in _getEntryPointIndex():
+            for thisGroup, eps in dist['entryPoints'].items():
+                if thisGroup == group or \
+                        (subgroups and thisGroup.startswith(group)):
+                    for ep in eps:
+                        name, value = ep.split(' = ', 1)
+                        entryPoints.append(
+                            importlib.metadata.EntryPoint(
+                                name, value, thisGroup))
+    elif subgroups:
         # if searching subgroups, iterate through entry point groups
         for thisGroup, eps in importlib.metadata.entry_points().items():
             # get entry points within matching group
@@ -304,7 +568,8 @@ def refreshBundlePaths():
     whose project name matches the name of the directory. If not, the directory
     will not be appended to `sys.path`.
 
-    This is called implicitly when :func:`scanPlugins()` is called.
+    This is called implicitly when :func:`scanPlugins()` rebuilds the index of
+    installed plugins.
 
     Returns
     -------
@@ -370,7 +635,7 @@ def installPlugin(package, local=True, upgrade=False, forceReinstall=False,
         noDeps=noDeps)
 
 
-def scanPlugins():
+def scanPlugins(refresh=False):
     """Scan the system for installed plugins.
 
     This function scans installed packages for the current Python environment
@@ -380,6 +645,15 @@ def scanPlugins():
     called automatically when PsychoPy starts, so you do not need to call this
     unless packages have been added since the session began.
 
+    Entry points are read from an index saved in the user cache folder, which
+    is only rebuilt when packages have been installed or removed since it was
+    saved.
+
+    Parameters
+    ----------
+    refresh : bool
+        Scan all installed packages, even if the index is up to date.
+
     Returns
     -------
     int
@@ -387,30 +661,28 @@ def scanPlugins():
         return the names of the found plugins.
 
     """
-    global _installed_plugins_
-    _installed_plugins_ = {}  # clear installed plugins
-
-    refreshBundlePaths()  # refresh plugin bundles directory
+    global _installed_plugins_, _plugins_scanned_
+    _installed_plugins_ = collections.OrderedDict()  # clear installed plugins
 
     # make sure we have the plugin directory in the working set
     pluginDir = prefs.paths['packages']
     if pluginDir not in pkg_resources.working_set.entries:
         pkg_resources.working_set.add_entry(pluginDir)
 
-    # find all packages with entry points defined
-    pluginEnv = pkg_resources.Environment()  # supported by the platform
-    dists, _ = pkg_resources.working_set.find_plugins(pluginEnv)
+    # find all packages with entry points defined, this also refreshes the
+    # plugin bundles directory if the index is rebuilt
+    for plugin in _getEntryPointIndex(refresh=refresh):
+        dist = _getDistribution(plugin['name'], plugin['location'])
+        logging.debug('Found plugin `{}` at location `{}`.'.format(
+            plugin['name'], plugin['location']))
+        _installed_plugins_[plugin['name']] = \
+            pkg_resources.EntryPoint.parse_map(plugin['entryPoints'], dist)
 
-    for dist in dists:
-        entryMap = dist.get_entry_map()
-        if any([i.startswith('psychopy') for i in entryMap.keys()]):
-            logging.debug('Found plugin `{}` at location `{}`.'.format(
-                dist.project_name, dist.location))
-            _installed_plugins_[dist.project_name] = entryMap
+        # try adding the plugin to the working set
+        if dist.location not in pkg_resources.working_set.entries:
+            pkg_resources.working_set.add(dist)
 
-            # try adding the plugin to the working set
-            if dist.location not in pkg_resources.working_set.entries:
-                pkg_resources.working_set.add(dist)
+    _plugins_scanned_ = True
 
     return len(_installed_plugins_)
 
@@ -488,6 +760,8 @@ def listPlugins(which='all'):
     elif which == 'failed':
         return list(_failed_plugins_)  # copy
     else:
+        if not _plugins_scanned_:
+            scanPlugins()  # reads the index, so cheap unless packages changed
         return list(_installed_plugins_.keys())
 
 
@@ -669,6 +943,9 @@ def loadPlugin(plugin):
         logging.info('Plugin `{}` already loaded. Skipping.'.format(plugin))
         return True  # already loaded, return True
 
+    if not _plugins_scanned_:
+        scanPlugins()
+
     try:
         entryMap = _installed_plugins_[plugin]
     except KeyError:
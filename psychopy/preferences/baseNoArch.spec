@@ -44,6 +44,8 @@
     startUpPlugins = list(default=list())
     # Google Cloud Platform key, required for the audio transcription using Google Speech Recognition. Specified as a path to a JSON file containing the key data.
     appKeyGoogleCloud = string(default='')
+    # How to find installed fonts: 'full' checks every font file against an index kept on disk, 'lazy' only searches for new fonts if one is not in the index, 'off' reads every font file at startup
+    fontIndex = option('full', 'lazy', 'off', default='full')
     # LEGACY: which system to use as a backend for drawing
     winType = option('pyglet', 'pygame', 'glfw', default='pyglet')
 
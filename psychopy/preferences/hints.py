@@ -42,6 +42,9 @@ _translate("Add plugin names here to load when a PsychoPy session starts.")
 _translate("Google Cloud Platform key, required for the audio transcription using Google Speech Recognition. Specified as a path to a JSON file containing the key data.")
 
 # baseNoArch.spec,[general],line47
+_translate("How to find installed fonts: 'full' checks every font file against an index kept on disk, 'lazy' only searches for new fonts if one is not in the index, 'off' reads every font file at startup")
+
+# baseNoArch.spec,[general],line49
 _translate("LEGACY: which system to use as a backend for drawing")
 
 # baseNoArch.spec,[general],line50
@@ -8,7 +8,7 @@ import platform
 from pathlib import Path
 from .. import __version__
 
-from pkg_resources import parse_version
+from packaging.version import parse as parse_version
 import shutil
 
 try:
@@ -20,6 +20,8 @@ parser = argparse.ArgumentParser(description='Compile your python file from here
 parser.add_argument('infile', help='The input (psyexp) file to be compiled')
 parser.add_argument('--version', '-v', help='The PsychoPy version to use for compiling the script. e.g. 1.84.1')
 parser.add_argument('--outfile', '-o', help='The output (py) file to be generated (defaults to the ')
+parser.add_argument('--processes', type=int, default=1,
+                    help='Number of processes to use to translate code for a JS script (0 for one per CPU)')
 
 
 class LegacyScriptError(ChildProcessError):
@@ -89,7 +91,7 @@ def generateScript(exp, outfile, target="PsychoPy"):
     return outfile
 
 
-def compileScript(infile=None, version=None, outfile=None):
+def compileScript(infile=None, version=None, outfile=None, processes=1):
     """
     Compile either Python or JS PsychoPy script from .psyexp file.
 
@@ -104,6 +106,9 @@ def compileScript(infile=None, version=None, outfile=None):
         command line interface only.
     outfile: string
         The output file to be generated (defaults to Python script).
+    processes: int or None
+        Number of processes to use to translate the code in a JS script, or
+        None for one per CPU.
     """
     def _setVersion(version):
         """
@@ -194,8 +199,12 @@ def compileScript(infile=None, version=None, outfile=None):
         """
         # Write script
         if targetOutput == "PsychoJS":
+            # only pass processes if needed, older versions don't take it
+            kwargs = {}
+            if processes != 1:
+                kwargs['processes'] = processes
             # Write module JS code
-            script = thisExp.writeScript(outfile, target=targetOutput, modular=True)
+            script = thisExp.writeScript(outfile, target=targetOutput, modular=True, **kwargs)
             # Write no module JS code
             outfileNoModule = outfile.replace('.js', '-legacy-browsers.js')  # For no JS module script
             scriptNoModule = thisExp.writeScript(outfileNoModule, target=targetOutput, modular=False)
@@ -230,4 +239,5 @@ if __name__ == "__main__":
     args = parser.parse_args()
     if args.outfile is None:
         args.outfile = args.infile.replace(".psyexp", ".py")
-    compileScript(args.infile, args.version, args.outfile)
+    compileScript(args.infile, args.version, args.outfile,
+                  processes=args.processes or None)
@@ -104,7 +104,10 @@ class AudioClip:
         # samples should be a 2D array where columns represent channels
         self._samples = np.atleast_2d(
             np.asarray(samples, dtype=np.float32, order='C'))
-        self._samples.clip(-1, 1)  # force values to be clipped
+
+        # spare capacity for appending samples, see `_extend()`
+        self._buffer = None
+        self._bufferView = None  # `_samples` when it's a view of `_buffer`
 
         # set the sample rate of the clip
         self._sampleRateHz = int(sampleRateHz)
@@ -415,9 +418,8 @@ class AudioClip:
         assert other.sampleRateHz == self._sampleRateHz
         assert other.channels == self.channels
 
-        newSamples = np.ascontiguousarray(
-            np.vstack((self._samples, other.samples)),
-            dtype=np.float32)
+        newSamples = np.concatenate(
+            (self._samples, other.samples), axis=0, dtype=np.float32)
 
         toReturn = AudioClip(
             samples=newSamples,
@@ -430,9 +432,7 @@ class AudioClip:
         assert other.sampleRateHz == self._sampleRateHz
         assert other.channels == self.channels
 
-        self._samples = np.ascontiguousarray(
-            np.vstack((self._samples, other.samples)),
-            dtype=np.float32)
+        self._extend(other.samples)
 
         return self
 
@@ -468,15 +468,33 @@ class AudioClip:
         assert self.channels == clip.channels
         assert self._sampleRateHz == clip.sampleRateHz
 
-        self._samples = np.ascontiguousarray(
-            np.vstack((self._samples, clip.samples)),
-            dtype=np.float32)
-
-        # recompute the duration of the new clip
-        self._duration = len(self.samples) / float(self.sampleRateHz)
+        self._extend(clip.samples)
 
         return self
 
+    def _extend(self, samples):
+        """Add samples to the end of this clip inplace.
+
+        Samples are kept in a buffer with spare capacity which doubles in size
+        when full, so joining many clips one at a time with `append()` or `+=`
+        takes time proportional to the total number of samples rather than its
+        square. `samples` remains a contiguous array.
+
+        """
+        nOld = len(self._samples)
+        nNew = nOld + len(samples)
+        if (self._samples is not self._bufferView or
+                nNew > len(self._buffer)):
+            # samples were replaced or the buffer is full, grow it
+            self._buffer = np.empty(
+                (max(nNew, 2 * nOld), self.channels), dtype=np.float32)
+            self._buffer[:nOld] = self._samples
+        self._buffer[nOld:nNew] = samples
+        self._samples = self._bufferView = self._buffer[:nNew]
+
+        # recompute the duration of the new clip
+        self._duration = nNew / float(self._sampleRateHz)
+
     def copy(self):
         """Create an independent copy of this `AudioClip`.
 
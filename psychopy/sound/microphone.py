@@ -29,6 +29,7 @@ class Microphone:
             name="mic",
             recordingFolder=Path.home(),
             recordingExt="wav",
+            spillFile=None,
     ):
         # store name
         self.name = name
@@ -54,7 +55,8 @@ class Microphone:
                 maxRecordingSize=maxRecordingSize,
                 policyWhenFull=policyWhenFull,
                 audioLatencyMode=audioLatencyMode,
-                audioRunMode=audioRunMode
+                audioRunMode=audioRunMode,
+                spillFile=spillFile
             )
         # setup clips and transcripts dicts
         self.clips = {}
@@ -100,6 +100,70 @@ class TestExperimentHandler():
             contents = f.read()
         assert contents == "thisRow.t,notes,mutable,\n,,[1],\n,,[9999],\n"
 
+    def test_streamWideText(self):
+        # rows should be on disk before the handler is closed
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=True,
+            streamWideText=True,
+            dataFileName=self.tmpDir + 'streamed'
+        )
+        exp.addData('resp.rt', 0.5)
+        exp.nextEntry()
+        exp.addData('resp.rt', 0.6)
+        exp.nextEntry()
+        exp._wideTextStream.flush()
+        with io.open(exp.dataFileName + '.csv', 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == "thisRow.t,notes,resp.rt,\n,,0.5,\n,,0.6,\n"
+        # a new column partway through should be added to the header on close
+        exp.addData('resp.keys', 'a,b')
+        exp.nextEntry()
+        exp.close()
+        with io.open(exp.dataFileName + '.csv', 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == (
+            "thisRow.t,notes,resp.rt,resp.keys,\n"
+            ",,0.5,\n"
+            ",,0.6,\n"
+            ',,,"a,b",\n'
+        )
+
+    def test_columnarEntries(self):
+        # columnar store should give the same output as a list of dicts
+        exps = []
+        for columnar in (False, True):
+            exp = data.ExperimentHandler(
+                name='testExp',
+                savePickle=False,
+                saveWideText=False,
+                columnarEntries=columnar,
+                dataFileName=self.tmpDir + 'columnar%i' % columnar
+            )
+            for n in range(100):
+                exp.addData('n', n)
+                exp.addData('rt', n / 10)
+                if n % 2:
+                    exp.addData('resp', [n])
+                exp.nextEntry()
+            exp.addData('rt', 'none', row=3)
+            exp.saveAsWideText(exp.dataFileName + '.csv', delim=',')
+            exps.append(exp)
+        listExp, colExp = exps
+        assert list(colExp.entries) == listExp.entries
+        assert colExp.entries[3]['rt'] == 'none'
+        with io.open(listExp.dataFileName + '.csv', encoding='utf-8-sig') as f:
+            listContents = f.read()
+        with io.open(colExp.dataFileName + '.csv', encoding='utf-8-sig') as f:
+            colContents = f.read()
+        assert listContents == colContents
+        # numeric columns should come out typed
+        df = colExp.getDataFrame()
+        assert df['n'].dtype == np.int64
+        assert df['resp'].isna().sum() == 50
+        assert (df['n'] == listExp.getDataFrame()['n']).all()
+
     def test_unicode_conditions(self):
         fileName = self.tmpDir + 'unicode_conds'
 
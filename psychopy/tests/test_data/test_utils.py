@@ -2,12 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import os
+import shutil
 import pytest
 import numpy as np
 
 from psychopy import exceptions
 from psychopy.data import utils
 from os.path import join
+from tempfile import mkdtemp
 
 thisDir, _ = os.path.split(os.path.abspath(__file__))
 fixturesPath = join(thisDir, '..', 'data')
@@ -165,5 +167,46 @@ def test_listFromString():
     # this would create a syntax error in ast.literal_eval
     assert ["Don't", "Do"] == utils.listFromString("Don't, Do")
 
+
+class TestConditionsCache:
+    def setup_method(self):
+        self.tmpDir = mkdtemp(prefix='psychopy-tests-conditions')
+        self.cache = utils.ConditionsCache(maxEntries=2,
+                                           folder=join(self.tmpDir, 'cache'))
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_cache(self, monkeypatch):
+        fileName = join(self.tmpDir, 'conds.csv')
+        with open(fileName, 'w') as f:
+            f.write('text,n,float\nred,1,1.1\ngreen,2,2.2\nblue,3,3.3\n')
+        monkeypatch.setattr(utils, '_conditionsCache', self.cache)
+        conds, fieldNames = utils.importConditions(fileName,
+                                                   returnFieldNames=True)
+        assert self.cache.get(fileName) == (conds, fieldNames)
+
+        # a cached file isn't parsed again, and the copies are independent
+        def _readConditionsFile(fileName):
+            raise AssertionError("parsed {} again".format(fileName))
+        monkeypatch.setattr(utils, '_readConditionsFile', _readConditionsFile)
+        cached = utils.importConditions(fileName)
+        assert cached == conds
+        cached[0]['text'] = 'changed'
+        assert utils.importConditions(fileName) == conds
+        assert utils.importConditions(fileName, selection="1:3") == conds[1:3]
+
+        # the sidecar is used by a new process (i.e. an empty cache)
+        self.cache.clear()
+        assert utils.importConditions(fileName) == conds
+
+        # but an edited file is parsed again
+        with open(fileName, 'a') as f:
+            f.write('yellow,4,4.4\n')
+        with pytest.raises(AssertionError):
+            utils.importConditions(fileName)
+        assert self.cache.get(fileName) == (None, None)
+
+
 if __name__ == '__main__':
     pytest.main()
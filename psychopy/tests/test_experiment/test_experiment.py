@@ -101,3 +101,30 @@ class TestExperiment:
             else:
                 assert case['value'] not in unhandledResources
 
+    def test_resources_in_conditions(self, tmp_path):
+        # conditions files referring to images and to each other
+        (tmp_path / "stims").mkdir()
+        for i in range(10):
+            (tmp_path / "stims" / f"img{i}.png").touch()
+        rows = "\n".join(f"stims/img{i % 10}.png,left" for i in range(100))
+        (tmp_path / "conds.csv").write_text(
+            f"image,side\n{rows}\nblock.csv,right\n")
+        (tmp_path / "block.csv").write_text(
+            "image\nstims/img0.png\nconds.csv\n")
+
+        exp = experiment.Experiment()
+        exp.filename = str(tmp_path / "test.psyexp")
+        routine = exp.addRoutine("trial")
+        exp.flow.addRoutine(routine, 0)
+        loop = experiment.loops.TrialHandler(
+            exp, "trials", conditionsFile="conds.csv")
+        exp.flow.addLoop(loop, startPos=0, endPos=1)
+
+        names = [res['rel'] for res in exp.getResourceFiles()]
+        expected = ["conds.csv"] + [f"stims/img{i}.png" for i in range(10)]
+        assert names == expected + ["block.csv"]
+        # a changed conditions file is read again
+        (tmp_path / "block.csv").write_text("image\nstims/img0.png\n")
+        (tmp_path / "conds.csv").write_text(f"image,side\n{rows}\n")
+        names = [res['rel'] for res in exp.getResourceFiles()]
+        assert names == expected
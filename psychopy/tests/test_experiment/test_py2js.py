@@ -1,3 +1,5 @@
+import json
+
 from psychopy.experiment.py2js_transpiler import translatePythonToJavaScript
 import psychopy.experiment.py2js as py2js
 from psychopy.experiment import Experiment
@@ -228,3 +230,28 @@ class Test_PY2JS_Compile:
             # check whether direct match or at least a match when spaces removed
             assert (py2js.expression2js(expr) == output[idx] or
             py2js.expression2js(expr).replace(" ", "") == output[idx].replace(" ", ""))
+
+    def test_expressions2js_cache(self, tmp_path):
+        exprs = ['sin(t)', '(1, 2)', 'rand()', 'a[0] + (t, 2)', 'sin(t)']
+        py2js.clearCache()
+        expected = [py2js._expression2js(expr) for expr in exprs]
+        try:
+            # translated in worker processes and then taken from the cache
+            assert py2js.expressions2js(exprs, processes=2) == expected
+            assert set(py2js._jsCache) == set(exprs)
+            assert [py2js.expression2js(expr) for expr in exprs] == expected
+            # saved translations are used by a later session...
+            cacheFile = tmp_path / "py2jsCache.json"
+            py2js.saveCache(cacheFile)
+            py2js.clearCache()
+            py2js.loadCache(cacheFile)
+            assert set(py2js._jsCache) == set(exprs)
+            # ...unless it's a different version of PsychoPy
+            data = json.loads(cacheFile.read_text(encoding='utf-8'))
+            data['version'] = '0.0.0'
+            cacheFile.write_text(json.dumps(data), encoding='utf-8')
+            py2js.clearCache()
+            py2js.loadCache(cacheFile)
+            assert not py2js._jsCache
+        finally:
+            py2js.clearCache()
@@ -1,4 +1,7 @@
+import time
+
 from psychopy.hardware import manager
+from psychopy.hardware.base import BaseDevice
 from psychopy.tests import skip_under_vm
 
 
@@ -34,3 +37,77 @@ class TestDeviceManager:
         devices = self.mgr.getInitialisedDevices(deviceType)
         assert name in devices
         assert devices[name] == device
+
+
+class _SlowDevice(BaseDevice):
+    """
+    Device which takes a while to find, counting how many times it's been looked for.
+    """
+    delay = 0.5
+    nSearches = 0
+
+    @classmethod
+    def getAvailableDevices(cls):
+        cls.nSearches += 1
+        time.sleep(cls.delay)
+        return [{'deviceName': cls.__name__}]
+
+
+class _OtherSlowDevice(_SlowDevice):
+    nSearches = 0
+
+
+class _QuickDevice(_SlowDevice):
+    delay = 0
+    nSearches = 0
+
+
+class TestAvailableDevices:
+    def setup_method(self):
+        self.classes = [cls.__module__ + "." + cls.__name__
+                        for cls in (_SlowDevice, _OtherSlowDevice, _QuickDevice)]
+        manager.DeviceManager.clearAvailableDevices()
+
+    def teardown_class(cls):
+        # don't leave the test devices in the list of all device classes
+        for cls in (_SlowDevice, _OtherSlowDevice, _QuickDevice):
+            name = cls.__module__ + "." + cls.__name__
+            while name in manager.DeviceManager.deviceClasses:
+                manager.DeviceManager.deviceClasses.remove(name)
+        manager.DeviceManager.clearAvailableDevices()
+
+    def test_parallel(self):
+        start = time.monotonic()
+        devices = manager.DeviceManager.getAvailableDevices(self.classes, parallel=True)
+        # slow devices are looked for at the same time
+        assert time.monotonic() - start < 0.9
+        assert devices[self.classes[1]] == [
+            {'deviceName': "_OtherSlowDevice", 'deviceClass': self.classes[1]}
+        ]
+
+    def test_timeout_and_cache(self):
+        nSearches = _SlowDevice.nSearches
+        start = time.monotonic()
+        devices = manager.DeviceManager.getAvailableDevices(
+            self.classes, timeout={self.classes[0]: 0.1, self.classes[1]: 0.1}
+        )
+        # slow devices are left out rather than waited for
+        assert time.monotonic() - start < 0.4
+        assert list(devices) == [self.classes[2]]
+        # but the search carries on, and its results are used for a later call
+        time.sleep(0.6)
+        start = time.monotonic()
+        devices = manager.DeviceManager.getAvailableDevices(self.classes[0], maxAge=10)
+        assert time.monotonic() - start < 0.1
+        assert devices[0]['deviceName'] == "_SlowDevice"
+        assert _SlowDevice.nSearches == nSearches + 1
+        # returned profiles are copies of the cached ones
+        devices[0]['deviceName'] = "changed"
+        devices = manager.DeviceManager.getAvailableDevices(self.classes[0], maxAge=10)
+        assert devices[0]['deviceName'] == "_SlowDevice"
+        # old results or cleared results aren't used
+        manager.DeviceManager.getAvailableDevices(self.classes[0], maxAge=0)
+        assert _SlowDevice.nSearches == nSearches + 2
+        manager.DeviceManager.clearAvailableDevices(self.classes[0])
+        manager.DeviceManager.getAvailableDevices(self.classes[0], maxAge=10)
+        assert _SlowDevice.nSearches == nSearches + 3
@@ -26,6 +26,28 @@ class _TestBaseKeyboard:
             assert keys[-1] is evt
             assert keys[-1].value == case['val']
 
+    def testIndexedResponses(self):
+        """
+        Test that `KeyboardDevice.getKeys` gets the right presses from its indexed responses, in
+        the order they were made, and only clears those it returns.
+        """
+        self.kb.responses = []
+        presses = [self.kb.makeResponse(tDown=n / 10, code=code) for n, code in enumerate("abab")]
+        # releasing a press moves it to the released presses, but keeps its place
+        presses[0].duration = 0.5
+        self.kb.receiveMessage(presses[0])
+        assert len(self.kb.responses) == 4
+        assert self.kb.getKeys(waitRelease=True, clear=False) == [presses[0]]
+        keys = self.kb.getKeys(keyList=["a", "b"], waitRelease=False, clear=False)
+        assert [key is press for key, press in zip(keys, presses[1:])] == [True] * 3
+        # repeated presses of a key are all returned
+        keys = self.kb.getKeys(keyList=["b"], waitRelease=False, clear=True)
+        assert keys[0] is presses[1] and keys[1] is presses[3]
+        assert self.kb.getKeys(keyList=["b"], waitRelease=False) == []
+        keys = self.kb.getKeys(ignoreKeys=["b"], waitRelease=False)
+        assert len(keys) == 1 and keys[0] is presses[2]
+        assert list(self.kb.responses) == [presses[0]]
+
     def testMuteOutsidePsychopyNotSlower(self):
         """
         Test that responses aren't worryingly slower when using muteOutsidePsychopy
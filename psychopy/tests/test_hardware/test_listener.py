@@ -0,0 +1,79 @@
+import socket
+import time
+
+from psychopy.hardware.listener import ListenerLoop
+
+
+class _SocketDevice:
+    """
+    Device which receives messages through a socket, so the loop can wait on its file descriptor.
+    """
+    def __init__(self):
+        self.reader, self.writer = socket.socketpair()
+        self.reader.setblocking(False)
+        self.nDispatches = 0
+        self.received = []
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def dispatchMessages(self):
+        self.nDispatches += 1
+        try:
+            while True:
+                data = self.reader.recv(1024)
+                if not data:
+                    break
+                self.received.append((time.perf_counter(), data))
+        except BlockingIOError:
+            pass
+
+
+class _PolledDevice:
+    """
+    Device which can only be polled, at its own interval.
+    """
+    pollInterval = 0.05
+
+    def __init__(self):
+        self.nDispatches = 0
+
+    def dispatchMessages(self):
+        self.nDispatches += 1
+
+
+class TestListenerLoop:
+    def setup_method(self):
+        self.loop = ListenerLoop()
+        self.loop.refreshRate = 0.01
+
+    def teardown_method(self):
+        self.loop.stop()
+
+    def test_wait_for_data(self):
+        device = _SocketDevice()
+        polled = _PolledDevice()
+        self.loop.addDevice(device)
+        self.loop.addDevice(polled)
+        self.loop.start()
+        # an idle device with a file descriptor isn't dispatched repeatedly
+        time.sleep(0.5)
+        assert device.nDispatches <= 2
+        # a polled device is dispatched at its own interval, not the refresh rate
+        assert 5 <= polled.nDispatches <= 15
+        # data is dispatched as soon as it arrives, without waiting for the refresh rate
+        for n in range(5):
+            sent = time.perf_counter()
+            device.writer.send(b"%i" % n)
+            timeout = sent + 1
+            while len(device.received) <= n and time.perf_counter() < timeout:
+                time.sleep(0.0001)
+            assert device.received[n][1] == b"%i" % n
+            assert device.received[n][0] - sent < self.loop.refreshRate
+        # a removed device isn't dispatched any more
+        self.loop.removeDevice(device)
+        time.sleep(0.05)
+        nDispatches = device.nDispatches
+        device.writer.send(b"ignored")
+        time.sleep(0.05)
+        assert device.nDispatches == nDispatches
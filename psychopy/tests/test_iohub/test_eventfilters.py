@@ -0,0 +1,67 @@
+""" Test iohub moving window event field filters
+"""
+import numpy as np
+
+from psychopy.iohub.devices.eventfilters import (
+    MovingWindowFilter, MedianFilter, WeightedAverageFilter)
+
+
+def _addEach(filt, values):
+    results = [filt.add(v) for v in values]
+    return np.array([r[1] for r in results if r is not None])
+
+
+class TestMovingWindowFilters():
+
+    def setup_method(self):
+        rng = np.random.RandomState(seed=42)
+        self.values = rng.rand(500).astype(np.float32) * 100
+
+    def _windows(self, length):
+        return np.lib.stride_tricks.sliding_window_view(self.values, length)
+
+    def test_mean(self):
+        filt = MovingWindowFilter(length=5, knot_pos='center')
+        filtered = _addEach(filt, self.values)
+        expected = self._windows(5).mean(axis=1, dtype=np.float64)
+        assert np.allclose(filtered, expected, atol=1e-4)
+
+    def test_median(self):
+        filt = MedianFilter(length=7, knot_pos='center')
+        filtered = _addEach(filt, self.values)
+        assert np.array_equal(filtered, np.median(self._windows(7), axis=1))
+        # nan in the window gives nan, until it has left the window again
+        filt.add(np.nan)
+        assert np.isnan(filt.filteredValue())
+        for v in range(7):
+            filt.add(v)
+        assert filt.filteredValue() == 3
+
+    def test_weighted_average(self):
+        weights = [1, 2, 3, 2, 5]
+        filt = WeightedAverageFilter(weights=weights, knot_pos='center')
+        filtered = _addEach(filt, self.values)
+        weights = np.array(weights) / np.sum(weights)
+        expected = np.convolve(self.values, weights, 'valid')
+        assert np.allclose(filtered, expected, atol=1e-4)
+
+    def test_filter_block(self):
+        filters = [
+            lambda: MovingWindowFilter(length=5, knot_pos='center'),
+            lambda: MedianFilter(length=5, knot_pos='center'),
+            lambda: WeightedAverageFilter(weights=[1, 2, 3],
+                                          knot_pos='latest'),
+        ]
+        for makeFilter in filters:
+            expected = _addEach(makeFilter(), self.values)
+            # in uneven blocks, some smaller than the window
+            filt = makeFilter()
+            blocks = []
+            for start, stop in [(0, 2), (2, 3), (3, 50), (50, 500)]:
+                _junk, filtered = filt.filterBlock(self.values[start:stop])
+                blocks.append(filtered)
+            assert np.allclose(np.concatenate(blocks), expected, atol=1e-4)
+            # window should be left as if values were added one at a time
+            assert np.isclose(filt.filteredValue(), expected[-1], atol=1e-4)
+            filt.clear()
+            assert filt.add(1.0) is None
@@ -0,0 +1,66 @@
+""" Test offline parsing of eye samples by the iohub eye event parser
+"""
+import numpy as np
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices.eyetracker.filters import parser
+
+
+def _makeParser(**kwargs):
+    display = {'mm_size': {'width': 500, 'height': 300},
+               'pixel_res': (1920, 1080),
+               'eye_distance': 600}
+    return parser.EyeTrackerEventParser(display_device=display,
+                                        sampling_rate=1000, **kwargs)
+
+
+def _binocularSamples(x, status):
+    dtype = [('time', np.float64), ('status', np.int64)] + [
+        (eye + field, np.float32) for eye in ('left_', 'right_')
+        for field in ('gaze_x', 'gaze_y', 'pupil_measure1')]
+    samples = np.zeros(len(x), dtype=dtype)
+    samples['time'] = np.arange(len(x)) / 1000.0
+    samples['status'] = status
+    for eye in ('left_', 'right_'):
+        samples[eye + 'gaze_x'] = x
+        samples[eye + 'pupil_measure1'] = 4.0
+    return samples
+
+
+class TestParseSampleArray():
+
+    def test_segmentation(self):
+        # fixation, saccade, fixation, blink, fixation
+        x = np.concatenate((np.zeros(200), np.linspace(0, 400, 20),
+                            np.full(380, 400.0)))
+        status = np.zeros(len(x), dtype=int)
+        status[400:450] = 22
+        samples = _binocularSamples(x, status)
+        events = _makeParser().parseSampleArray(samples,
+                                                velocity_threshold=30.0)
+        assert list(events['type']) == [
+            EventConstants.FIXATION_END, EventConstants.SACCADE_END,
+            EventConstants.FIXATION_END, EventConstants.BLINK_END,
+            EventConstants.FIXATION_END]
+        assert events['start_index'][3] == 400
+        assert events['end_index'][3] == 449
+        assert np.isclose(events['duration'][3], 0.049)
+        assert np.isclose(events['average_gaze_x'][2], 400.0)
+        assert np.isnan(events['average_gaze_x'][3])
+        # events cover every sample
+        assert events['start_index'][0] == 0
+        assert events['end_index'][-1] == len(x) - 1
+
+    def test_adaptive_thresholds(self):
+        # same thresholds as the online parser, once it has enough data
+        rng = np.random.RandomState(1)
+        velocity = np.abs(rng.standard_cauchy(400)) * 20
+        velocity[rng.rand(400) < 0.1] = 0
+        etParser = _makeParser(adaptive_vel_thresh_history=0.05)
+        etParser.io_event_ix = ['velocity_x', 'velocity_y'].index
+        online = np.array([
+            etParser.addVelocityToAdaptiveThreshold([v, v])[0]
+            for v in velocity])
+        offline = parser._adaptiveVelocityThresholds(velocity, 50, 1)
+        compare = np.flatnonzero(velocity > 0)[50:]
+        assert np.allclose(online[compare], offline[compare])
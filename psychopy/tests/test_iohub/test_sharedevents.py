@@ -0,0 +1,57 @@
+""" Test the shared memory event transport used between iohub and psychopy
+"""
+import os
+
+import numpy as np
+
+from psychopy.iohub.sharedevents import (SharedEventRing, sharedEventRingName,
+                                         canShareEventType)
+
+dtype = np.dtype([('event_id', np.uint32), ('time', np.float64),
+                  ('x_position', np.float64)])
+
+
+class TestSharedEventRing():
+
+    def setup_method(self):
+        name = sharedEventRingName(os.getpid(), 'test')
+        self.writer = SharedEventRing(name, dtype, capacity=8, create=True)
+        self.reader = SharedEventRing(name, dtype)
+
+    def teardown_method(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_read(self):
+        assert len(self.reader.read()) == 0
+        for i in range(5):
+            self.writer.write([i, i / 10.0, i * 2.0])
+        assert len(self.reader) == 5
+        events = self.reader.read()
+        assert events.dtype == dtype
+        assert list(events['event_id']) == [0, 1, 2, 3, 4]
+        assert events['x_position'][-1] == 8.0
+        # only new events on the next read
+        self.writer.write([5, 0.5, 10.0])
+        assert list(self.reader.read()['event_id']) == [5]
+        self.writer.write([6, 0.6, 12.0])
+        self.reader.clear()
+        assert len(self.reader.read()) == 0
+
+    def test_overflow(self):
+        for i in range(20):
+            self.writer.write([i, i / 10.0, 0.0])
+        events = self.reader.read()
+        # only the newest capacity events are kept
+        assert list(events['event_id']) == list(range(12, 20))
+        assert self.reader.lost == 12
+
+    def test_event_types(self):
+        class NumericEvent:
+            NUMPY_DTYPE = dtype
+
+        class TextEvent:
+            NUMPY_DTYPE = np.dtype([('time', np.float64), ('text', 'S16')])
+
+        assert canShareEventType(NumericEvent)
+        assert not canShareEventType(TextEvent)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import shutil
+from pathlib import Path
+from tempfile import mkdtemp
+
+from psychopy import prefs
+from psychopy.tools import fontmanager
+
+
+class TestFontIndex:
+    def setup_method(self):
+        # font info is shared between managers and cleared when one is
+        # deleted, so keep them all until the end of the test
+        self.managers = []
+        self.tmpDir = mkdtemp(prefix='psychopy-tests-fontindex')
+        self._cacheDir = prefs.paths['userCacheDir']
+        prefs.paths['userCacheDir'] = self.tmpDir
+
+    def teardown_method(self):
+        self.managers = []
+        prefs.paths['userCacheDir'] = self._cacheDir
+        shutil.rmtree(self.tmpDir)
+
+    def _manager(self, fontIndex):
+        fm = fontmanager.FontManager(fontIndex=fontIndex)
+        self.managers.append(fm)
+        return fm
+
+    def _noReading(self, monkeypatch):
+        def _readFontFaces(self, fontPath):
+            raise AssertionError("read {} with FreeType".format(fontPath))
+        monkeypatch.setattr(
+            fontmanager.FontManager, '_readFontFaces', _readFontFaces)
+
+    def test_full(self, monkeypatch):
+        fm = self._manager('off')
+        families = sorted(fm.getFontFamilyNames())
+        styles = list(fm.getFontFamilyStyles())
+        assert not (Path(self.tmpDir) / "fontIndex.json").exists()
+
+        fm = self._manager('full')
+        assert (Path(self.tmpDir) / "fontIndex.json").exists()
+        assert sorted(fm.getFontFamilyNames()) == families
+        assert fm.getFontFamilyStyles() == styles
+
+        # second time around everything comes from the index
+        self._noReading(monkeypatch)
+        fm = self._manager('full')
+        assert sorted(fm.getFontFamilyNames()) == families
+        assert fm.getFontFamilyStyles() == styles
+        info = fm.getFontsMatching(families[0], fallback=False)[0]
+        assert isinstance(info.path, Path)
+
+    def test_stale(self):
+        self._manager('full')
+        index = fontmanager.FontIndex()
+        fontPath = next(iter(index.entries))
+        # a changed file is read again, a removed one is dropped
+        index.entries[fontPath]['size'] += 1
+        index.entries['/no/such/font.ttf'] = dict(
+            index.entries[fontPath])
+        index.changed = True
+        index.save()
+        self._manager('full')
+        index.load()
+        assert '/no/such/font.ttf' not in index
+        assert (index.entries[fontPath]['size'] ==
+                Path(fontPath).stat().st_size)
+
+    def test_lazy(self, monkeypatch):
+        fm = self._manager('full')
+        families = sorted(fm.getFontFamilyNames())
+
+        # font folders should only be searched on a miss
+        nSearches = []
+        findFontFiles = fontmanager.findFontFiles
+        def _findFontFiles(folders=(), recursive=True):
+            if not folders:
+                nSearches.append(1)
+            return findFontFiles(folders, recursive)
+        monkeypatch.setattr(fontmanager, 'findFontFiles', _findFontFiles)
+        self._noReading(monkeypatch)
+
+        fm = self._manager('lazy')
+        assert sorted(fm.getFontFamilyNames()) == families
+        assert fm.getFontsMatching(families[0], fallback=False)
+        assert not nSearches
+        assert fm.getFontsMatching('No Such Font', fallback=False) is None
+        assert fm.getFontsMatching('No Such Font', fallback=False) is None
+        assert len(nSearches) == 1
+
+
+class TestGLFontCache:
+    def setup_method(self):
+        self.tmpDir = mkdtemp(prefix='psychopy-tests-fontatlas')
+        self._cacheDir = prefs.paths['userCacheDir']
+        prefs.paths['userCacheDir'] = self.tmpDir
+        self.manager = fontmanager.FontManager(fontIndex='off')
+        fontInfo = self.manager.getDefaultSansFont()
+        self.fontPath = fontInfo.path
+
+    def teardown_method(self):
+        self.manager = None
+        prefs.paths['userCacheDir'] = self._cacheDir
+        shutil.rmtree(self.tmpDir)
+
+    def test_preload(self, monkeypatch):
+        chars = "The quick brown fox jumps over the lazy dog"
+        font = fontmanager.GLFont(self.fontPath, 24)
+        font.preload(charcodes=chars)
+        assert font.cacheFile.is_file()
+        glyph = font.glyphs['T']
+
+        # a new font gets the same glyphs and texture without rendering
+        def fetch(self, charcodes='', face=None):
+            assert all(c in self.glyphs for c in charcodes)
+        monkeypatch.setattr(fontmanager.GLFont, 'fetch', fetch)
+        cached = fontmanager.GLFont(self.fontPath, 24)
+        cached.preload(charcodes=chars)
+        assert set(cached.glyphs) == set(font.glyphs)
+        assert cached.glyphs['T'].size == glyph.size
+        assert cached.glyphs['T'].offset == glyph.offset
+        assert cached.glyphs['T'].advance == glyph.advance
+        assert cached.glyphs['T'].texcoords == glyph.texcoords
+        assert (cached.atlas.data == font.atlas.data).all()
+        assert cached.atlas.nodes == font.atlas.nodes
+
+        # a font which is already in use keeps its own texture and glyphs
+        monkeypatch.undo()
+        inUse = fontmanager.GLFont(self.fontPath, 24)
+        inUse.fetch("zyx")
+        texcoords = inUse.glyphs['z'].texcoords
+        u0, v0, u1, v1 = texcoords
+        region = (slice(round(v0 * inUse.atlas.height),
+                        round(v1 * inUse.atlas.height)),
+                  slice(round(u0 * inUse.atlas.width),
+                        round(u1 * inUse.atlas.width)))
+        pixels = inUse.atlas.data[region].copy()
+        assert not inUse.loadFromCache()
+        inUse.preload(charcodes=chars)
+        assert set(chars) <= set(inUse.glyphs)
+        assert inUse.glyphs['z'].texcoords == texcoords
+        assert (inUse.atlas.data[region] == pixels).all()
+
+        # but not a different size
+        other = fontmanager.GLFont(self.fontPath, 32)
+        assert other.cacheFile != font.cacheFile
+        assert not other.loadFromCache(font.cacheFile)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests and benchmark of how long it takes to import PsychoPy.
+
+Run as a script to print how long each package takes to import, with and
+without lazy imports (see `psychopy.tools.importtools`)::
+
+    python psychopy/tests/test_misc/test_import_time.py
+
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# packages to benchmark, and modules which a lazy import of them shouldn't need
+packages = {
+    'psychopy': ['psychopy.visual', 'psychopy.hardware', 'psychopy.data'],
+    'psychopy.tools.mathtools': ['psychopy.visual', 'pyglet.gl', 'wx'],
+    'psychopy.data': ['psychopy.visual', 'pyglet.gl', 'wx', 'openpyxl',
+                      'psychopy.data.staircase'],
+    'psychopy.hardware': ['psychopy.visual', 'pyglet.gl', 'wx',
+                          'psychopy.hardware.manager', 'serial'],
+    'psychopy.visual': ['pyglet.gl', 'pyglet.window', 'wx',
+                        'psychopy.visual.window', 'psychopy.event'],
+}
+
+_script = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+t = time.perf_counter() - t0
+print(t)
+print(','.join(name for name in {unwanted!r} if name in sys.modules))
+print('__git_sha__' in vars(sys.modules['psychopy']))
+"""
+
+
+def importTime(module, lazy=False, unwanted=()):
+    """Import a module in a new Python process.
+
+    Returns
+    -------
+    tuple
+        Time taken (s) to import the module, the names in `unwanted` which
+        were imported too, and whether psychopy's git sha had been looked up.
+    """
+    env = dict(os.environ)
+    env['PSYCHOPYLAZYIMPORTS'] = '1' if lazy else '0'
+    # make sure the psychopy being tested is the one imported
+    root = str(Path(__file__).parent.parent.parent.parent)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + [p for p in env.get('PYTHONPATH', '').split(os.pathsep) if p])
+    output = subprocess.check_output(
+        [sys.executable, '-c', _script.format(module=module,
+                                              unwanted=list(unwanted))],
+        env=env, stderr=subprocess.DEVNULL, universal_newlines=True)
+    t, imported, haveSha = output.strip().splitlines()[-3:]
+    return float(t), [name for name in imported.split(',') if name], \
+        haveSha == 'True'
+
+
+@pytest.mark.parametrize('module', [
+    'psychopy', 'psychopy.tools.mathtools', 'psychopy.data',
+    'psychopy.hardware', 'psychopy.visual'
+])
+def test_lazy_imports(module):
+    t, imported, haveSha = importTime(module, lazy=True,
+                                      unwanted=packages[module])
+    assert not imported, (
+        "lazily importing {} also imported {}".format(module, imported))
+    # git is only asked for the sha when it's used
+    assert not haveSha
+
+
+if __name__ == '__main__':
+    print("%-28s %10s %10s" % ("import time (ms)", "eager", "lazy"))
+    for module in packages:
+        times = []
+        for lazy in (False, True):
+            try:
+                times.append("%10.1f" % (importTime(module, lazy)[0] * 1000))
+            except subprocess.CalledProcessError:
+                times.append("%10s" % "failed")
+        print("%-28s %s %s" % (module, times[0], times[1]))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import time
+from tempfile import mkdtemp
+
+from psychopy import logging
+
+
+class TestLogFile:
+    def setup_class(self):
+        self.tmpDir = mkdtemp(prefix='psychopy-tests-logging')
+
+    def teardown_class(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_background(self):
+        logger = logging._Logger()
+        fileName = os.path.join(self.tmpDir, 'background.log')
+        logFile = logging.LogFile(fileName, level=logging.DATA,
+                                  logger=logger, background=True)
+        assert logFile.background
+        for n in range(100):
+            logger.log("message %i" % n, level=logging.DATA, t=n)
+        logger.flush()
+        logFile.close()
+        assert not logFile.background
+        with open(fileName, encoding='utf8') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 100
+        assert lines[-1].endswith("message 99")
+
+    def test_rotate(self):
+        logger = logging._Logger()
+        fileName = os.path.join(self.tmpDir, 'rotate.log')
+        logging.LogFile(fileName, level=logging.DATA, logger=logger,
+                        maxBytes=100, backupCount=2)
+        for n in range(10):
+            logger.log("x" * 60, level=logging.DATA, t=n)
+            logger.flush()
+        # two backups kept, plus the current file
+        assert os.path.isfile(fileName + ".1")
+        assert os.path.isfile(fileName + ".2")
+        assert not os.path.isfile(fileName + ".3")
+        assert os.path.getsize(fileName + ".1") >= 100
+
+    def test_rotate_error(self, monkeypatch):
+        logger = logging._Logger()
+        fileName = os.path.join(self.tmpDir, 'rotate_error.log')
+        logFile = logging.LogFile(fileName, level=logging.DATA, logger=logger,
+                                  maxBytes=100, backupCount=2)
+
+        # e.g. another process has the file open on Windows
+        def replace(src, dst):
+            raise PermissionError("file in use")
+        monkeypatch.setattr(os, "replace", replace)
+        for n in range(5):
+            logger.log("x" * 60, level=logging.DATA, t=n)
+            logger.flush()
+        # logging carries on in the same file, without rotating
+        assert not logFile.stream.closed
+        assert logFile.maxBytes is None
+        with open(fileName, encoding='utf8') as f:
+            assert len(f.read().splitlines()) == 5
+
+    def test_background_error(self):
+        class _FailingStream(io.StringIO):
+            failures = 1
+
+            def write(self, txt):
+                if self.failures:
+                    self.failures -= 1
+                    raise OSError("disk full")
+                return super().write(txt)
+
+        logger = logging._Logger()
+        stream = _FailingStream()
+        logFile = logging.LogFile(stream, level=logging.DATA, logger=logger,
+                                  background=True)
+        logger.log("lost", level=logging.DATA, t=0)
+        logger.flush()
+        # the writer thread gives up and goes back to writing synchronously
+        timeout = time.time() + 5
+        while logFile.background and time.time() < timeout:
+            time.sleep(0.01)
+        assert not logFile.background
+        logger.log("written", level=logging.DATA, t=1)
+        logger.flush()
+        assert stream.getvalue().endswith("written\n")
+        logFile.close()
+
+
+class TestRetention:
+    def setup_class(self):
+        self.tmpDir = mkdtemp(prefix='psychopy-tests-logging')
+
+    def teardown_class(self):
+        shutil.rmtree(self.tmpDir)
+
+    def _logMany(self, logger, n=100):
+        # entries are only kept if there's a target to receive them
+        logging.LogFile(io.StringIO(), level=logging.DATA, logger=logger)
+        for i in range(n):
+            logger.log("message %i" % i, level=logging.DATA, t=i / 10)
+            logger.flush()
+
+    def test_ring(self):
+        logger = logging._Logger()
+        logger.setRetention('ring', maxEntries=10)
+        self._logMany(logger)
+        assert len(logger.flushed) == 10
+        assert logger.flushed[-1].message == "message 99"
+
+    def test_none(self):
+        logger = logging._Logger()
+        logger.setRetention('none')
+        self._logMany(logger)
+        assert len(logger.flushed) == 0
+
+    def test_spill(self):
+        logger = logging._Logger()
+        fileName = os.path.join(self.tmpDir, 'spill.psylog')
+        logger.setRetention('spill', maxEntries=0, fileName=fileName)
+        self._logMany(logger)
+        assert len(logger.flushed) == 0
+        logger.setRetention('all')
+        entries = logging.readBinaryLog(fileName)
+        assert len(entries) == 100
+        assert entries[-1].message == "message 99"
+        assert entries[-1].levelname == 'DATA'
+        assert abs(entries[-1].t_ms - 9900) < 1e-6
+
+    def test_entry_format(self):
+        entry = logging._LogEntry(level=logging.EXP, message="hello", t=1.5)
+        assert not hasattr(entry, '__weakref__')
+        msg = logging.root.format.format(**entry.__dict__)
+        assert msg == "1.5000 \tEXP \thello"
@@ -0,0 +1,76 @@
+import os
+import shutil
+import sys
+from tempfile import mkdtemp
+
+import importlib.metadata
+
+from psychopy import plugins
+from psychopy.preferences import prefs
+
+
+def _makeDistribution(folder, name, group, entryPoint):
+    """
+    Write the metadata of a distribution which advertises an entry point.
+    """
+    distInfo = os.path.join(folder, "{}-0.1.dist-info".format(name))
+    os.mkdir(distInfo)
+    with open(os.path.join(distInfo, "METADATA"), "w") as f:
+        f.write("Metadata-Version: 2.1\nName: {}\nVersion: 0.1\n".format(name))
+    with open(os.path.join(distInfo, "entry_points.txt"), "w") as f:
+        f.write("[{}]\n{}\n".format(group, entryPoint))
+
+
+class TestEntryPointIndex:
+    def setup_method(self):
+        self.tmpDir = mkdtemp(prefix='psychopy-tests-plugins')
+        self.packagesDir = os.path.join(self.tmpDir, "packages")
+        os.mkdir(self.packagesDir)
+        self._paths = dict(prefs.paths)
+        prefs.paths['packages'] = self.packagesDir
+        prefs.paths['userCacheDir'] = os.path.join(self.tmpDir, "cache")
+        sys.path.append(self.packagesDir)
+        plugins._entry_point_index_ = None
+
+    def teardown_method(self):
+        sys.path.remove(self.packagesDir)
+        prefs.paths.clear()
+        prefs.paths.update(self._paths)
+        plugins._entry_point_index_ = None
+        plugins.scanPlugins()
+        shutil.rmtree(self.tmpDir, ignore_errors=True)
+
+    def test_index(self, monkeypatch):
+        _makeDistribution(
+            self.packagesDir, "psychopy_fake_plugin", "psychopy.visual",
+            "FakeStim = psychopy_fake_plugin.stim:FakeStim")
+        assert plugins.scanPlugins() >= 1
+        assert "psychopy-fake-plugin" in plugins.listPlugins()
+        assert plugins.pluginEntryPoints("psychopy-fake-plugin", parse=True) == {
+            'psychopy.visual': {'FakeStim': 'psychopy_fake_plugin.stim.FakeStim'}}
+        eps = plugins.getEntryPointGroup("psychopy.visual")
+        assert "psychopy_fake_plugin.stim:FakeStim" in [ep.value for ep in eps]
+        assert os.path.isfile(plugins._getIndexFile())
+
+        # a new session reads the saved index rather than scanning packages
+        scanned = []
+
+        def distributions(path):
+            scanned.extend(path)
+            return []
+
+        monkeypatch.setattr(importlib.metadata, "distributions", distributions)
+        plugins._entry_point_index_ = None
+        plugins.scanPlugins()
+        assert "psychopy-fake-plugin" in plugins.listPlugins()
+        assert self.packagesDir not in scanned
+        monkeypatch.undo()
+
+        # installing a package makes the index out of date
+        _makeDistribution(
+            self.packagesDir, "psychopy_other_plugin", "psychopy.experiment.components",
+            "FakeComponent = psychopy_other_plugin:FakeComponent")
+        plugins.scanPlugins()
+        assert "psychopy-other-plugin" in plugins.listPlugins()
+        eps = plugins.getEntryPointGroup("psychopy.experiment", subgroups=True)
+        assert "psychopy_other_plugin:FakeComponent" in [ep.value for ep in eps]
@@ -246,6 +246,34 @@ def test_audioclip_concat():
     assert np.allclose(clipData.samples, newClip4.samples)
 
 
+@pytest.mark.audioclip
+def test_audioclip_append_many():
+    """Test building up a clip from many small chunks.
+    """
+    rng = np.random.default_rng(0)
+    chunks = [rng.uniform(-1, 1, (n, 2)).astype(np.float32)
+              for n in rng.integers(1, 100, 500)]
+    clip = AudioClip(chunks[0], sampleRateHz=SAMPLE_RATE_16kHz)
+    firstSamples = clip.samples
+    for i, chunk in enumerate(chunks[1:]):
+        if i % 2:
+            clip += AudioClip(chunk, sampleRateHz=SAMPLE_RATE_16kHz)
+        else:
+            clip.append(AudioClip(chunk, sampleRateHz=SAMPLE_RATE_16kHz))
+
+    expected = np.concatenate(chunks)
+    assert np.array_equal(clip.samples, expected)
+    assert clip.samples.flags.c_contiguous
+    assert np.isclose(clip.duration, len(expected) / SAMPLE_RATE_16kHz)
+    # arrays handed out before appending are left alone
+    assert np.array_equal(firstSamples, chunks[0])
+
+    # replacing the samples starts a new buffer
+    clip.samples = chunks[0]
+    clip.append(AudioClip(chunks[1], sampleRateHz=SAMPLE_RATE_16kHz))
+    assert np.array_equal(clip.samples, np.concatenate(chunks[:2]))
+
+
 @pytest.mark.audioclip
 def test_audioclip_file():
     """Test saving and loading audio samples from files. Checks the integrity
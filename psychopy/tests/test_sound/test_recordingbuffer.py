@@ -0,0 +1,98 @@
+"""Tests for the `RecordingBuffer` class.
+"""
+import os
+import shutil
+from tempfile import mkdtemp
+
+import numpy as np
+import soundfile as sf
+
+from psychopy.hardware.microphone import RecordingBuffer
+
+
+class TestRecordingBufferSpill:
+    def setup_class(self):
+        self.tmpDir = mkdtemp(prefix='psychopy-tests-recbuffer')
+
+    def teardown_class(self):
+        shutil.rmtree(self.tmpDir)
+
+    def _record(self, buffer, nChunks=50, chunkSize=1000):
+        rng = np.random.default_rng(0)
+        samples = rng.uniform(-1, 1, (nChunks * chunkSize, 2)).astype(
+            np.float32)
+        buffer.seek(0, absolute=True)
+        for i in range(nChunks):
+            assert buffer.write(samples[i * chunkSize:(i + 1) * chunkSize]) == 0
+
+        return samples
+
+    def test_spill(self):
+        fileName = os.path.join(self.tmpDir, 'spill.wav')
+        # 16000 stereo samples fit in memory
+        buffer = RecordingBuffer(sampleRateHz=16000, channels=2,
+                                 maxRecordingSize=128, policyWhenFull='spill',
+                                 spillFile=fileName)
+        samples = self._record(buffer)
+        assert not buffer.isFull
+        assert buffer.spilledSamples == 48000
+        assert buffer.lastSample == len(samples)
+        assert buffer.nbytes == 128000
+
+        # recent samples come straight from memory
+        clip = buffer.getSegment(3.0)
+        assert np.array_equal(clip.samples, samples[48000:])
+
+        clip = buffer.getSegment()
+        assert isinstance(clip.samples.base, np.memmap)
+        assert np.array_equal(clip.samples, samples)
+        clip = buffer.getSegment(1.0, 2.0)
+        assert np.array_equal(clip.samples, samples[16000:32000])
+
+        # spill file is a valid wav file of the whole recording
+        data, sampleRateHz = sf.read(fileName, dtype='float32')
+        assert sampleRateHz == 16000
+        assert np.array_equal(data, samples)
+
+        # a new recording replaces the last one
+        del clip
+        samples = self._record(buffer, nChunks=20)
+        assert np.array_equal(buffer.getSegment().samples, samples)
+
+        buffer.close()
+        assert os.path.isfile(fileName)  # not a temporary file
+
+    def test_spill_file_reused(self):
+        fileName = os.path.join(self.tmpDir, 'reused.wav')
+        buffer = RecordingBuffer(sampleRateHz=16000, channels=2,
+                                 maxRecordingSize=128, policyWhenFull='spill',
+                                 spillFile=fileName)
+        samples = self._record(buffer)
+        # a recording which doesn't spill leaves the caller's file alone
+        buffer.seek(0, absolute=True)
+        assert os.path.isfile(fileName)
+        assert buffer.spillFile == fileName
+        # a recording which spills while a clip still maps the file goes to a
+        # new file beside it
+        samples = self._record(buffer)
+        clip = buffer.getSegment()
+        newSamples = self._record(buffer, nChunks=40)
+        assert buffer.spillFile != fileName
+        assert os.path.dirname(buffer.spillFile) == self.tmpDir
+        assert np.array_equal(clip.samples, samples)
+        assert np.array_equal(buffer.getSegment().samples, newSamples)
+        data, _ = sf.read(fileName, dtype='float32')
+        assert np.array_equal(data, samples)
+        del clip
+        buffer.close()
+        assert os.path.isfile(fileName)
+
+    def test_spill_temp_file(self):
+        buffer = RecordingBuffer(sampleRateHz=16000, channels=2,
+                                 maxRecordingSize=128, policyWhenFull='spill')
+        samples = self._record(buffer)
+        fileName = buffer.spillFile
+        assert os.path.isfile(fileName)
+        assert np.array_equal(buffer.getSegment().samples, samples)
+        buffer.close()
+        assert not os.path.isfile(fileName)
@@ -0,0 +1,53 @@
+"""Tests for the `VoiceActivityDetector` class.
+"""
+import numpy as np
+
+from psychopy.hardware.microphone import VoiceActivityDetector
+
+
+def _makeSignal(sampleRateHz=16000):
+    """1s of quiet noise, 0.5s of a 200Hz tone, then 1s of quiet noise."""
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 0.002, int(2.5 * sampleRateHz))
+    t = np.arange(int(0.5 * sampleRateHz)) / sampleRateHz
+    noise[sampleRateHz:sampleRateHz + len(t)] += 0.2 * np.sin(
+        2 * np.pi * 200 * t)
+
+    return np.column_stack((noise, noise)).astype(np.float32)
+
+
+def test_onset_offset():
+    sampleRateHz = 16000
+    signal = _makeSignal(sampleRateHz)
+    # feed in uneven blocks, as they come off a stream
+    events = []
+    detector = VoiceActivityDetector(sampleRateHz=sampleRateHz)
+    blockSizes = [317, 800, 1024]
+    i = iBlock = 0
+    while i < len(signal):
+        n = blockSizes[iBlock % len(blockSizes)]
+        events.extend(detector.process(signal[i:i + n]))
+        i += n
+        iBlock += 1
+    assert detector.samplesIn == len(signal)
+
+    assert len(events) == 2
+    (tOn, isOnset, rms), (tOff, isOffset, _) = events
+    assert isOnset and not isOffset
+    assert abs(tOn - 1.0) <= 0.01
+    assert abs(tOff - 1.5) <= 0.01
+    assert rms > 0.1
+    assert not detector.isVoiced
+
+    # same result in one block
+    detector.reset()
+    assert detector.process(signal) == events
+
+
+def test_noise_rejected():
+    sampleRateHz = 16000
+    rng = np.random.default_rng(1)
+    detector = VoiceActivityDetector(sampleRateHz=sampleRateHz)
+    detector.process(rng.normal(0, 0.002, sampleRateHz))
+    # loud white noise crosses zero too often to be a voice
+    assert detector.process(rng.normal(0, 0.2, sampleRateHz)) == []
@@ -152,4 +152,63 @@ class TestDots:
         # If dots have moved, then there should be more white on the compound screen than on either original
         assert compound.mean() > screen1.mean() and compound.mean() > screen2.mean(), (
             "Dot stimulus does not appear to have moved across two frames."
-        )
\ No newline at end of file
+        )
+
+    def test_batched_element(self):
+        # a GratingStim element should be drawn in one go, giving the same
+        # image as drawing it once per dot
+        self.win.color = "black"
+        self.win.flip()
+        element = visual.GratingStim(
+            self.win, units="pix", size=8, sf=None, mask="circle")
+        obj = visual.DotStim(
+            self.win, nDots=20, units="pix",
+            fieldPos=(0, 0), fieldSize=(100, 100), element=element,
+            dotLife=0, speed=0, coherence=1
+        )
+        obj.draw()
+        assert obj._elementArray is not None
+        batched = np.array(self.win._getFrame(buffer="back"), dtype=float)
+        self.win.flip()
+        # draw again one element at a time
+        obj.batchElements = False
+        obj.draw()
+        looped = np.array(self.win._getFrame(buffer="back"), dtype=float)
+        self.win.flip()
+        assert np.abs(batched - looped).mean() < 2
+        # changing the element should remake the batch
+        array = obj._elementArray
+        obj.batchElements = True
+        element.ori = 45
+        obj.draw()
+        assert obj._elementArray is not array
+        self.win.flip()
+
+    def test_precomputed_trajectory(self):
+        params = dict(
+            win=self.win, nDots=50, units="height", fieldSize=(1, 1),
+            fieldShape='circle', dotLife=5, noiseDots='walk',
+            signalDots='different', coherence=0.5, speed=0.01
+        )
+        obj1 = visual.DotStim(**params)
+        obj2 = visual.DotStim(**params)
+        # same seed should give exactly the same dots
+        traj1 = obj1.precomputeTrajectory(10, seed=1)
+        traj2 = obj2.precomputeTrajectory(10, seed=1)
+        assert traj1.shape == (10, 50, 2)
+        assert np.array_equal(traj1, traj2)
+        # different seed should not
+        traj3 = obj2.precomputeTrajectory(10, seed=2)
+        assert not np.array_equal(traj1, traj3)
+        # reusing a seed on the same stimulus should give the same dots again
+        traj4 = obj2.precomputeTrajectory(10, seed=1)
+        assert np.array_equal(traj1, traj4)
+        # drawing should step through the precomputed frames in order
+        for frameN in range(10):
+            obj1.draw()
+            assert np.allclose(obj1.vertices * obj1.fieldSize, traj1[frameN])
+        # then go back to updating live
+        assert obj1.trajectory is None
+        obj1.draw()
+        assert not np.allclose(obj1.vertices * obj1.fieldSize, traj1[-1])
+        self.win.flip()
@@ -452,6 +452,37 @@ class Test_textbox(_TestColorMixin, _TestUnitsMixin, _TestBoilerplateMixin):
             self.win.getMovieFrame(buffer='back').save(filename)
             utils.compareScreenshot(filename, self.win, crit=20)
 
+    def test_typing_layout(self):
+        """Check that editing a long passage lays it out the same as setting the whole text"""
+        textbox = TextBox2(self.win, "A PsychoPy zealot knows a smidge of wx. " * 20,
+                           size=(128, 128), units='pix', letterHeight=12,
+                           lineBreaking=self.textbox._lineBreaking)
+        # type at the end, in the middle of a line and over a line break
+        textbox.caret.index = len(textbox._text)
+        for letter in "antidisestablishmentarianism is\na long word":
+            textbox._onText(letter)
+        textbox.caret.index = 30
+        for letter in "JavaScript ":
+            textbox._onText(letter)
+        for key in ('MOTION_BACKSPACE', 'MOTION_DELETE', 'MOTION_BACKSPACE'):
+            textbox._onCursorKeys(key)
+        typed = textbox._vertices.pix.copy()
+        typedLines = list(textbox._lineLenChars)
+        # lay out from scratch
+        textbox.text = textbox.text
+        assert typedLines == textbox._lineLenChars
+        assert np.allclose(typed, textbox._vertices.pix)
+
+    def test_typing_tags(self):
+        """Check that tags typed into plain text are parsed, as when setting the whole text"""
+        textbox = TextBox2(self.win, "Plain text ", size=(128, 128), units='pix',
+                           letterHeight=12, lineBreaking=self.textbox._lineBreaking)
+        textbox.caret.index = len(textbox._text)
+        for letter in "<b>":
+            textbox._onText(letter)
+        assert textbox.text == "Plain text <b>"
+        assert textbox._text == "Plain text "
+
 
 def test_font_manager():
         # Create a font manager
@@ -1,3 +1,4 @@
+import time
 from copy import copy
 from pathlib import Path
 
@@ -105,3 +106,34 @@ class TestWindow:
                     coord=(0, 0),
                     context=f"win_{color}_{colorSpace}")
 
+    def test_frame_profiler(self):
+        win = visual.Window(size=(200, 200))
+        stims = [
+            visual.Rect(win, size=(0.5, 0.5), name="rect"),
+            visual.TextStim(win, text="profile", name="text"),
+        ]
+        for stim in stims:
+            stim.autoDraw = True
+        profiler = win.startFrameProfiler(maxFrames=5)
+        t0 = time.perf_counter()
+        for n in range(10):
+            win.flip()
+        elapsed = time.perf_counter() - t0
+        assert win.stopFrameProfiler() is profiler
+        win.flip()  # shouldn't be recorded
+        assert profiler.nFrames == 10
+        # only the last 5 frames are kept
+        times = profiler.getFrameTimes()
+        assert list(times['frame']) == [5, 6, 7, 8, 9]
+        assert "draw:rect" in times and "draw:text" in times
+        # phases are measured, so take some (non-negative) time which fits
+        # within the time taken by the flips
+        for name in profiler.phases[1:]:
+            assert (times[name] >= 0).all()
+        assert (times['total'] > 0).all()
+        assert times['total'].sum() <= elapsed
+        assert (times['start'] >= t0).all()
+        assert (times['start'] + times['total'] <= t0 + elapsed).all()
+        assert len(profiler.getWorstFrames(3)) == 3
+        assert "slowest frames" in profiler.report()
+        win.close()
@@ -16,6 +16,8 @@
 #
 import re
 import sys, os
+import json
+import hashlib
 import math
 import numpy as np
 import ctypes
@@ -74,6 +76,14 @@ def unicode(s, fmt='utf-8'):
     else:
         return s
 
+
+def _toBytes(s, fmt='utf-8'):
+    """Inverse of `unicode()`"""
+    if type(s) == str:
+        return s.encode(fmt)
+    else:
+        return s
+
 # this class was to get aorund the issue of constantly having to convert to
 # and from utf-8 because the ft.Face class uses b'' for family_name,
 # family_style but the problems run deeper than that (hot mess!). Maybe ft will
@@ -344,6 +354,7 @@ class GLFont:
         leading : int
             Position of the tops of the next line's ascenders relative to this line's baseline
     """
+    _cacheVersion = 1  # increase this if the atlas cache layout changes
 
     def __init__(self, filename, size, lineSpacing=1, textureSize=2048):
         """
@@ -461,21 +472,42 @@ class GLFont:
         self._dirty = False
         return self.atlas.textureID
 
-    def preload(self, nMax=None):
-        """
-        :return:
+    def preload(self, nMax=None, charcodes=None, cache=True):
+        """Build the glyphs for a whole set of characters up front, so that
+        they never need to be rendered while a trial is running.
+
+        Parameters
+        ----------
+        nMax : int or None
+            If `charcodes` isn't given, build (at most) this many glyphs of
+            the font's own character set, or the entire set if None.
+        charcodes : str, list or None
+            Characters to build glyphs for, e.g. all of the characters in
+            your conditions file.
+        cache : bool
+            Load the glyphs from the atlas cache (see :meth:`loadFromCache`)
+            first if the font has no glyphs yet, and save the atlas back to
+            it if any glyphs had to be rendered, so the next session with
+            this font and size starts with them already built.
         """
-        if nMax is None:
-            note = "entire glyph set"
+        if cache:
+            self.loadFromCache()
+        face = ft.Face(str(self.filename))  # ft.Face doesn't support Pathlib
+        if charcodes is None:
+            if nMax is None:
+                note = "entire glyph set"
+            else:
+                note = "{} glyphs".format(nMax)
+            chrs = (list(face.get_chars()))[:nMax]
+            charcodes = [chr(c[1]) for c in chrs]
         else:
-            note = "{} glyphs".format(nMax)
+            note = "{} glyphs".format(len(charcodes))
         logging.debug("Preloading {} for Texture Font {}"
                       .format(note, self.name))
-        face = ft.Face(str(self.filename))  # ft.Face doesn't support Pathlib
-
-        chrs = (list(face.get_chars()))[:nMax]
-        charcodes = [chr(c[1]) for c in chrs]
+        nGlyphs = len(self.glyphs)
         self.fetch(charcodes, face=face)
+        if cache and len(self.glyphs) > nGlyphs:
+            self.saveToCache()
         logging.debug("Preloading of glyph set for Texture Font {} complete"
                       .format(self.name))
 
@@ -491,6 +523,7 @@ class GLFont:
         """
         if face is None:
             face = ft.Face(str(self.filename))  # doesn't support Pathlib yet
+        face.set_pixel_sizes(int(self.size), int(self.size))
 
         # if current glyph is same as last then maybe blank glyph?
         lastGlyph = None
@@ -500,7 +533,6 @@ class GLFont:
         for charcode in charcodes:
             if charcode in self.glyphs:
                 continue
-            face.set_pixel_sizes(int(self.size), int(self.size))
 
             self._dirty = True
             flags = ft.FT_LOAD_RENDER | ft.FT_LOAD_FORCE_AUTOHINT
@@ -508,18 +540,25 @@ class GLFont:
 
             face.load_char(charcode, flags)
             bitmap = face.glyph.bitmap
+            width = bitmap.width
+            rows = bitmap.rows
+            pitch = bitmap.pitch
+            # copy the bitmap straight out of FreeType's buffer (the
+            # `buffer` attribute builds a list of every pixel each access)
+            nBytes = rows * abs(pitch)
+            if nBytes:
+                buffer = ctypes.string_at(bitmap._FT_Bitmap.buffer, nBytes)
+            else:
+                buffer = b''
             # check if this looks like a blank (same as a prev glyph)
-            if bitmap.buffer == lastGlyph:
+            if buffer == lastGlyph:
                 possibleBlank = lastGlyph
-            if bitmap.buffer == possibleBlank:  # whether newly detected or not
+            if buffer == possibleBlank:  # whether newly detected or not
                 nBlanks += 1
                 continue
-            lastGlyph = bitmap.buffer
+            lastGlyph = buffer
             left = face.glyph.bitmap_left
             top = face.glyph.bitmap_top
-            width = face.glyph.bitmap.width
-            rows = face.glyph.bitmap.rows
-            pitch = face.glyph.bitmap.pitch
 
             if self.format == 'rgb':
                 x, y, w, h = self.atlas.get_region(width / 5, rows + 2)
@@ -534,7 +573,8 @@ class GLFont:
             x, y = x + 1, y + 1
             w, h = w - 2, h - 2
 
-            data = np.array(bitmap.buffer).reshape(rows, pitch)
+            data = np.frombuffer(buffer, dtype=np.ubyte).reshape(
+                rows, abs(pitch))
             data = data[:h, :w]
 
             if self.format == 'rgb':
@@ -570,19 +610,128 @@ class GLFont:
         logging.debug("TextBox2 loaded {} chars with {} blanks and {} valid"
                      .format(len(charcodes), nBlanks, len(charcodes) - nBlanks))
 
-    def saveToCache(self):
-        """Store the current font texture as an image file.
+    @property
+    def cacheFile(self):
+        """Default file for :meth:`saveToCache` and :meth:`loadFromCache`,
+        in the user's cache folder and named after the font, size and
+        texture format.
+        """
+        fileStem = re.sub(r'[^\w\-]+', '_', "{}_{}_{}".format(
+            Path(self.filename).stem, self.size, self.format))
+        return (Path(prefs.paths['userCacheDir']) / "fontAtlases" /
+                "{}_{}.npz".format(fileStem, self._cacheKey()[:12]))
+
+    def _cacheKey(self):
+        """Hash of everything which changes the contents of the atlas: the
+        font file (and its modification time and size), the font size and
+        the texture size and format.
+        """
+        stat = Path(self.filename).stat()
+        key = "{}|{}|{}|{}|{}|{}x{}|{}".format(
+            self._cacheVersion, Path(self.filename).resolve(),
+            stat.st_mtime_ns, stat.st_size, self.size,
+            self.atlas.width, self.atlas.height, self.format)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def saveToCache(self, filename=None):
+        """Save the font texture along with the size, offset, advance and
+        texture coordinates of every glyph, so that a later session can use
+        :meth:`loadFromCache` instead of rendering the glyphs again.
 
-        As yet we aren't storing the offset, advance and texcoords as needed to
-        retrieve the necessary chars, but it's a start!
-            (see  TextureGlyph(charcode, size, offset, advance, texcoords) )
+        Parameters
+        ----------
+        filename : str, Path or None
+            File to save to (.npz), defaults to :attr:`cacheFile`.
+        """
+        if filename is None:
+            filename = self.cacheFile
+        filename = Path(filename)
+        glyphs = [glyph for glyph in self.glyphs.values()
+                  if isinstance(glyph.charcode, str)
+                  and len(glyph.charcode) == 1]
+        nodes = np.array(self.atlas.nodes, dtype=np.int64).reshape(-1, 3)
+        data = dict(
+            key=np.array(self._cacheKey()),
+            texture=self.atlas.data,
+            nodes=nodes,
+            used=np.array(self.atlas.used, dtype=np.int64),
+            charcodes=np.array([ord(g.charcode) for g in glyphs],
+                               dtype=np.uint32),
+            sizes=np.array([g.size for g in glyphs],
+                           dtype=np.int32).reshape(-1, 2),
+            offsets=np.array([g.offset for g in glyphs],
+                             dtype=np.float64).reshape(-1, 2),
+            advances=np.array([g.advance for g in glyphs],
+                              dtype=np.float64).reshape(-1, 2),
+            texcoords=np.array([g.texcoords for g in glyphs],
+                               dtype=np.float64).reshape(-1, 4),
+        )
+        tmpName = filename.with_name(filename.name + '.tmp')
+        try:
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmpName, 'wb') as f:
+                np.savez_compressed(f, **data)
+            os.replace(tmpName, filename)
+        except OSError as err:
+            logging.warning("Couldn't save font atlas cache {}: {}"
+                            .format(filename, err))
+            return
+        logging.debug("Saved {} glyphs of Texture Font {} to {}"
+                      .format(len(glyphs), self.name, filename))
+
+    def loadFromCache(self, filename=None):
+        """Replace the font texture and glyphs with those saved by
+        :meth:`saveToCache`.
+
+        The cache is only loaded into a font which hasn't built any glyphs
+        yet, as the texture coordinates of glyphs which are already in use
+        (e.g. by a TextBox2) would point at the wrong part of the new texture.
 
+        Parameters
+        ----------
+        filename : str, Path or None
+            File to load from (.npz), defaults to :attr:`cacheFile`.
+
+        Returns
+        -------
+        bool
+            True if the glyphs were loaded, False if the font already has
+            glyphs, or there is no cache or it was saved for a different font
+            file, size or texture.
         """
-        from PIL import Image
-        im = Image.fromarray(self.atlas.data)
-        fname = "{}/.psychopy3/{}_{}_texture.png".format(
-            os.path.expanduser("~"), self.name, self.size)
-        im.save(fname)
+        if self.glyphs:
+            return False
+        if filename is None:
+            filename = self.cacheFile
+        try:
+            with np.load(filename) as data:
+                if str(data['key']) != self._cacheKey():
+                    return False
+                texture = data['texture']
+                nodes = data['nodes']
+                used = int(data['used'])
+                glyphData = zip(
+                    data['charcodes'].tolist(), data['sizes'].tolist(),
+                    data['offsets'].tolist(), data['advances'].tolist(),
+                    data['texcoords'].tolist())
+                glyphs = {}
+                for code, size, offset, advance, texcoords in glyphData:
+                    charcode = chr(code)
+                    glyphs[charcode] = TextureGlyph(
+                        charcode, tuple(size), tuple(offset),
+                        tuple(advance), tuple(texcoords))
+        except (OSError, ValueError, KeyError):
+            return False
+        if texture.shape != self.atlas.data.shape:
+            return False
+        self.atlas.data[:] = texture
+        self.atlas.nodes = [tuple(node) for node in nodes.tolist()]
+        self.atlas.used = used
+        self.glyphs = glyphs
+        self._dirty = True
+        logging.debug("Loaded {} glyphs of Texture Font {} from {}"
+                      .format(len(glyphs), self.name, filename))
+        return True
 
     def upload(self):
         """Upload the font data into graphics card memory.
@@ -691,6 +840,91 @@ def findFontFiles(folders=(), recursive=True):
     return fontPaths
 
 
+class FontIndex():
+    """Index of the faces found in font files, saved to disk so that font files
+    only need to be read with FreeType when they are new or have changed.
+
+    Entries are keyed by the path of the font file and are stale if the file's
+    modification time or size has changed.
+
+    Parameters
+    ----------
+    filename : str, Path or None
+        File to save the index to. If None, `fontIndex.json` in the user's
+        cache folder is used.
+    """
+    version = 1  # increase this if the entries of FontInfo change
+
+    def __init__(self, filename=None):
+        if filename is None:
+            filename = Path(prefs.paths['userCacheDir']) / "fontIndex.json"
+        self.filename = Path(filename)
+        self.entries = {}  # path -> {'mtime', 'size', 'faces'}
+        self.changed = False
+        self.load()
+
+    def load(self):
+        """Load the index from disk, if it exists and is compatible."""
+        self.entries = {}
+        self.changed = False
+        try:
+            with open(self.filename, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == self.version:
+            self.entries = data.get('fonts', {})
+
+    def save(self):
+        """Save the index to disk, if it has changed since it was loaded."""
+        if not self.changed:
+            return
+        data = {'version': self.version, 'fonts': self.entries}
+        tmpName = self.filename.with_name(self.filename.name + '.tmp')
+        try:
+            self.filename.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmpName, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmpName, self.filename)
+        except OSError as err:
+            logging.warning("Could not save font index to {}: {}"
+                            .format(self.filename, err))
+            return
+        self.changed = False
+
+    def __contains__(self, fontPath):
+        return str(fontPath) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, fontPath, stat):
+        """Get the faces (as dicts of `FontInfo` values) of a font file, or 
+        None if the file isn't in the index or has changed since it was
+        added.
+        """
+        entry = self.entries.get(str(fontPath))
+        if entry is None:
+            return None
+        if entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+            return None
+        return entry['faces']
+
+    def set(self, fontPath, stat, faces):
+        """Add (or update) the faces of a font file."""
+        self.entries[str(fontPath)] = {
+            'mtime': stat.st_mtime, 'size': stat.st_size, 'faces': faces}
+        self.changed = True
+
+    def prune(self, fontPaths):
+        """Remove any entries for files not in fontPaths."""
+        keep = {str(fp) for fp in fontPaths}
+        for fontPath in list(self.entries):
+            if fontPath not in keep:
+                del self.entries[fontPath]
+                self.changed = True
+
+
 class FontManager():
     """FontManager provides a simple API for finding and loading font files
     (.ttf) via the FreeType lib
@@ -716,18 +950,33 @@ class FontManager():
     FontManager and can be used by all TextBox instances created within the
     experiment.
 
+    What is known about each system font file is kept in a `FontIndex` on disk
+    so that only new or changed font files need to be read at startup. With
+    `fontIndex='lazy'` the font folders are not even searched at startup,
+    only the first time a font is requested which isn't in the index. Use
+    `fontIndex='off'` to read every font file every time. If `fontIndex` is
+    None, the `general.fontIndex` preference is used.
+
     """
     freetype_import_error = None
     _glFonts = {}
     fontStyles = []
     _fontInfos = {}  # JWP: dict of name:FontInfo objects
 
-    def __init__(self, monospaceOnly=False):
+    def __init__(self, monospaceOnly=False, fontIndex=None):
         self.addFontDirectory(prefs.paths['resources'])
         # if FontManager.freetype_import_error:
         #    raise Exception('Appears the freetype library could not load.
         #       Error: %s'%(str(FontManager.freetype_import_error)))
 
+        if fontIndex is None:
+            fontIndex = prefs.general.get('fontIndex', 'full')
+        if fontIndex not in ('full', 'lazy', 'off'):
+            raise ValueError("Invalid value for `fontIndex`.")
+        self.fontIndexMode = fontIndex
+        self._fontIndex = FontIndex() if fontIndex != 'off' else None
+        self._searchedFontFolders = False
+
         self.monospaceOnly = monospaceOnly
         self.updateFontInfo(monospaceOnly)
 
@@ -792,6 +1041,8 @@ class FontManager():
         else:
             bold = _weightMap[False] # Default to regular
         style_dict = self._fontInfos.get(fontName)
+        if not style_dict and self._searchForNewFonts():
+            style_dict = self._fontInfos.get(fontName)
         if not style_dict:
             if not fallback:
                 return None
@@ -958,8 +1209,79 @@ class FontManager():
     def updateFontInfo(self, monospaceOnly=False):
         self._fontInfos.clear()
         del self.fontStyles[:]
-        fonts_found = findFontFiles()
-        self.addFontFiles(fonts_found, monospaceOnly)
+        if self._fontIndex is None:
+            fonts_found = findFontFiles()
+            self.addFontFiles(fonts_found, monospaceOnly)
+        elif self.fontIndexMode == 'lazy' and len(self._fontIndex):
+            # trust the font files in the index, unless they've changed
+            self._addIndexedFontFiles(
+                [Path(fp) for fp in self._fontIndex.entries], monospaceOnly)
+            self._searchedFontFolders = False
+        else:
+            self._addIndexedFontFiles(findFontFiles(), monospaceOnly)
+            self._searchedFontFolders = True
+
+    def _searchForNewFonts(self):
+        """In lazy mode, search the font folders for any font files which 
+        aren't in the index yet (only once per session).
+
+        Returns
+        -------
+        bool
+            True if the font folders were searched.
+        """
+        if self.fontIndexMode != 'lazy' or self._searchedFontFolders:
+            return False
+        self._searchedFontFolders = True
+        fontPaths = [fp for fp in findFontFiles()
+                     if fp not in self._fontIndex]
+        if fontPaths:
+            self._addIndexedFontFiles(fontPaths, self.monospaceOnly,
+                                      prune=False)
+        return True
+
+    def _addIndexedFontFiles(self, fontPaths, monospaceOnly=False,
+                             prune=True):
+        """Add font files, reading them with FreeType only if they aren't in
+        the index (or have changed) and updating the index to match.
+        """
+        found = []
+        for fp in fontPaths:
+            try:
+                stat = os.stat(fp)
+            except OSError:
+                continue
+            found.append(fp)
+            faces = self._fontIndex.get(fp, stat)
+            if faces is None:
+                faces = self._readFontFaces(fp)
+                self._fontIndex.set(fp, stat, faces)
+            for info in faces:
+                if monospaceOnly and not info['monospace']:
+                    continue
+                self._addFontInfo(FontInfo.fromDict(fp, info))
+        if prune:
+            self._fontIndex.prune(found)
+        self._fontIndex.save()
+        self.fontStyles.sort()
+
+    def _readFontFaces(self, fontPath):
+        """Read a font file with FreeType, returning its faces as dicts of 
+        `FontInfo` values.
+        """
+        try:
+            face = ft.Face(str(fontPath))
+        except Exception:
+            logging.warning("Font Manager failed to load file {}"
+                            .format(fontPath))
+            return []
+        if face.family_name is None:
+            logging.warning("{} doesn't have valid font family name"
+                            .format(fontPath))
+            return []
+        info = FontInfo(fontPath, face).asdict()
+        del info['path']
+        return [info]
 
     def booleansFromStyleName(self, style):
         """
@@ -985,17 +1307,23 @@ class FontManager():
 
     def _createFontInfo(self, fp, fface):
         """"""
-        fns = (fface.family_name, fface.style_name)
+        return self._addFontInfo(FontInfo(fp, fface))
+
+    def _addFontInfo(self, fi):
+        """Add a FontInfo to those available, keyed by family and style name
+        (as bytes, like FreeType gives them).
+        """
+        familyName = _toBytes(fi.family)
+        styleName = _toBytes(fi.style)
+        fns = (familyName, styleName)
         if fns in self.fontStyles:
             pass
         else:
-            self.fontStyles.append(
-                (fface.family_name, fface.style_name))
+            self.fontStyles.append(fns)
 
         styles_for_font_dict = FontManager._fontInfos.setdefault(
-            fface.family_name, {})
-        fonts_for_style = styles_for_font_dict.setdefault(fface.style_name, [])
-        fi = FontInfo(fp, fface)
+            familyName, {})
+        fonts_for_style = styles_for_font_dict.setdefault(styleName, [])
         fonts_for_style.append(fi)
         return fi
 
@@ -1025,6 +1353,16 @@ class FontInfo():
         self.charmap_id = face.charmap.index
         self.label = "%s_%s" % (face.family_name, face.style_name)
 
+    @classmethod
+    def fromDict(cls, fp, info):
+        """Create a FontInfo from the values given by `asdict()` (without 
+        reading the font file).
+        """
+        fi = cls.__new__(cls)
+        fi.__dict__.update(info)
+        fi.path = fp
+        return fi
+
     def __str__(self):
         """Generate a string identifier for this font name_style
         """
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Tools for importing the contents of PsychoPy's packages lazily.
+
+Setting the environment variable `PSYCHOPYLAZYIMPORTS=1` before importing
+PsychoPy makes `psychopy.visual`, `psychopy.hardware` and `psychopy.data`
+import their classes and functions from their submodules when they are first
+used, rather than when the package is imported. Scripts which only use part
+of a package (e.g. `psychopy.data` without any plotting or `psychopy.visual`
+helpers without a window) then don't pay for importing the rest.
+"""
+
+__all__ = [
+    'lazyImportsEnabled',
+    'makeLazyGetattr'
+]
+
+import importlib
+import os
+import sys
+
+
+def lazyImportsEnabled():
+    """Whether packages should import their contents lazily, i.e. whether the
+    environment variable `PSYCHOPYLAZYIMPORTS` is set to 1.
+
+    Returns
+    -------
+    bool
+    """
+    return os.environ.get('PSYCHOPYLAZYIMPORTS', '0') == '1'
+
+
+def makeLazyGetattr(packageName, attrs):
+    """Make a module-level `__getattr__` function for a package, which imports
+    its attributes from their submodules on first access.
+
+    Parameters
+    ----------
+    packageName : str
+        Name of the package, i.e. `__name__` within the package's
+        `__init__.py`.
+    attrs : dict
+        Names of attributes mapped to the module to import them from, either
+        absolute or relative to the package (e.g. `'.window'`). Any other name
+        which is a submodule of the package is imported as that submodule.
+
+    Returns
+    -------
+    function
+        Function to assign to `__getattr__` in the package.
+
+    Examples
+    --------
+    In a package's `__init__.py`::
+
+        __getattr__ = makeLazyGetattr(__name__, {'Window': '.window'})
+
+    """
+    def __getattr__(name):
+        if name in attrs:
+            module = importlib.import_module(attrs[name], packageName)
+            try:
+                value = getattr(module, name)
+            except AttributeError:
+                # a submodule of that module which hasn't been imported yet
+                value = importlib.import_module(
+                    module.__name__ + '.' + name)
+        elif name.startswith('__'):
+            # don't look for dunder attributes (e.g. __path__) as submodules
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(packageName, name))
+        else:
+            try:
+                value = importlib.import_module('.' + name, packageName)
+            except ModuleNotFoundError as err:
+                if err.name != packageName + '.' + name:
+                    raise
+                raise AttributeError(
+                    "module {!r} has no attribute {!r}".format(
+                        packageName, name)) from None
+        # store it, so this is only called once per attribute
+        setattr(sys.modules[packageName], name, value)
+        return value
+
+    return __getattr__
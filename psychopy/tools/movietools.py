@@ -105,6 +105,11 @@ class MovieFileWriter:
         to control the quality of the movie, for example. The options depend on
         the `encoderLib` in use. If `None`, the writer will use the default
         options for the backend.
+    maxFramesWaiting : int
+        Maximum number of frames which can be waiting to be written to disk.
+        Once reached, `addFrame()` blocks until the background thread has
+        written a frame, bounding the memory used by frames which have not been
+        written yet. If `0` (the default), any number of frames may be waiting.
 
     Examples
     --------
@@ -163,11 +168,12 @@ class MovieFileWriter:
     PIXEL_FORMAT_RGBA32 = 'rgb32'
 
     def __init__(self, filename, size, fps, codec=None, pixelFormat='rgb24',
-                 encoderLib='ffpyplayer', encoderOpts=None):
+                 encoderLib='ffpyplayer', encoderOpts=None, maxFramesWaiting=0):
         
         # objects needed to build up the asynchronous movie writer interface
         self._writerThread = None  # thread for writing the movie file
-        self._frameQueue = queue.Queue()  # queue for frames to be written
+        # queue for frames to be written
+        self._frameQueue = queue.Queue(maxsize=int(maxFramesWaiting))
         self._dataLock = threading.Lock()  # lock for accessing shared data
         self._lastVideoFile = None  # last video file we wrote to
 
@@ -877,7 +883,8 @@ class MovieFileWriter:
 
         This adds a frame to the movie. The frame will be added to a queue and
         written to disk by a background thread. This method will block until the
-        frame is added to the queue. 
+        frame is added to the queue, which may take a while if the queue is full
+        (see `maxFramesWaiting`). 
         
         Any color space conversion or resizing will be performed in the caller's 
         thread. This may be threaded too in the future.
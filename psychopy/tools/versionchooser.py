@@ -17,7 +17,7 @@ import psychopy  # for currently loaded version
 from psychopy import prefs
 # the following will all have been imported so import here and reload later
 from psychopy import logging, tools, web, constants, preferences, __version__
-from pkg_resources import parse_version
+from packaging.version import parse as parse_version
 from importlib import reload
 from packaging.version import Version, InvalidVersion, VERSION_PATTERN
 
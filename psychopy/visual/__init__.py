@@ -24,23 +24,49 @@ if sys.platform == 'win32':
             except OSError:
                 pass
 
-from psychopy import event  # import before visual or
-from psychopy.visual import filters
-from psychopy.visual.backends import gamma
-# absolute essentials (nearly all experiments will need these)
-from .basevisual import BaseVisualStim
-# non-private helpers
-from .helpers import pointInPolygon, polygonsOverlap
-from .image import ImageStim
-from .text import TextStim
-from .form import Form
-from .brush import Brush
-from .textbox2.textbox2 import TextBox2
-from .button import ButtonStim
-from .roi import ROI
-from .target import TargetStim
-# window, should always be loaded first
-from .window import Window, getMsPerFrame, openWindows
+from psychopy.tools.importtools import lazyImportsEnabled, makeLazyGetattr
+
+if lazyImportsEnabled():
+    # import these from their submodules when first used (see
+    # psychopy.tools.importtools), so that e.g. the helpers can be used
+    # without the cost of importing pyglet and OpenGL for a window
+    _lazyAttrs = {
+        'event': 'psychopy',
+        'gamma': '.backends',
+        'BaseVisualStim': '.basevisual',
+        'pointInPolygon': '.helpers',
+        'polygonsOverlap': '.helpers',
+        'ImageStim': '.image',
+        'TextStim': '.text',
+        'Form': '.form',
+        'Brush': '.brush',
+        'TextBox2': '.textbox2.textbox2',
+        'ButtonStim': '.button',
+        'ROI': '.roi',
+        'TargetStim': '.target',
+        'Window': '.window',
+        'getMsPerFrame': '.window',
+        'openWindows': '.window',
+    }
+    __getattr__ = makeLazyGetattr(__name__, _lazyAttrs)
+else:
+    from psychopy import event  # import before visual or
+    from psychopy.visual import filters
+    from psychopy.visual.backends import gamma
+    # absolute essentials (nearly all experiments will need these)
+    from .basevisual import BaseVisualStim
+    # non-private helpers
+    from .helpers import pointInPolygon, polygonsOverlap
+    from .image import ImageStim
+    from .text import TextStim
+    from .form import Form
+    from .brush import Brush
+    from .textbox2.textbox2 import TextBox2
+    from .button import ButtonStim
+    from .roi import ROI
+    from .target import TargetStim
+    # window, should always be loaded first
+    from .window import Window, getMsPerFrame, openWindows
 
 # needed for backwards-compatibility
 
@@ -122,3 +148,8 @@ try:
     lazy_import(globals(), lazyImports)
 except Exception:
     exec(lazyImports)
+
+if lazyImportsEnabled():
+    # so that `from psychopy.visual import *` still gets everything
+    __all__ = [name for name in globals() if not name.startswith('_')]
+    __all__ += list(_lazyAttrs)
@@ -46,6 +46,31 @@ _piOver2 = np.pi / 2.
 _piOver180 = np.pi / 180.
 _2pi = 2 * np.pi
 
+# attributes of an element which are copied to its batched ElementArrayStim
+_batchedElementAttribs = (
+    'units', 'size', 'ori', 'sf', 'phase', 'contrast', 'opacity', 'color',
+    'colorSpace', 'tex', 'mask', 'texRes', 'interpolate', 'maskParams')
+
+
+def _hashableAttrib(value):
+    """Make an attribute value comparable, for checking whether an element
+    has changed since it was last batched. Large arrays (i.e. textures) are
+    compared by identity.
+    """
+    if isinstance(value, np.ndarray):
+        if value.size <= 4:
+            return tuple(value.ravel().tolist())
+        return id(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashableAttrib(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashableAttrib(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+    return value
+
 
 class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
     """This stimulus class defines a field of dots with an update rule that
@@ -122,6 +147,12 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
     speed : float
         Speed of the dots (in *units*/frame). :ref:`operations
         <attrib-operations>` are supported.
+    batchElements : bool
+        If True (default) and `element` is a :class:`~psychopy.visual.GratingStim`,
+        all copies of the element are drawn in a single call (using an
+        :class:`~psychopy.visual.ElementArrayStim`) rather than drawing the
+        element once per dot. Set to False to always draw the element once
+        per dot (e.g. if subclassing the element and changing how it draws).
 
     """
     def __init__(self,
@@ -250,6 +281,12 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         self.fieldShape = fieldShape
         self.__dict__['dir'] = dir
         self.speed = speed
+        self.batchElements = True
+        # random number source for dot updates (None for numpy's global
+        # one), see precomputeTrajectory
+        self._rng = None
+        self._trajectory = None
+        self._trajectoryFrame = 0
         self.element = element
         self.dotLife = dotLife
         self.signalDots = signalDots
@@ -371,9 +408,13 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         DotStim assumes that the element uses pixels as units.
         ``None`` defaults to dots.
 
-        See `ElementArrayStim` for a faster implementation of this idea.
+        If the element is a `GratingStim` then all dots are drawn at once
+        using an `ElementArrayStim` (see `batchElements`).
         """
         self.__dict__['element'] = element
+        # batched renderer for the element is made when first drawn
+        self._elementArray = None
+        self._elementArrayKey = None
 
     @attributeSetter
     def fieldPos(self, pos):
@@ -503,7 +544,10 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             win = self.win
         self._selectWindow(win)
 
-        self._update_dotsXY()
+        if self._trajectory is not None:
+            self._nextTrajectoryFrame()
+        else:
+            self._update_dotsXY()
 
         GL.glPushMatrix()  # push before drawing, pop after
 
@@ -528,6 +572,10 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
             GL.glDrawArrays(GL.GL_POINTS, 0, self.nDots)
             GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        elif self._getElementArray() is not None:
+            # draw all copies of the element in one go
+            self._elementArray.xys = self.verticesPix + self.fieldPos
+            self._elementArray.draw()
         else:
             # we don't want to do the screen scaling twice so for each dot
             # subtract the screen centre
@@ -540,6 +588,53 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             self.element.setDepth(initialDepth)
         GL.glPopMatrix()
 
+    def _getElementArray(self):
+        """Get an ElementArrayStim which draws one copy of `element` per dot,
+        making a new one if the element (or any of its relevant attributes)
+        has changed. Returns None if the element can't be drawn this way.
+        """
+        from psychopy.visual.grating import GratingStim
+        from psychopy.visual.elementarray import ElementArrayStim
+
+        element = self.element
+        if not self.batchElements or not isinstance(element, GratingStim):
+            return None
+        # only remake the array if something which affects it has changed
+        key = (id(element), self.nDots) + tuple(
+            _hashableAttrib(getattr(element, attrib, None))
+            for attrib in _batchedElementAttribs)
+        if key == self._elementArrayKey:
+            return self._elementArray
+        try:
+            self._elementArray = ElementArrayStim(
+                self.win,
+                units=element.units,
+                nElements=self.nDots,
+                xys=np.zeros((self.nDots, 2)),
+                sizes=element.size,
+                oris=element.ori,
+                sfs=element.sf,
+                phases=element.phase,
+                contrs=element.contrast,
+                opacities=1.0 if element.opacity is None else element.opacity,
+                colors=element.color,
+                colorSpace=element.colorSpace,
+                elementTex=element.tex,
+                elementMask=element.mask,
+                texRes=element.texRes,
+                interpolate=element.interpolate,
+                maskParams=element.maskParams,
+                autoLog=False)
+        except Exception as err:
+            # fall back to drawing the element once per dot
+            logging.warning(
+                "Could not draw the elements of %s in a single call, drawing "
+                "one at a time instead (%s)" % (self.name, err))
+            self._elementArray = None
+        self._elementArrayKey = key
+
+        return self._elementArray
+
     def _newDotsXY(self, nDots):
         """Returns a uniform spread of dots, according to the `fieldShape` and
         `fieldSize`.
@@ -561,9 +656,10 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             dots = self._newDots(nDots)
 
         """
+        rng = self._rng or np.random
         if self.fieldShape == 'circle':
-            length = np.sqrt(np.random.uniform(0, 1, (nDots,)))
-            angle = np.random.uniform(0., _2pi, (nDots,))
+            length = np.sqrt(rng.uniform(0, 1, (nDots,)))
+            angle = rng.uniform(0., _2pi, (nDots,))
 
             newDots = np.zeros((nDots, 2))
             newDots[:, 0] = length * np.cos(angle)
@@ -571,7 +667,7 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
 
             newDots *= self.fieldSize * .5
         else:
-            newDots = np.random.uniform(-0.5, 0.5, size = (nDots, 2)) * self.fieldSize
+            newDots = rng.uniform(-0.5, 0.5, size = (nDots, 2)) * self.fieldSize
 
         return newDots
 
@@ -584,9 +680,105 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         if self.nDots != len(self._deadDots):
             self._deadDots = np.zeros(self.nDots, dtype=bool)
 
+    def precomputeTrajectory(self, nFrames, seed=None):
+        """Work out the positions of every dot for the next `nFrames` frames
+        in advance (e.g. during the inter-trial interval), so that drawing
+        each frame only has to look up the positions rather than updating
+        them. Once all `nFrames` frames have been drawn, dots go back to
+        being updated on each draw, continuing from the last frame.
+
+        Changing the dots' parameters (e.g. `coherence`, `dir`, `speed`)
+        after calling this has no effect until the precomputed frames have
+        been used up (or :meth:`clearTrajectory` is called).
+
+        Parameters
+        ----------
+        nFrames : int
+            Number of frames to compute.
+        seed : int or None
+            Seed for the random number generator. If given, the starting
+            positions, lives and noise directions of the dots are also drawn
+            from this seed, so the same seed (and parameters) always gives
+            exactly the same dots.
+
+        Returns
+        -------
+        ndarray
+            Array of shape (nFrames, nDots, 2) of dot positions (in the
+            stimulus's units, relative to `fieldPos`), as will be drawn.
+
+        Examples
+        --------
+        Precompute a trial's worth of dots (2s at 60Hz) during the ITI::
+
+            dots.precomputeTrajectory(120, seed=trialN)
+
+        """
+        nFrames = int(nFrames)
+        trajectory = np.empty((nFrames, self.nDots, 2), dtype=float)
+        if seed is not None:
+            self._rng = np.random.RandomState(seed)
+            # start from a known state
+            rng = self._rng
+            self._verticesBase = self._dotsXY = self._newDotsXY(self.nDots)
+            self._dotsLife = np.abs(self.dotLife) * rng.rand(self.nDots)
+            # signal dots are shuffled when `signalDots='different'`
+            self._signalDots = np.zeros(self.nDots, dtype=bool)
+            self._signalDots[0:int(self.coherence * self.nDots)] = True
+            self._dotsDir = rng.rand(self.nDots) * _2pi
+            self._dotsDir[self._signalDots] = self.dir * _piOver180
+        try:
+            for frameN in range(nFrames):
+                self._stepDotsXY()
+                trajectory[frameN] = self._verticesBase
+        finally:
+            self._rng = None
+        self._trajectory = trajectory
+        self._trajectoryFrame = 0
+
+        return trajectory
+
+    def clearTrajectory(self):
+        """Discard any precomputed frames (see
+        :meth:`precomputeTrajectory`), going back to updating the dots on
+        each draw from their last precomputed position.
+        """
+        self._trajectory = None
+        self._trajectoryFrame = 0
+
+    @property
+    def trajectory(self):
+        """Precomputed dot positions (nFrames x nDots x 2) if there are any,
+        otherwise None. See :meth:`precomputeTrajectory`.
+        """
+        return self._trajectory
+
+    def _nextTrajectoryFrame(self):
+        """Set the vertices from the next precomputed frame.
+        """
+        frame = self._trajectory[self._trajectoryFrame]
+        self._trajectoryFrame += 1
+        if self._trajectoryFrame >= len(self._trajectory):
+            # used up, carry on from the final state
+            self.clearTrajectory()
+        self.vertices = frame / self.fieldSize
+        self._updateVertices()
+
     def _update_dotsXY(self):
         """The user shouldn't call this - its gets done within draw().
         """
+        self._stepDotsXY()
+
+        self.vertices = self._verticesBase / self.fieldSize
+
+        # update the pixel XY coordinates in pixels (using _BaseVisual class)
+        self._updateVertices()
+
+    def _stepDotsXY(self):
+        """Move the dots on by one frame, updating `_verticesBase` (in the
+        stimulus's units).
+        """
+        rng = self._rng or np.random
         # Find dead dots, update positions, get new positions for
         # dead and out-of-bounds
         # renew dead dots
@@ -605,7 +797,7 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             #  **up to version 1.70.00 this was the other way around,
             # not in keeping with Scase et al**
             # noise and signal dots change identity constantly
-            np.random.shuffle(self._dotsDir)
+            rng.shuffle(self._dotsDir)
             # and then update _signalDots from that
             self._signalDots = (self._dotsDir == (self.dir * _piOver180))
 
@@ -613,7 +805,7 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         reshape = np.reshape
         if self.noiseDots == 'walk':
             # noise dots are ~self._signalDots
-            sig = np.random.rand(np.sum(~self._signalDots))
+            sig = rng.rand(np.sum(~self._signalDots))
             self._dotsDir[~self._signalDots] = sig * _2pi
             # then update all positions from dir*speed
             cosDots = reshape(np.cos(self._dotsDir), (self.nDots,))
@@ -661,8 +853,3 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         nOutOfBounds = outofbounds.sum()
         if nOutOfBounds:
             self._verticesBase[outofbounds, :] = self._newDotsXY(nOutOfBounds)
-
-        self.vertices = self._verticesBase / self.fieldSize
-
-        # update the pixel XY coordinates in pixels (using _BaseVisual class)
-        self._updateVertices()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Per-frame timing breakdown of :meth:`~psychopy.visual.Window.flip`.
+
+Usually created via :meth:`~psychopy.visual.Window.startFrameProfiler`::
+
+    profiler = win.startFrameProfiler()
+    # ... run trials ...
+    win.stopFrameProfiler()
+    print(profiler.report())
+    profiler.saveAsCSV('frameTimes.csv')
+
+"""
+
+import time
+
+import numpy as np
+
+__all__ = ['FrameProfiler']
+
+
+class FrameProfiler:
+    """Record how long each phase of every call to `Window.flip()` takes, and
+    how long each autoDrawn stimulus took to draw.
+
+    All timings are stored in arrays allocated up front, so recording a
+    frame costs a handful of `perf_counter` calls and array assignments. Once
+    `maxFrames` frames have been recorded, the oldest are overwritten.
+
+    Parameters
+    ----------
+    maxFrames : int
+        How many frames to keep timings for.
+    maxStims : int
+        How many distinct autoDrawn stimuli to keep individual timings for,
+        any beyond this are added together in an "(other stimuli)" column.
+
+    Attributes
+    ----------
+    phases : tuple[str]
+        Names of the phases of `flip()` which are timed. 'betweenFlips' is
+        the time from the end of the previous flip to the start of this one
+        (i.e. time spent in the experiment's own code).
+    """
+    phases = (
+        'betweenFlips',  # time outside of flip, since the last flip
+        'autoDraw',  # drawing autoDraw stimuli (and validators, dragging)
+        'editables',  # hit-testing editable stimuli for focus
+        'fboBlit',  # rendering the framebuffer object to the back buffer
+        'swapBuffers',  # swapping the front and back buffers
+        'viewTransform',  # resetting the view scale/position/orientation
+        'waitBlanking',  # glFinish to wait for the vertical blank
+        'callOnFlip',  # functions from callOnFlip
+        'bookkeeping',  # frame interval recording
+        'logOnFlip',  # messages from logOnFlip
+        'stayAwake',  # preventing screen saver / sleep
+        'background',  # drawing background and piloting indicator
+    )
+
+    def __init__(self, maxFrames=3600, maxStims=64):
+        self.maxFrames = int(maxFrames)
+        self.maxStims = int(maxStims)
+        self._phaseIndex = {name: i for i, name in enumerate(self.phases)}
+        # preallocate buffers
+        self.frameStart = np.zeros(self.maxFrames, dtype=np.float64)
+        self.phaseTimes = np.zeros(
+            (self.maxFrames, len(self.phases)), dtype=np.float64)
+        # one extra column for stimuli beyond maxStims
+        self.stimTimes = np.zeros(
+            (self.maxFrames, self.maxStims + 1), dtype=np.float64)
+        self.stimNames = []
+        self._stimIndex = {}  # id(stim) -> column
+        # frame counters
+        self.nFrames = 0
+        self._row = 0
+        self._lastMark = None
+        self._lastFlipEnd = None
+
+    def _getStimColumn(self, stim):
+        """Get the column of `stimTimes` for a given stimulus.
+        """
+        key = id(stim)
+        col = self._stimIndex.get(key)
+        if col is None:
+            if len(self.stimNames) >= self.maxStims:
+                return self.maxStims
+            col = len(self.stimNames)
+            name = getattr(stim, 'name', None) or type(stim).__name__
+            if name in self.stimNames:
+                name = "%s_%i" % (name, col)
+            self.stimNames.append(name)
+            self._stimIndex[key] = col
+        return col
+
+    def beginFrame(self):
+        """Called at the start of `Window.flip()`.
+        """
+        now = time.perf_counter()
+        row = self._row = self.nFrames % self.maxFrames
+        self.phaseTimes[row] = 0
+        self.stimTimes[row] = 0
+        self.frameStart[row] = now
+        if self._lastFlipEnd is not None:
+            self.phaseTimes[row, 0] = now - self._lastFlipEnd
+        self._lastMark = now
+
+    def mark(self, phase):
+        """Attribute the time since the last mark to a given phase.
+        """
+        now = time.perf_counter()
+        self.phaseTimes[self._row, self._phaseIndex[phase]] += \
+            now - self._lastMark
+        self._lastMark = now
+
+    def drawStim(self, stim):
+        """Draw a stimulus, recording how long it took.
+        """
+        t0 = time.perf_counter()
+        stim.draw()
+        self.stimTimes[self._row, self._getStimColumn(stim)] += \
+            time.perf_counter() - t0
+
+    def endFrame(self):
+        """Called at the end of `Window.flip()`.
+        """
+        self._lastFlipEnd = time.perf_counter()
+        self.nFrames += 1
+
+    def _orderedRows(self):
+        """Indices of recorded rows, oldest first.
+        """
+        if self.nFrames <= self.maxFrames:
+            return np.arange(self.nFrames)
+        return np.roll(np.arange(self.maxFrames), -(self.nFrames % self.maxFrames))
+
+    def getFrameTimes(self):
+        """Get the timings of all recorded frames.
+
+        Returns
+        -------
+        dict
+            With keys 'frame' (frame number), 'start' (perf_counter time at
+            the start of flip), 'total' (duration of flip, not including
+            'betweenFlips'), one key per phase and one key per stimulus
+            (prefixed "draw:"), each an array with one value per frame. All
+            durations are in seconds.
+        """
+        rows = self._orderedRows()
+        firstFrame = self.nFrames - len(rows)
+        phaseTimes = self.phaseTimes[rows]
+        out = {
+            'frame': np.arange(firstFrame, self.nFrames),
+            'start': self.frameStart[rows],
+            'total': phaseTimes[:, 1:].sum(axis=1),
+        }
+        for i, name in enumerate(self.phases):
+            out[name] = phaseTimes[:, i]
+        for i, name in enumerate(self.stimNames):
+            out['draw:' + name] = self.stimTimes[rows, i]
+        if len(self.stimNames) >= self.maxStims:
+            out['draw:(other stimuli)'] = self.stimTimes[rows, self.maxStims]
+
+        return out
+
+    def getWorstFrames(self, n=10, key='total'):
+        """Get the timings of the `n` slowest frames.
+
+        Parameters
+        ----------
+        n : int
+            How many frames to return.
+        key : str
+            What to sort by, 'total' for the whole flip or the name of a
+            phase (e.g. 'autoDraw').
+
+        Returns
+        -------
+        list[dict]
+            One dict per frame, slowest first, with the same keys as
+            :meth:`getFrameTimes` but single values.
+        """
+        times = self.getFrameTimes()
+        order = np.argsort(times[key])[::-1][:n]
+
+        return [{name: vals[i].item() for name, vals in times.items()}
+                for i in order]
+
+    def report(self, n=10):
+        """Get a human-readable summary: the mean and maximum of each phase
+        and the breakdown of the `n` slowest frames.
+
+        Returns
+        -------
+        str
+        """
+        times = self.getFrameTimes()
+        if not len(times['frame']):
+            return "No frames recorded."
+        cols = [name for name in times if name not in ('frame', 'start')]
+        lines = ["Frame profile of %i frames (times in ms)" % len(times['frame']),
+                 "%-28s %10s %10s" % ("", "mean", "max")]
+        for name in cols:
+            lines.append("%-28s %10.3f %10.3f" % (
+                name, times[name].mean() * 1000, times[name].max() * 1000))
+        lines.append("")
+        lines.append("%i slowest frames:" % min(n, len(times['frame'])))
+        for frame in self.getWorstFrames(n):
+            # only list the phases and stimuli which took any real time
+            parts = ["%s=%.2f" % (name, frame[name] * 1000)
+                     for name in cols[1:] if frame[name] >= 0.0001]
+            lines.append("frame %i: total=%.2f %s" % (
+                frame['frame'], frame['total'] * 1000, " ".join(parts)))
+
+        return "\n".join(lines)
+
+    def saveAsCSV(self, fileName):
+        """Save the timings of every recorded frame as a csv file, one row
+        per frame and one column per phase/stimulus (in seconds).
+        """
+        times = self.getFrameTimes()
+        names = list(times)
+        data = np.column_stack([times[name] for name in names])
+        fmt = ['%d'] + ['%.9f'] * (len(names) - 1)
+        np.savetxt(fileName, data, delimiter=',', fmt=fmt,
+                   header=','.join(names), comments='')
+
+    def reset(self):
+        """Forget all recorded frames.
+        """
+        self.nFrames = 0
+        self._lastFlipEnd = None
+        self.stimNames = []
+        self._stimIndex = {}
+        self.stimTimes[:] = 0
+        self.phaseTimes[:] = 0
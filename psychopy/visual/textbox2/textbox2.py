@@ -15,6 +15,7 @@ some more added:
     - adds additional options to use <b>bold<\b>, <i>italic<\i>, <c=#ffffff>color</c> tags in text
 
 """
+import bisect
 from ast import literal_eval
 
 import numpy as np
@@ -778,39 +779,54 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
 
     def addCharAtCaret(self, char):
         """Allows a character to be added programmatically at the current caret"""
-        txt = self._text
-        txt = txt[:self.caret.index] + char + txt[self.caret.index:]
-        cstyle = Style(1)
-        if len(self._styles) and self.caret.index <= len(self._styles):
-            cstyle = self._styles[self.caret.index-1]
-        self._styles.insert(self.caret.index, cstyle)
+        ci = self.caret.index
         self.caret.index += 1
-        self.text = txt
-        self._layout()
+        self._editText(ci, 0, char)
 
     def deleteCaretLeft(self):
         """Deletes 1 character to the left of the caret"""
         if self.caret.index > 0:
-            txt = self._text
             ci = self.caret.index
-            txt = txt[:ci-1] + txt[ci:]
-            self._styles = self._styles[:ci-1]+self._styles[ci:]
             self.caret.index -= 1
-            self.text = txt
-            self._layout()
+            self._editText(ci - 1, 1)
 
     def deleteCaretRight(self):
         """Deletes 1 character to the right of the caret"""
         ci = self.caret.index
         if ci < len(self._text):
-            txt = self._text
-            txt = txt[:ci] + txt[ci+1:]
-            self._styles = self._styles[:ci]+self._styles[ci+1:]
+            self._editText(ci, 1)
+
+    def _editText(self, index, nDelete=0, chars=''):
+        """Replace `nDelete` characters of the text, starting at `index`, with
+        `chars`.
+
+        Plain text (no formatting tags, no reshaping for Arabic or
+        right-to-left scripts) is edited in place and only laid out again from
+        the edited word onwards, so typing into a long passage doesn't get
+        slower as the passage grows. Anything else, including text which
+        contains a `<` and so may now have a tag in it, is set as new text.
+        """
+        txt = self._text[:index] + chars + self._text[index + nDelete:]
+        if (self._needsArabic or self._needsBidi or '<' in txt
+                or self._styles.formatted_text != self._text):
             self.text = txt
-            self._layout()
-        
-    def _layout(self):
+            return
+        styles = self._styles[:index] + Style(len(chars))
+        styles.insert(len(styles), self._styles[index + nDelete:])
+        styles.formatted_text = txt
+        self._styles = styles
+        self._text = txt
+        self._layout(start=index)
+
+    def _layout(self, start=0):
         """Layout the text, calculating the vertex locations
+
+        Parameters
+        ----------
+        start : int
+            Index of the first character which has changed since the last
+            layout. With the default line breaking, the text before the word
+            containing this character keeps its previous layout.
         """
         
         rgb = self._foreColor.render('rgba1')
@@ -820,18 +836,8 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
         # then we convert them to the requested units for self._vertices
         # then they are converted back during rendering using standard BaseStim
         visible_text = self._text
-        vertices = np.zeros((len(visible_text) * 4, 2), dtype=np.float32)
         self._charIndices = np.zeros((len(visible_text)), dtype=int)
-        self._colors = np.zeros((len(visible_text) * 4, 4), dtype=np.double)
-        self._texcoords = np.zeros((len(visible_text) * 4, 2), dtype=np.double)
         self._glIndices = np.zeros((len(visible_text) * 4), dtype=int)
-        self._renderChars = []
-
-        # the following are used internally for layout
-        self._lineNs = np.zeros(len(visible_text), dtype=int)
-        _lineBottoms = []
-        self._lineLenChars = []  #
-        _lineWidths = []  # width in stim units of each line
 
         lineMax = self.contentBox._size.pix[0]
         current = [0, 0 - font.ascender]
@@ -845,142 +851,22 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
 
         if self._lineBreaking == 'default':
 
-            wordLen = 0
-            charsThisLine = 0
-            wordsThisLine = 0
-            lineN = 0
+            vertices, current, _lineBottoms, _lineWidths = \
+                self._layoutDefault(start)
+            self._renderChars = list(self._layoutState['renderChars'])
 
-            for i, charcode in enumerate(self._text):
-                printable = True  # unless we decide otherwise
-                # handle formatting codes
-                fakeItalic = 0.0
-                fakeBold = 0.0
-                if self._styles.i[i]:
-                    fakeItalic = 0.1 * font.size
-                if self._styles.b[i]:
-                    fakeBold = 0.3 * font.size
-
-                # handle newline
-                if charcode == '\n':
-                    printable = False
-
-                # handle printable characters
-                if printable:
-                    glyph = font[charcode]
-                    if showWhiteSpace and charcode == " ":
-                        glyph = font[u"·"]
-                    elif charcode == " ":
-                        # glyph size of space is smaller than actual size, so use size of dot instead
-                        glyph.size = font[u"·"].size
-                    # Get top and bottom coords
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    # Get x mid point
-                    xMid = current[0] + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-                    # Get left and right corners from midpoint
-                    xBotL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeItalic - fakeBold / 2
-                    xBotR = xMid + glyph.size[0] * alphaCorrection / 2 - fakeItalic + fakeBold / 2
-                    xTopL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeBold / 2
-                    xTopR = xMid + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-                else:
-                    glyph = font[u"·"]
-                    x = current[0] + glyph.offset[0]
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    xBotL = x
-                    xTopL = x
-                    xBotR = x
-                    xTopR = x
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-
-                theseVertices = [[xTopL, yTop], [xBotL, yBot],
-                                 [xBotR, yBot], [xTopR, yTop]]
-                texcoords = [[u0, v0], [u0, v1],
-                             [u1, v1], [u1, v0]]
-
-                vertices[i * 4:i * 4 + 4] = theseVertices
-                self._texcoords[i * 4:i * 4 + 4] = texcoords
-                # handle character color
-                rgb_ = self._styles.c[i]
-                if len(rgb_) > 0:
-                    self._colors[i*4 : i*4+4, :4] = rgb_ # set custom color
-                else:
-                    self._colors[i*4 : i*4+4, :4] = rgb # set default color
-                self._lineNs[i] = lineN
-                current[0] = current[0] + (glyph.advance[0] + fakeBold / 2) * self.letterSpacing
-                current[1] = current[1] + glyph.advance[1]
-
-                # are we wrapping the line?
-                if charcode == "\n":
-                    # check if we have stored the top/bottom of the previous line yet
-                    if lineN + 1 > len(_lineBottoms):
-                        _lineBottoms.append(current[1])
-                    lineWPix = current[0]
-                    current[0] = 0
-                    current[1] -= font.height
-                    lineN += 1
-                    charsThisLine += 1
-                    self._lineLenChars.append(charsThisLine)
-                    _lineWidths.append(lineWPix)
-                    charsThisLine = 0
-                    wordsThisLine = 0
-                elif charcode in wordBreaks:
-                    wordLen = 0
-                    charsThisLine += 1
-                    wordsThisLine += 1
-                elif printable:
-                    wordLen += 1
-                    charsThisLine += 1
-
-                # end line with auto-wrap on space
-                if current[0] >= lineMax and wordLen > 0:
-                    # move the current word to next line
-                    lineBreakPt = vertices[(i - wordLen + 1) * 4, 0]
-                    if wordsThisLine <= 1:
-                        # if whole line is just 1 word, wrap regardless of presence of wordbreak
-                        wordLen = 0
-                        charsThisLine += 1
-                        wordsThisLine += 1
-                        # add hyphen
-                        self._renderChars.append({
-                            "i": i,
-                            "current": (current[0], current[1]),
-                            "glyph": font["-"]
-                        })
-                        # store linebreak point
-                        lineBreakPt = current[0]
-                    wordWidth = current[0] - lineBreakPt
-                    # shift all chars of the word left by wordStartX
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 0] -= lineBreakPt
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 1] -= font.height
-                    # update line values
-                    self._lineNs[i - wordLen + 1: i + 1] += 1
-                    self._lineLenChars.append(charsThisLine - wordLen)
-                    _lineWidths.append(lineBreakPt)
-                    lineN += 1
-                    # and set current to correct location
-                    current[0] = wordWidth
-                    current[1] -= font.height
-                    charsThisLine = wordLen
-                    wordsThisLine = 1
-
-                # have we stored the top/bottom of this line yet
-                if lineN + 1 > len(_lineBottoms):
-                    _lineBottoms.append(current[1])
+        elif self._lineBreaking == 'uax14':
 
-            # add length of this (unfinished) line
-            _lineWidths.append(current[0])
-            self._lineLenChars.append(charsThisLine)
+            vertices = np.zeros((len(visible_text) * 4, 2), dtype=np.float32)
+            self._colors = np.zeros((len(visible_text) * 4, 4), dtype=np.double)
+            self._texcoords = np.zeros((len(visible_text) * 4, 2), dtype=np.double)
+            self._renderChars = []
 
-        elif self._lineBreaking == 'uax14':
+            # the following are used internally for layout
+            self._lineNs = np.zeros(len(visible_text), dtype=int)
+            _lineBottoms = []
+            self._lineLenChars = []  #
+            _lineWidths = []  # width in stim units of each line
 
             # get a list of line-breakable points according to UAX#14
             breakable_points = list(get_breakable_points(self._text))
@@ -1187,6 +1073,238 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             self.glFont._dirty = False
         self._needVertexUpdate = True
 
+    def _layoutDefault(self, start=0):
+        """Layout the text with the default line breaking, from the last word
+        break at or before character `start` onwards.
+
+        The position of every character, along with where each line broke at
+        the start of each word, is kept in `_layoutState` so that the next
+        layout can pick up from there. If anything other than the text has
+        changed since the last layout (font, size, color...) everything is
+        laid out again.
+
+        Returns
+        -------
+        tuple
+            The vertices of the characters (in pix, before alignment), the
+            position after the last character, and the bottom and width (in
+            pix) of each line.
+        """
+        rgb = self._foreColor.render('rgba1')
+        font = self.glFont
+        nChars = len(self._text)
+        lineMax = self.contentBox._size.pix[0]
+        # for some reason glyphs too wide when using alpha channel only
+        if font.atlas.format == 'alpha':
+            alphaCorrection = 1 / 3.0
+        else:
+            alphaCorrection = 1
+
+        key = (font, lineMax, self.letterSpacing, tuple(rgb), showWhiteSpace)
+        state = getattr(self, '_layoutState', None)
+        if state is None or state['key'] != key:
+            start = 0
+        if start == 0:
+            state = self._layoutState = {
+                'key': key,
+                # per char, with room to grow
+                'vertices': np.zeros((0, 2), dtype=np.float32),
+                'texcoords': np.zeros((0, 2), dtype=np.double),
+                'colors': np.zeros((0, 4), dtype=np.double),
+                'lineNs': np.zeros(0, dtype=int),
+                # per line
+                'lineBottoms': [],
+                'lineLenChars': [],
+                'lineWidths': [],
+                'renderChars': [],
+                # the state of the layout at the start of each word
+                'checkpoints': [],
+                'checkpointIndices': [],
+            }
+        # restart from the start of the edited word
+        checkpoints = state['checkpoints']
+        nKept = bisect.bisect_right(state['checkpointIndices'], start) - 1
+        if nKept >= 0:
+            (start, x, y, lineN, charsThisLine, wordsThisLine,
+             nLineBottoms, nLines, nRenderChars) = checkpoints[nKept]
+            current = [x, y]
+        else:
+            start = 0
+            current = [0, 0 - font.ascender]
+            lineN = charsThisLine = wordsThisLine = 0
+            nLineBottoms = nLines = nRenderChars = 0
+            nKept = 0
+        wordLen = 0
+        del checkpoints[nKept:]
+        del state['checkpointIndices'][nKept:]
+        lineBottoms = state['lineBottoms']
+        lineLenChars = state['lineLenChars']
+        lineWidths = state['lineWidths']
+        renderChars = state['renderChars']
+        del lineBottoms[nLineBottoms:]
+        del lineLenChars[nLines:]
+        del lineWidths[nLines:]
+        del renderChars[nRenderChars:]
+
+        # grow the arrays if needed, keeping the chars before start
+        if len(state['lineNs']) < nChars:
+            capacity = max(nChars, 2 * len(state['lineNs']), 64)
+            for name, shape in (('vertices', (capacity * 4, 2)),
+                                ('texcoords', (capacity * 4, 2)),
+                                ('colors', (capacity * 4, 4)),
+                                ('lineNs', (capacity,))):
+                old = state[name]
+                state[name] = np.zeros(shape, dtype=old.dtype)
+                nOld = start * 4 if name != 'lineNs' else start
+                state[name][:nOld] = old[:nOld]
+        vertices = state['vertices']
+        texcoordsPix = state['texcoords']
+        colors = state['colors']
+        lineNs = state['lineNs']
+
+        text = self._text
+        for i in range(start, nChars):
+            charcode = text[i]
+            if wordLen == 0:
+                checkpoints.append((
+                    i, current[0], current[1], lineN, charsThisLine,
+                    wordsThisLine, len(lineBottoms), len(lineWidths),
+                    len(renderChars)))
+                state['checkpointIndices'].append(i)
+            printable = True  # unless we decide otherwise
+            # handle formatting codes
+            fakeItalic = 0.0
+            fakeBold = 0.0
+            if self._styles.i[i]:
+                fakeItalic = 0.1 * font.size
+            if self._styles.b[i]:
+                fakeBold = 0.3 * font.size
+
+            # handle newline
+            if charcode == '\n':
+                printable = False
+
+            # handle printable characters
+            if printable:
+                glyph = font[charcode]
+                if showWhiteSpace and charcode == " ":
+                    glyph = font[u"·"]
+                elif charcode == " ":
+                    # glyph size of space is smaller than actual size, so use size of dot instead
+                    glyph.size = font[u"·"].size
+                # Get top and bottom coords
+                yTop = current[1] + glyph.offset[1]
+                yBot = yTop - glyph.size[1]
+                # Get x mid point
+                xMid = current[0] + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
+                # Get left and right corners from midpoint
+                xBotL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeItalic - fakeBold / 2
+                xBotR = xMid + glyph.size[0] * alphaCorrection / 2 - fakeItalic + fakeBold / 2
+                xTopL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeBold / 2
+                xTopR = xMid + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
+
+                u0 = glyph.texcoords[0]
+                v0 = glyph.texcoords[1]
+                u1 = glyph.texcoords[2]
+                v1 = glyph.texcoords[3]
+            else:
+                glyph = font[u"·"]
+                x = current[0] + glyph.offset[0]
+                yTop = current[1] + glyph.offset[1]
+                yBot = yTop - glyph.size[1]
+                xBotL = x
+                xTopL = x
+                xBotR = x
+                xTopR = x
+                u0 = glyph.texcoords[0]
+                v0 = glyph.texcoords[1]
+                u1 = glyph.texcoords[2]
+                v1 = glyph.texcoords[3]
+
+            theseVertices = [[xTopL, yTop], [xBotL, yBot],
+                             [xBotR, yBot], [xTopR, yTop]]
+            texcoords = [[u0, v0], [u0, v1],
+                         [u1, v1], [u1, v0]]
+
+            vertices[i * 4:i * 4 + 4] = theseVertices
+            texcoordsPix[i * 4:i * 4 + 4] = texcoords
+            # handle character color
+            rgb_ = self._styles.c[i]
+            if len(rgb_) > 0:
+                colors[i*4 : i*4+4, :4] = rgb_ # set custom color
+            else:
+                colors[i*4 : i*4+4, :4] = rgb # set default color
+            lineNs[i] = lineN
+            current[0] = current[0] + (glyph.advance[0] + fakeBold / 2) * self.letterSpacing
+            current[1] = current[1] + glyph.advance[1]
+
+            # are we wrapping the line?
+            if charcode == "\n":
+                # check if we have stored the top/bottom of the previous line yet
+                if lineN + 1 > len(lineBottoms):
+                    lineBottoms.append(current[1])
+                lineWPix = current[0]
+                current[0] = 0
+                current[1] -= font.height
+                lineN += 1
+                charsThisLine += 1
+                lineLenChars.append(charsThisLine)
+                lineWidths.append(lineWPix)
+                charsThisLine = 0
+                wordsThisLine = 0
+            elif charcode in wordBreaks:
+                wordLen = 0
+                charsThisLine += 1
+                wordsThisLine += 1
+            elif printable:
+                wordLen += 1
+                charsThisLine += 1
+
+            # end line with auto-wrap on space
+            if current[0] >= lineMax and wordLen > 0:
+                # move the current word to next line
+                lineBreakPt = vertices[(i - wordLen + 1) * 4, 0]
+                if wordsThisLine <= 1:
+                    # if whole line is just 1 word, wrap regardless of presence of wordbreak
+                    wordLen = 0
+                    charsThisLine += 1
+                    wordsThisLine += 1
+                    # add hyphen
+                    renderChars.append({
+                        "i": i,
+                        "current": (current[0], current[1]),
+                        "glyph": font["-"]
+                    })
+                    # store linebreak point
+                    lineBreakPt = current[0]
+                wordWidth = current[0] - lineBreakPt
+                # shift all chars of the word left by wordStartX
+                vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 0] -= lineBreakPt
+                vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 1] -= font.height
+                # update line values
+                lineNs[i - wordLen + 1: i + 1] += 1
+                lineLenChars.append(charsThisLine - wordLen)
+                lineWidths.append(lineBreakPt)
+                lineN += 1
+                # and set current to correct location
+                current[0] = wordWidth
+                current[1] -= font.height
+                charsThisLine = wordLen
+                wordsThisLine = 1
+
+            # have we stored the top/bottom of this line yet
+            if lineN + 1 > len(lineBottoms):
+                lineBottoms.append(current[1])
+
+        self._texcoords = texcoordsPix[:nChars * 4]
+        self._colors = colors[:nChars * 4]
+        self._lineNs = lineNs[:nChars]
+        # add length of this (unfinished) line
+        self._lineLenChars = lineLenChars + [charsThisLine]
+
+        return (vertices[:nChars * 4].copy(), current, list(lineBottoms),
+                lineWidths + [current[0]])
+
     def draw(self):
         """Draw the text to the back buffer"""
         # Border width
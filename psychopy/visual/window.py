@@ -593,6 +593,8 @@ class Window():
         self.nDroppedFrames = 0
         self.frameIntervals = []
         self._frameTimes = deque(maxlen=1000)  # 1000 keeps overhead low
+        # optional per-phase timing of flip(), see startFrameProfiler
+        self.frameProfiler = None
 
         self._toDraw = []
         self._heldDraw = []
@@ -1172,6 +1174,11 @@ class Window():
             win.flip(clearBuffer=False)
 
         """
+        # time each phase of the flip if profiling
+        prof = self.frameProfiler
+        if prof is not None:
+            prof.beginFrame()
+
         # draw message/splash if needed
         if self._showSplash:
             self._splashTextbox.draw()
@@ -1179,7 +1186,10 @@ class Window():
         if self._toDraw:
             for thisStim in self._toDraw:
                 # draw
-                thisStim.draw()
+                if prof is None:
+                    thisStim.draw()
+                else:
+                    prof.drawStim(thisStim)
                 # draw validation rect if needed
                 if thisStim in self.validators:
                     self.validators[thisStim].draw()
@@ -1201,6 +1211,8 @@ class Window():
             GL.glOrtho(-1, 1, -1, 1, -1, 1)
             GL.glMatrixMode(GL.GL_MODELVIEW)
             GL.glLoadIdentity()
+        if prof is not None:
+            prof.mark('autoDraw')
 
         # disable lighting
         self.useLights = False
@@ -1227,6 +1239,8 @@ class Window():
             # If there is only one editable on screen, make sure it starts off with focus
             if sum(editablesOnScreen) == 1:
                 self.currentEditable = self._editableChildren[editablesOnScreen.index(True)]()
+        if prof is not None:
+            prof.mark('editables')
 
         flipThisFrame = self._startOfFlip()
         if self.useFBO and flipThisFrame:
@@ -1258,8 +1272,12 @@ class Window():
 
         # call this before flip() whether FBO was used or not
         self._afterFBOrender()
+        if prof is not None:
+            prof.mark('fboBlit')
 
         self.backend.swapBuffers(flipThisFrame)
+        if prof is not None:
+            prof.mark('swapBuffers')
 
         if self.useFBO and flipThisFrame:
             # set rendering back to the framebuffer object
@@ -1303,6 +1321,8 @@ class Window():
 
         # reset returned buffer for next frame
         self._endOfFlip(clearBuffer)
+        if prof is not None:
+            prof.mark('viewTransform')
 
         # waitBlanking
         if self.waitBlanking and flipThisFrame:
@@ -1315,6 +1335,8 @@ class Window():
                 GL.glVertex2i(10, 10)
             GL.glEnd()
             GL.glFinish()
+        if prof is not None:
+            prof.mark('waitBlanking')
 
         # get timestamp
         self._frameTime = now = logging.defaultClock.getTime()
@@ -1324,6 +1346,8 @@ class Window():
         for callEntry in self._toCall:
             callEntry['function'](*callEntry['args'], **callEntry['kwargs'])
         del self._toCall[:]
+        if prof is not None:
+            prof.mark('callOnFlip')
 
         # do bookkeeping
         if self.recordFrameIntervals:
@@ -1345,6 +1369,8 @@ class Window():
                         logging.warning("Multiple dropped frames have "
                                         "occurred - I'll stop bothering you "
                                         "about them!")
+        if prof is not None:
+            prof.mark('bookkeeping')
 
         # log events
         for logEntry in self._toLog:
@@ -1354,9 +1380,13 @@ class Window():
                         t=now,
                         obj=logEntry['obj'])
         del self._toLog[:]
+        if prof is not None:
+            prof.mark('logOnFlip')
 
         # keep the system awake (prevent screen-saver or sleep)
         platform_specific.sendStayAwake()
+        if prof is not None:
+            prof.mark('stayAwake')
 
         # draw background (if present) for next frame
         if hasattr(self.backgroundImage, "draw"):
@@ -1365,6 +1395,9 @@ class Window():
         # draw piloting indicator (if piloting) for next frame
         if self._showPilotingIndicator:
             self._pilotingIndicator.draw()
+        if prof is not None:
+            prof.mark('background')
+            prof.endFrame()
 
         #    If self.waitBlanking is True, then return the time that
         # GL.glFinish() returned, set as the 'now' variable. Otherwise
@@ -1373,6 +1406,57 @@ class Window():
         if self.waitBlanking is True:
             return now
 
+    def startFrameProfiler(self, maxFrames=3600, maxStims=64):
+        """Start timing each phase of :py:attr:`~Window.flip()` (drawing
+        each autoDraw stimulus, FBO blit, buffer swap, callOnFlip functions,
+        logOnFlip messages etc.) to find out what is causing dropped frames.
+
+        Adds a little overhead to each flip, so is off by default.
+
+        Parameters
+        ----------
+        maxFrames : int
+            How many frames to keep timings for, older frames are
+            overwritten.
+        maxStims : int
+            How many autoDraw stimuli to time individually.
+
+        Returns
+        -------
+        :class:`~psychopy.visual.frameprofiler.FrameProfiler`
+            The profiler, use its `report()` or `saveAsCSV()` methods to
+            view the results.
+
+        Examples
+        --------
+        Find the slowest frames of a trial::
+
+            profiler = win.startFrameProfiler()
+            # ... run trial ...
+            win.stopFrameProfiler()
+            print(profiler.report())
+
+        """
+        from psychopy.visual.frameprofiler import FrameProfiler
+        self.frameProfiler = FrameProfiler(
+            maxFrames=maxFrames, maxStims=maxStims)
+
+        return self.frameProfiler
+
+    def stopFrameProfiler(self):
+        """Stop timing the phases of :py:attr:`~Window.flip()`.
+
+        Returns
+        -------
+        :class:`~psychopy.visual.frameprofiler.FrameProfiler` or None
+            The profiler which was running (if any), holding the timings
+            recorded so far.
+        """
+        profiler = self.frameProfiler
+        self.frameProfiler = None
+
+        return profiler
+
     def update(self):
         """Deprecated: use Window.flip() instead
         """